@@ -2,25 +2,60 @@
 
 import json
 import logging
+import re
+import threading
 import time
-from typing import Any, Dict, List, Optional, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 
 import anthropic
 from anthropic import APIError, RateLimitError
 
 from src.infrastructure.config import get_settings
+from src.infrastructure.rate_limiter import TokenBucket
+from src.infrastructure.retry import retry_delay
+
+try:
+    import orjson
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so existing
+    # except clauses keep working with either parser
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Characters that matter when matching JSON brackets: brackets, string quotes
+# and escapes. Compiled once at import.
+_JSON_SCAN_RE = re.compile(r'[{}\[\]"\\]')
+
+# Anthropic SDK clients by API key. Each one owns an HTTP connection pool, so
+# ClaudeClient instances share them instead of opening new connections.
+_ANTHROPIC_CLIENTS: Dict[str, anthropic.Anthropic] = {}
+_ANTHROPIC_CLIENTS_LOCK = threading.Lock()
+
+# Maximum number of cached responses per client (temperature 0 only)
+_RESPONSE_CACHE_SIZE = 1024
+
+# Fields every flashcard must have, in the order they are reported when missing
+_REQUIRED_FIELDS = ("question", "answer")
+_REQUIRED_FIELD_SET = frozenset(_REQUIRED_FIELDS)
+
 
 class ClaudeClient:
     """Client for interacting with Claude API for flashcard generation.
 
     Features:
     - Automatic retry with exponential backoff
+    - Client-side token bucket rate limiting
     - Token usage tracking
     - Cost estimation
     - Robust JSON parsing
+    - Response caching for deterministic (temperature 0) requests
 
     Design decisions:
     - Instance-based for token tracking across multiple calls
@@ -29,37 +64,75 @@ class ClaudeClient:
     - Parse JSON robustly (handle surrounding text)
     """
 
+    # Fixed attribute set: no per-instance __dict__ and faster attribute access
+    # on the hot counters
+    __slots__ = (
+        "api_key",
+        "model",
+        "temperature",
+        "max_tokens",
+        "stream",
+        "client",
+        "total_input_tokens",
+        "total_output_tokens",
+        "api_calls",
+        "rate_limiter",
+        "_lock",
+        "_response_cache",
+    )
+
     # Pricing for Claude Sonnet 4.5 (per million tokens)
     PRICE_PER_MILLION_INPUT = 3.00  # $3 per 1M input tokens
     PRICE_PER_MILLION_OUTPUT = 15.00  # $15 per 1M output tokens
 
     def __init__(
-        self, api_key: Optional[str] = None, min_request_interval: float = 0.1
+        self,
+        api_key: Optional[str] = None,
+        requests_per_minute: Optional[int] = None,
+        stream: bool = False,
     ):
         """Initialize Claude client.
 
         Args:
             api_key: Anthropic API key. If None, loads from settings.
-            min_request_interval: Minimum seconds between requests for rate limiting.
-                Default 0.1s (10 req/sec). Set to 0 to disable.
+            requests_per_minute: Client-side request limit. If None, loads from
+                settings (default 50). Set to 0 to disable.
+            stream: Receive responses as a stream instead of one blocking
+                response. Keeps long multi-card generations from hitting
+                HTTP read timeouts. Default False.
         """
         settings = get_settings()
         self.api_key = api_key or settings.anthropic_api_key
         self.model = settings.claude_model
         self.temperature = settings.claude_temperature
         self.max_tokens = settings.claude_max_tokens
+        self.stream = stream
 
-        # Initialize Anthropic client
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        # Anthropic client (shared per API key so its connection pool is reused)
+        self.client = _get_anthropic_client(self.api_key)
 
         # Token tracking
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.api_calls = 0
 
-        # Rate limiting (client-side protection)
-        self.min_request_interval = min_request_interval
-        self.last_request_time = 0.0
+        # Rate limiting (client-side protection): a token bucket lets requests
+        # through immediately while under quota and only waits when it's spent
+        if requests_per_minute is None:
+            requests_per_minute = settings.claude_requests_per_minute
+        self.rate_limiter = (
+            TokenBucket.per_minute(requests_per_minute)
+            if requests_per_minute > 0
+            else None
+        )
+
+        # Guards the usage counters and response cache when requests are made
+        # from several threads (see generate_flashcards_parallel)
+        self._lock = threading.Lock()
+
+        # Response text by (prompt, model, max_tokens), only used at
+        # temperature 0 where the same prompt gives the same answer
+        self._response_cache: OrderedDict[Tuple[str, str, int], str] = OrderedDict()
 
         logger.info(f"Initialized ClaudeClient with model: {self.model}")
 
@@ -85,63 +158,162 @@ class ClaudeClient:
             anthropic.APIError: API error after all retries exhausted
             ValueError: Failed to parse JSON from response
         """
+        return self._request(prompt, max_retries, _parse_flashcards)
+
+    def generate_flashcards_batch(
+        self,
+        prompt: str,
+        num_contexts: int,
+        max_retries: int = 3,
+    ) -> List[List[Dict[str, str]]]:
+        """Generate flashcards for several contexts in a single API call.
+
+        Expects a prompt from PromptBuilder.build_batch_flashcard_prompt(),
+        which asks for a JSON array holding one array of flashcards per
+        context.
+
+        Args:
+            prompt: Batch prompt covering num_contexts contexts
+            num_contexts: Number of contexts packed into the prompt
+            max_retries: Maximum number of retry attempts (default: 3)
+
+        Returns:
+            One list of flashcard dicts per context, in prompt order
+
+        Raises:
+            anthropic.AuthenticationError: Invalid API key (not retried)
+            anthropic.BadRequestError: Invalid request (not retried)
+            anthropic.APIError: API error after all retries exhausted
+            ValueError: Failed to parse JSON from response, or the response
+                does not contain exactly num_contexts groups
+        """
+
+        def parse(text: str) -> List[List[Dict[str, str]]]:
+            return _parse_flashcard_batch(text, num_contexts)
+
+        return self._request(prompt, max_retries, parse)
+
+    def generate_flashcards_parallel(
+        self,
+        prompts: List[str],
+        max_workers: int = 8,
+        max_retries: int = 3,
+    ) -> List[Union[Dict[str, str], List[Dict[str, str]]]]:
+        """Generate flashcards for independent prompts concurrently.
+
+        Each prompt is sent with generate_flashcard() on a worker thread. The
+        client-side rate limit and usage stats are shared across threads.
+
+        Args:
+            prompts: Prompts to send; each is handled independently
+            max_workers: Maximum number of concurrent API calls (default: 8)
+            max_retries: Maximum number of retry attempts per prompt (default: 3)
+
+        Returns:
+            Results of generate_flashcard(), in the same order as prompts
+
+        Raises:
+            Any exception raised by generate_flashcard() for one of the prompts
+            (the first failing prompt in order)
+        """
+        if not prompts:
+            return []
+
+        workers = max(1, min(max_workers, len(prompts)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(
+                    lambda prompt: self.generate_flashcard(prompt, max_retries),
+                    prompts,
+                )
+            )
+
+    def _request(
+        self,
+        prompt: str,
+        max_retries: int,
+        parse: Callable[[str], T],
+    ) -> T:
+        """Send a prompt with retries and parse the response text.
+
+        Args:
+            prompt: The prompt text
+            max_retries: Maximum number of retry attempts
+            parse: Turns the response text into the result; raises ValueError
+                if the response is unusable (not retried)
+
+        Returns:
+            Result of parse()
+
+        Raises:
+            anthropic.AuthenticationError: Invalid API key (not retried)
+            anthropic.BadRequestError: Invalid request (not retried)
+            anthropic.APIError: API error after all retries exhausted
+            ValueError: Failed to parse the response
+        """
         attempt = 0
         last_error = None
 
+        # Bind request settings once instead of re-reading them on every retry
+        create = self.client.messages.create
+        model = self.model
+        max_tokens = self.max_tokens
+        temperature = self.temperature
+        messages = [{"role": "user", "content": prompt}]
+
+        # Deterministic requests can be answered from earlier responses. The
+        # text is cached rather than the parsed result because callers may
+        # modify the returned flashcards.
+        cache_key = (prompt, model, max_tokens) if temperature == 0 else None
+        if cache_key is not None:
+            with self._lock:
+                cached_text = self._response_cache.get(cache_key)
+                if cached_text is not None:
+                    self._response_cache.move_to_end(cache_key)
+            if cached_text is not None:
+                logger.info("Using cached response (temperature 0)")
+                return parse(cached_text)
+
         while attempt < max_retries:
             try:
                 attempt += 1
 
-                # Rate limiting: enforce minimum interval between requests
-                if self.min_request_interval > 0:
-                    elapsed = time.time() - self.last_request_time
-                    if elapsed < self.min_request_interval:
-                        sleep_time = self.min_request_interval - elapsed
-                        logger.debug(f"Rate limiting: sleeping {sleep_time:.3f}s")
-                        time.sleep(sleep_time)
-                    self.last_request_time = time.time()
+                # Rate limiting: wait for a token if the bucket is empty
+                self._wait_for_rate_limit()
 
                 # Make API call
                 logger.info(
                     f"Calling Claude API (attempt {attempt}/{max_retries}, "
-                    f"model: {self.model})"
+                    f"model: {model})"
                 )
 
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=self.max_tokens,
-                    temperature=self.temperature,
-                    messages=[{"role": "user", "content": prompt}],
-                )
+                if self.stream:
+                    response_text, usage = self._stream_message(prompt)
+                else:
+                    response = create(
+                        model=model,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        messages=messages,
+                    )
+                    response_text, usage = response.content[0].text, response.usage
 
                 # Track usage
-                self.total_input_tokens += response.usage.input_tokens
-                self.total_output_tokens += response.usage.output_tokens
-                self.api_calls += 1
+                with self._lock:
+                    self.total_input_tokens += usage.input_tokens
+                    self.total_output_tokens += usage.output_tokens
+                    self.api_calls += 1
 
                 logger.info(
-                    f"API call successful. Tokens: {response.usage.input_tokens} in, "
-                    f"{response.usage.output_tokens} out"
+                    f"API call successful. Tokens: {usage.input_tokens} in, "
+                    f"{usage.output_tokens} out"
                 )
 
-                # Extract text from response
-                response_text = response.content[0].text
-
-                # Parse JSON from response
-                flashcards = extract_json_from_text(response_text)
-
-                # Validate structure
-                if isinstance(flashcards, dict):
-                    _validate_flashcard(flashcards)
-                elif isinstance(flashcards, list):
-                    for card in flashcards:
-                        _validate_flashcard(card)
-                else:
-                    raise ValueError(
-                        f"Expected dict or list, got {type(flashcards).__name__}"
-                    )
-
-                return flashcards
+                # Parse the response text; only responses that parse are cached
+                result = parse(response_text)
+                if cache_key is not None:
+                    self._cache_response(cache_key, response_text)
+                return result
 
             except (
                 anthropic.AuthenticationError,
@@ -165,11 +337,11 @@ class ClaudeClient:
                 # Retry on rate limits, server errors, network issues
                 last_error = e
                 if attempt < max_retries:
-                    # Exponential backoff: 1s, 2s, 4s, ...
-                    wait_time = 2 ** (attempt - 1)
+                    wait_time = retry_delay(e, attempt)
                     logger.warning(
                         f"Retryable error ({type(e).__name__}): {e}. "
-                        f"Retrying in {wait_time}s... (attempt {attempt}/{max_retries})"
+                        f"Retrying in {wait_time:.2f}s... "
+                        f"(attempt {attempt}/{max_retries})"
                     )
                     time.sleep(wait_time)
                 else:
@@ -193,6 +365,48 @@ class ClaudeClient:
             raise last_error
         raise APIError("Failed to generate flashcard after all retries")
 
+    def _stream_message(self, prompt: str) -> Tuple[str, Any]:
+        """Send a prompt over a streaming request and collect the reply.
+
+        Args:
+            prompt: The prompt text
+
+        Returns:
+            Tuple of (response text, usage from the final message)
+        """
+        with self.client.messages.stream(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            messages=[{"role": "user", "content": prompt}],
+        ) as stream:
+            chunks = list(stream.text_stream)
+            final_message = stream.get_final_message()
+
+        return "".join(chunks), final_message.usage
+
+    def _cache_response(self, key: Tuple[str, str, int], response_text: str) -> None:
+        """Store a response, evicting the least recently used past the limit.
+
+        Args:
+            key: (prompt, model, max_tokens) of the request
+            response_text: Text of the response
+        """
+        with self._lock:
+            self._response_cache[key] = response_text
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+
+    def _wait_for_rate_limit(self) -> None:
+        """Take a token from the rate limiter, sleeping if none are left."""
+        if self.rate_limiter is None:
+            return
+
+        waited = self.rate_limiter.acquire()
+        if waited > 0:
+            logger.debug(f"Rate limiting: slept {waited:.3f}s")
+
     def get_usage_stats(self) -> Dict[str, Any]:
         """Get token usage statistics and cost estimation.
 
@@ -207,7 +421,7 @@ class ClaudeClient:
         """
         total_tokens = self.total_input_tokens + self.total_output_tokens
 
-        # Calculate costs
+        # Calculate costs; prices are read here so subclasses can override them
         input_cost = (
             self.total_input_tokens / 1_000_000
         ) * self.PRICE_PER_MILLION_INPUT
@@ -230,11 +444,35 @@ class ClaudeClient:
 
     def reset_stats(self) -> None:
         """Reset token usage statistics."""
-        self.total_input_tokens = 0
-        self.total_output_tokens = 0
-        self.api_calls = 0
+        with self._lock:
+            self.total_input_tokens = 0
+            self.total_output_tokens = 0
+            self.api_calls = 0
         logger.debug("Reset usage statistics")
 
+    def clear_cache(self) -> None:
+        """Drop all cached responses."""
+        with self._lock:
+            self._response_cache.clear()
+        logger.debug("Cleared response cache")
+
+
+def _get_anthropic_client(api_key: str) -> anthropic.Anthropic:
+    """Return the shared Anthropic SDK client for an API key, creating it once.
+
+    Args:
+        api_key: Anthropic API key
+
+    Returns:
+        Anthropic client for that key
+    """
+    with _ANTHROPIC_CLIENTS_LOCK:
+        client = _ANTHROPIC_CLIENTS.get(api_key)
+        if client is None:
+            client = anthropic.Anthropic(api_key=api_key)
+            _ANTHROPIC_CLIENTS[api_key] = client
+        return client
+
 
 def extract_json_from_text(text: str) -> Union[Dict, List]:
     """Extract JSON object or array from text that may contain surrounding content.
@@ -256,26 +494,23 @@ def extract_json_from_text(text: str) -> Union[Dict, List]:
     """
     text = text.strip()
 
-    # Try parsing as-is first (common case)
-    try:
-        result = json.loads(text)
-        logger.debug("Parsed JSON directly (no surrounding text)")
-        return result
-    except json.JSONDecodeError:
-        pass
+    # Fast path: clean JSON responses (the common case) start and end with a
+    # bracket, so try the native parser first and only scan when that fails.
+    # JSON followed by prose can't parse directly, so it skips straight to
+    # the scan.
+    if text[:1] in ("{", "[") and text[-1:] in ("}", "]"):
+        try:
+            result = _json_loads(text)
+            logger.debug("Parsed JSON directly (no surrounding text)")
+            return result
+        except json.JSONDecodeError:
+            pass
 
     # Try to extract JSON using bracket matching
     # Find first occurrence of { or [
-    json_start = -1
-    start_char = None
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
 
-    for i, char in enumerate(text):
-        if char in "{[":
-            json_start = i
-            start_char = char
-            break
-
-    if json_start == -1:
+    if not starts:
         # No JSON-like structure found
         logger.error(f"No JSON structure found in text: {text[:200]}...")
         raise ValueError(
@@ -283,22 +518,27 @@ def extract_json_from_text(text: str) -> Union[Dict, List]:
             "Response may not contain properly formatted JSON."
         )
 
-    # Match brackets/braces
+    json_start = min(starts)
+    start_char = text[json_start]
+
+    # Match brackets/braces. Only brackets, quotes and backslashes affect the
+    # scan, so jump between them with a precompiled regex instead of visiting
+    # every character in Python.
     end_char = "}" if start_char == "{" else "]"
     depth = 0
     in_string = False
-    escape_next = False
+    escaped_index = -1
 
-    for i in range(json_start, len(text)):
-        char = text[i]
+    for match in _JSON_SCAN_RE.finditer(text, json_start):
+        i = match.start()
+        char = match.group()
 
-        # Handle string escaping
-        if escape_next:
-            escape_next = False
+        # Handle string escaping: skip the character right after a backslash
+        if i == escaped_index:
             continue
 
         if char == "\\":
-            escape_next = True
+            escaped_index = i + 1
             continue
 
         # Track if we're inside a string
@@ -316,7 +556,7 @@ def extract_json_from_text(text: str) -> Union[Dict, List]:
                     # Found matching bracket
                     json_str = text[json_start : i + 1]
                     try:
-                        result = json.loads(json_str)
+                        result = _json_loads(json_str)
                         logger.debug(
                             f"Extracted JSON {start_char}...{end_char} from surrounding text"
                         )
@@ -333,6 +573,70 @@ def extract_json_from_text(text: str) -> Union[Dict, List]:
     )
 
 
+def _parse_flashcards(text: str) -> Union[Dict[str, str], List[Dict[str, str]]]:
+    """Parse and validate a single-prompt flashcard response.
+
+    Args:
+        text: Response text from Claude
+
+    Returns:
+        Single flashcard dict or list of flashcard dicts
+
+    Raises:
+        ValueError: If the response has no valid JSON or invalid flashcards
+    """
+    flashcards = extract_json_from_text(text)
+
+    # Validate structure
+    if isinstance(flashcards, dict):
+        _validate_flashcard(flashcards)
+    elif isinstance(flashcards, list):
+        for card in flashcards:
+            _validate_flashcard(card)
+    else:
+        raise ValueError(f"Expected dict or list, got {type(flashcards).__name__}")
+
+    return flashcards
+
+
+def _parse_flashcard_batch(text: str, num_contexts: int) -> List[List[Dict[str, str]]]:
+    """Parse and validate a batch flashcard response.
+
+    A group holding a single flashcard object instead of an array is
+    accepted and wrapped in a list.
+
+    Args:
+        text: Response text from Claude
+        num_contexts: Number of contexts in the batch prompt
+
+    Returns:
+        One list of flashcard dicts per context
+
+    Raises:
+        ValueError: If the response is not an array of num_contexts groups
+            or contains invalid flashcards
+    """
+    groups = extract_json_from_text(text)
+
+    if not isinstance(groups, list):
+        raise ValueError(f"Expected list of groups, got {type(groups).__name__}")
+    if len(groups) != num_contexts:
+        raise ValueError(f"Expected {num_contexts} flashcard groups, got {len(groups)}")
+
+    batch = []
+    for group in groups:
+        cards = [group] if isinstance(group, dict) else group
+        if not isinstance(cards, list):
+            raise ValueError(
+                f"Expected dict or list for flashcard group, got {type(group).__name__}"
+            )
+        for card in cards:
+            _validate_flashcard(card)
+        batch.append(cards)
+
+    return batch
+
+
 def _validate_flashcard(card: Dict[str, str]) -> None:
     """Validate that a flashcard has required fields.
 
@@ -340,17 +644,23 @@ def _validate_flashcard(card: Dict[str, str]) -> None:
         card: Flashcard dictionary
 
     Raises:
-        ValueError: If required fields are missing or empty
+        ValueError: If card is not a dict, or required fields are missing,
+            not strings, or empty
     """
-    required_fields = ["question", "answer"]
+    if not isinstance(card, dict):
+        raise ValueError(f"Flashcard must be a JSON object, got {type(card).__name__}")
+
+    # One C-level subset check covers the common case where nothing is missing
+    if not card.keys() >= _REQUIRED_FIELD_SET:
+        missing = next(field for field in _REQUIRED_FIELDS if field not in card)
+        raise ValueError(f"Flashcard missing required field: {missing}")
 
-    for field in required_fields:
-        if field not in card:
-            raise ValueError(f"Flashcard missing required field: {field}")
-        if not isinstance(card[field], str):
+    for field in _REQUIRED_FIELDS:
+        value = card[field]
+        if not isinstance(value, str):
             raise ValueError(
                 f"Flashcard field '{field}' must be string, "
-                f"got {type(card[field]).__name__}"
+                f"got {type(value).__name__}"
             )
-        if not card[field].strip():
+        if not value.strip():
             raise ValueError(f"Flashcard field '{field}' cannot be empty")
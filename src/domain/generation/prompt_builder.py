@@ -1,9 +1,18 @@
 """Prompt building for flashcard generation using Claude."""
 
+import functools
 import logging
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
+# Prompt guidance per difficulty level; the keys are the valid difficulties
+_DIFFICULTY_GUIDANCE = {
+    "beginner": "Focus on basic definitions and fundamental concepts. Keep questions simple and straightforward.",
+    "intermediate": "Test understanding of concepts and their relationships. Questions should require comprehension, not just memorization.",
+    "advanced": "Test deep understanding, edge cases, and practical applications. Questions should be challenging and thought-provoking.",
+}
+
 
 class PromptBuilder:
     """Builds prompts for Claude to generate educational flashcards.
@@ -18,17 +27,30 @@ class PromptBuilder:
     # Prompt version for tracking quality improvements over time
     VERSION = "1.0"
 
-    # Example flashcards for few-shot learning
-    EXAMPLE_FLASHCARDS = [
-        {
-            "question": "What is the main responsibility of the leader node in leader-based replication?",
-            "answer": "The leader accepts all write operations from clients and propagates these changes to follower nodes, ensuring data consistency across the cluster.",
-        },
-        {
-            "question": "What is the key difference between synchronous and asynchronous replication?",
-            "answer": "Synchronous replication waits for confirmation from replicas before confirming a write (strong consistency, higher latency), while asynchronous replication confirms writes immediately without waiting (eventual consistency, lower latency).",
-        },
-    ]
+    # Example flashcards for few-shot learning. Read-only: the prompt text
+    # below is rendered from them once at import
+    EXAMPLE_FLASHCARDS = (
+        MappingProxyType(
+            {
+                "question": "What is the main responsibility of the leader node in leader-based replication?",
+                "answer": "The leader accepts all write operations from clients and propagates these changes to follower nodes, ensuring data consistency across the cluster.",
+            }
+        ),
+        MappingProxyType(
+            {
+                "question": "What is the key difference between synchronous and asynchronous replication?",
+                "answer": "Synchronous replication waits for confirmation from replicas before confirming a write (strong consistency, higher latency), while asynchronous replication confirms writes immediately without waiting (eventual consistency, lower latency).",
+            }
+        ),
+    )
+
+    # Example flashcards formatted for the prompt, built once at import
+    _EXAMPLES_TEXT = "\n\n".join(
+        f"Example {i+1}:\n{{\n"
+        f'  "question": "{ex["question"]}",\n'
+        f'  "answer": "{ex["answer"]}"\n}}'
+        for i, ex in enumerate(EXAMPLE_FLASHCARDS[:2])
+    )
 
     @staticmethod
     def build_flashcard_prompt(
@@ -51,64 +73,134 @@ class PromptBuilder:
             - Includes quality criteria and examples
             - Week 1 version - will be enhanced in Week 2-3
         """
-        # Validate difficulty
-        valid_difficulties = ["beginner", "intermediate", "advanced"]
-        if difficulty not in valid_difficulties:
-            logger.warning(
-                f"Invalid difficulty '{difficulty}', using 'intermediate'. "
-                f"Valid values: {valid_difficulties}"
-            )
-            difficulty = "intermediate"
-
-        # Build difficulty description
-        difficulty_guidance = {
-            "beginner": "Focus on basic definitions and fundamental concepts. Keep questions simple and straightforward.",
-            "intermediate": "Test understanding of concepts and their relationships. Questions should require comprehension, not just memorization.",
-            "advanced": "Test deep understanding, edge cases, and practical applications. Questions should be challenging and thought-provoking.",
-        }
-
-        # Format example flashcards
-        examples_text = "\n\n".join(
-            [
-                f"Example {i+1}:\n{{\n"
-                f'  "question": "{ex["question"]}",\n'
-                f'  "answer": "{ex["answer"]}"\n}}'
-                for i, ex in enumerate(PromptBuilder.EXAMPLE_FLASHCARDS[:2])
-            ]
+        difficulty = PromptBuilder._validate_difficulty(difficulty)
+
+        head, tail = PromptBuilder._prompt_template(difficulty, num_cards)
+        prompt = head + context + tail
+
+        logger.debug(
+            f"Built prompt for {num_cards} flashcard(s) at {difficulty} difficulty "
+            f"({len(context)} chars context)"
+        )
+
+        return prompt
+
+    @staticmethod
+    def build_batch_flashcard_prompt(
+        contexts: list[str],
+        difficulty: str = "intermediate",
+        cards_per_context: int = 1,
+    ) -> str:
+        """Build one prompt that generates flashcards for several contexts.
+
+        Packing several contexts into a single request means the instructions
+        and examples are sent (and billed) once instead of once per context.
+        Claude is asked for a JSON array with one array of flashcards per
+        context, in the same order as ``contexts``.
+
+        Args:
+            contexts: Text contents to generate flashcards from
+            difficulty: Target difficulty level (beginner/intermediate/advanced)
+            cards_per_context: Number of flashcards per context (default: 1)
+
+        Returns:
+            Formatted prompt string for Claude API
+
+        Raises:
+            ValueError: If contexts is empty
+        """
+        if not contexts:
+            raise ValueError("contexts must not be empty")
+
+        difficulty = PromptBuilder._validate_difficulty(difficulty)
+        num_contexts = len(contexts)
+        plural = "s" if cards_per_context > 1 else ""
+
+        sources = "\n\n".join(
+            f"[{i}]\n{context}" for i, context in enumerate(contexts, start=1)
         )
 
-        # Build the prompt
         prompt = f"""You are an expert educational content creator specializing in technical flashcards for spaced repetition learning (Anki).
 
-Your task is to generate {num_cards} high-quality flashcard{"s" if num_cards > 1 else ""} from the provided text.
+Your task is to generate {cards_per_context} high-quality flashcard{plural} from EACH of the {num_contexts} numbered source texts below. Every flashcard must be based only on its own source text.
 
-DIFFICULTY LEVEL: {difficulty}
-{difficulty_guidance[difficulty]}
+{PromptBuilder._guidelines(difficulty)}
 
-QUALITY CRITERIA:
-1. Question should be:
-   - Clear and specific (no ambiguity)
-   - Test understanding, not just memorization
-   - Self-contained (understandable without the source text)
-   - Concise (1-2 sentences maximum)
+SOURCE TEXTS:
+{sources}
 
-2. Answer should be:
-   - Accurate and technically correct
-   - Concise but complete (2-3 sentences ideal)
-   - Focus on key points, avoid unnecessary details
-   - Use precise technical terminology
+OUTPUT FORMAT:
+Return a JSON array with exactly {num_contexts} elements, one per source text and in the same order. Each element is a JSON array of exactly {cards_per_context} flashcard{plural} generated from that source text.
+
+Format:
+[
+  [
+    {{
+      "question": "Question about source text 1",
+      "answer": "Answer here"
+    }}
+  ],
+  [
+    {{
+      "question": "Question about source text 2",
+      "answer": "Answer here"
+    }}
+  ]
+]
+
+Generate the flashcards now:"""
 
-3. General guidelines:
-   - Avoid yes/no questions
-   - Avoid "list all" questions (too broad)
-   - Focus on concepts, not trivial facts
-   - Each flashcard should test one clear concept
+        logger.debug(
+            f"Built batch prompt for {num_contexts} context(s), "
+            f"{cards_per_context} flashcard(s) each at {difficulty} difficulty"
+        )
 
-EXAMPLES OF GOOD FLASHCARDS:
-{examples_text}
+        return prompt
+
+    @staticmethod
+    def _validate_difficulty(difficulty: str) -> str:
+        """Return difficulty if valid, otherwise warn and fall back to intermediate.
+
+        Args:
+            difficulty: Requested difficulty level
+
+        Returns:
+            A valid difficulty level
+        """
+        if difficulty not in _DIFFICULTY_GUIDANCE:
+            logger.warning(
+                f"Invalid difficulty '{difficulty}', using 'intermediate'. "
+                f"Valid values: {list(_DIFFICULTY_GUIDANCE)}"
+            )
+            return "intermediate"
+        return difficulty
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _prompt_template(difficulty: str, num_cards: int) -> tuple[str, str]:
+        """Build the static text that surrounds the source context.
+
+        The prompt only varies by context between calls with the same
+        settings, so the parts before and after it are cached per
+        (difficulty, num_cards).
+
+        Args:
+            difficulty: Validated difficulty level
+            num_cards: Number of flashcards to generate
+
+        Returns:
+            Tuple of (text before the context, text after the context)
+        """
+        head = f"""You are an expert educational content creator specializing in technical flashcards for spaced repetition learning (Anki).
+
+Your task is to generate {num_cards} high-quality flashcard{"s" if num_cards > 1 else ""} from the provided text.
+
+{PromptBuilder._guidelines(difficulty)}
 
 SOURCE TEXT:
-{context}
+"""
+
+        tail = f"""
 
 OUTPUT FORMAT:
 Generate exactly {num_cards} flashcard{"s" if num_cards > 1 else ""} in JSON format. {"If generating multiple cards, return a JSON array." if num_cards > 1 else "Return a single JSON object."}
@@ -130,12 +222,45 @@ Generate exactly {num_cards} flashcard{"s" if num_cards > 1 else ""} in JSON for
 
 Generate the flashcard{"s" if num_cards > 1 else ""} now:"""
 
-        logger.debug(
-            f"Built prompt for {num_cards} flashcard(s) at {difficulty} difficulty "
-            f"({len(context)} chars context)"
-        )
+        return head, tail
 
-        return prompt
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _guidelines(difficulty: str) -> str:
+        """Build the difficulty, quality criteria and examples sections.
+
+        Shared by the single-context and batch prompts.
+
+        Args:
+            difficulty: Validated difficulty level
+
+        Returns:
+            Prompt sections from DIFFICULTY LEVEL through the examples
+        """
+        return f"""DIFFICULTY LEVEL: {difficulty}
+{_DIFFICULTY_GUIDANCE[difficulty]}
+
+QUALITY CRITERIA:
+1. Question should be:
+   - Clear and specific (no ambiguity)
+   - Test understanding, not just memorization
+   - Self-contained (understandable without the source text)
+   - Concise (1-2 sentences maximum)
+
+2. Answer should be:
+   - Accurate and technically correct
+   - Concise but complete (2-3 sentences ideal)
+   - Focus on key points, avoid unnecessary details
+   - Use precise technical terminology
+
+3. General guidelines:
+   - Avoid yes/no questions
+   - Avoid "list all" questions (too broad)
+   - Focus on concepts, not trivial facts
+   - Each flashcard should test one clear concept
+
+EXAMPLES OF GOOD FLASHCARDS:
+{PromptBuilder._EXAMPLES_TEXT}"""
 
     @staticmethod
     def estimate_prompt_tokens(prompt: str) -> int:
@@ -3,8 +3,10 @@
 from dataclasses import dataclass, field
 from typing import List, Optional
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class Chunk:
     """Represents a text chunk from a document for RAG processing.
 
@@ -12,6 +14,9 @@ class Chunk:
     embedding generation and context retrieval. Chunks typically overlap
     with adjacent chunks to preserve context at boundaries.
 
+    Uses __slots__: a document yields many chunks and they are held in
+    memory through retrieval and context building.
+
     Attributes:
         chunk_id: Unique identifier in format "source_filename_chunk_001"
         text: The chunk text content
@@ -24,7 +29,12 @@ class Chunk:
         has_overlap_after: True if chunk overlaps with next
         overlap_with_previous: Previous chunk_id if overlapping
         overlap_with_next: Next chunk_id if overlapping
-        embedding: Vector embedding (populated during embedding phase)
+        embedding: Vector embedding as a float32 array (populated during
+            embedding phase); not compared in ==, as chunks are identified by
+            their content and arrays have no single truth value
+        tokens: Token IDs of text as a read-only uint32 array, 4 bytes per
+            token (set by Chunker so later stages don't re-tokenize; None
+            for chunks loaded from the vector store)
     """
 
     # Core content
@@ -47,7 +57,10 @@ class Chunk:
     overlap_with_next: Optional[str] = None
 
     # Embedding (will be populated in Day 3)
-    embedding: Optional[List[float]] = field(default=None, repr=False)
+    embedding: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
+
+    # Tokenization from chunking; not part of the chunk's identity
+    tokens: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
 
     def __len__(self) -> int:
         """Return character count.
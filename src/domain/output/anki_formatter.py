@@ -1,16 +1,33 @@
 """Anki deck formatting and export using genanki."""
 
+import functools
 import hashlib
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import BinaryIO, List, Optional
 
 import genanki
 
 logger = logging.getLogger(__name__)
 
 
+class _TagCharMap(dict):
+    """str.translate() table mapping non-alphanumeric characters to "_".
+
+    Unicode is too large to build the table up front, so each code point is
+    classified on first use and remembered.
+    """
+
+    def __missing__(self, codepoint: int) -> int:
+        mapped = codepoint if chr(codepoint).isalnum() else ord("_")
+        self[codepoint] = mapped
+        return mapped
+
+
+_TAG_CHAR_MAP = _TagCharMap()
+
+
 class AnkiFormatter:
     """Formats flashcards into Anki .apkg format.
 
@@ -43,9 +60,12 @@ class AnkiFormatter:
     """
 
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def _generate_model_id(name: str) -> int:
         """Generate a deterministic model ID from a name.
 
+        Cached because the same model and deck names come up on every export.
+
         Args:
             name: Name to hash
 
@@ -58,6 +78,7 @@ class AnkiFormatter:
         return abs(int.from_bytes(hash_bytes, byteorder="big")) % (2**31)
 
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def _generate_deck_id(name: str) -> int:
         """Generate a deterministic deck ID from a name.
 
@@ -82,9 +103,19 @@ class AnkiFormatter:
 
         Returns:
             Unique string GUID for the note
+
+        Notes:
+            Anki matches notes by GUID on import, so re-exporting the same
+            card updates the existing note instead of adding a duplicate.
+            Changing the hash or input format would break that for every
+            deck already imported, so the GUID format must stay stable.
         """
-        content = f"{question}|{answer}"
-        return hashlib.md5(content.encode()).hexdigest()[:10]
+        # Feed the parts to the hash separately rather than building
+        # f"{question}|{answer}"; the digest is the same
+        digest = hashlib.md5(question.encode())
+        digest.update(b"|")
+        digest.update(answer.encode())
+        return digest.hexdigest()[:10]
 
     @staticmethod
     def _create_note_model(model_name: str = "AnkiAI Basic") -> genanki.Model:
@@ -137,6 +168,64 @@ class AnkiFormatter:
             ValueError: If flashcards list is empty or cards are malformed
             OSError: If output path is not writable
         """
+        package = AnkiFormatter._build_package(flashcards, deck_name, tags)
+
+        # Ensure output directory exists
+        output_path_obj = Path(output_path)
+        output_path_obj.parent.mkdir(parents=True, exist_ok=True)
+
+        package.write_to_file(str(output_path_obj))
+
+        absolute_path = str(output_path_obj.resolve())
+        logger.info(f"Created Anki deck: {absolute_path} ({len(flashcards)} cards)")
+
+        return absolute_path
+
+    @staticmethod
+    def write_flashcards(
+        flashcards: List[dict],
+        output_stream: BinaryIO,
+        deck_name: str = "Generated Flashcards",
+        tags: Optional[List[str]] = None,
+    ) -> None:
+        """Write flashcards as an .apkg archive to a binary file-like object.
+
+        Same deck as format_flashcards(), but written to a stream (e.g. an
+        io.BytesIO for an HTTP response) instead of a file on disk.
+
+        Args:
+            flashcards: List of dicts with "question" and "answer" keys
+            output_stream: Writable, seekable binary stream for the archive
+            deck_name: Name for the Anki deck
+            tags: Optional list of tags to apply to all cards
+
+        Raises:
+            ValueError: If flashcards list is empty or cards are malformed
+        """
+        package = AnkiFormatter._build_package(flashcards, deck_name, tags)
+        package.write_to_file(output_stream)
+
+        logger.info(f"Wrote Anki deck to stream ({len(flashcards)} cards)")
+
+    @staticmethod
+    def _build_package(
+        flashcards: List[dict],
+        deck_name: str,
+        tags: Optional[List[str]],
+    ) -> genanki.Package:
+        """Validate flashcards and build a genanki package for them.
+
+        Args:
+            flashcards: List of dicts with "question" and "answer" keys
+            deck_name: Name for the Anki deck
+            tags: Optional list of tags to apply to all cards
+
+        Returns:
+            genanki.Package ready to be written
+
+        Raises:
+            ValueError: If flashcards list is empty or cards are malformed
+        """
         if not flashcards:
             raise ValueError("Cannot create deck with no flashcards")
 
@@ -158,8 +247,8 @@ class AnkiFormatter:
         deck_id = AnkiFormatter._generate_deck_id(deck_name)
         deck = genanki.Deck(deck_id, deck_name)
 
-        # Prepare tags
-        all_tags = tags or []
+        # Prepare tags (copied so the caller's list isn't modified)
+        all_tags = list(tags or [])
         # Add generation timestamp tag
         timestamp_tag = f"generated:{datetime.now().strftime('%Y-%m-%d')}"
         all_tags.append(timestamp_tag)
@@ -180,19 +269,7 @@ class AnkiFormatter:
             )
             deck.add_note(note)
 
-        # Create package and write to file
-        package = genanki.Package(deck)
-
-        # Ensure output directory exists
-        output_path_obj = Path(output_path)
-        output_path_obj.parent.mkdir(parents=True, exist_ok=True)
-
-        package.write_to_file(str(output_path_obj))
-
-        absolute_path = str(output_path_obj.resolve())
-        logger.info(f"Created Anki deck: {absolute_path} ({len(flashcards)} cards)")
-
-        return absolute_path
+        return genanki.Package(deck)
 
     @staticmethod
     def create_tags_from_metadata(
@@ -217,7 +294,7 @@ class AnkiFormatter:
         # Source file tag (sanitized for Anki)
         source_tag = Path(source_filename).stem
         # Replace spaces and special chars with underscores
-        source_tag = "".join(c if c.isalnum() else "_" for c in source_tag)
+        source_tag = source_tag.translate(_TAG_CHAR_MAP)
         source_tag = source_tag.strip("_")
         if source_tag:
             tags.append(f"source:{source_tag}")
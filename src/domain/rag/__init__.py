@@ -2,8 +2,9 @@
 
 from src.domain.rag.chunker import Chunker
 from src.domain.rag.context_builder import ChunkOrdering, ContextBuilder, ContextResult
+from src.domain.rag.embedding_cache import EmbeddingCache
 from src.domain.rag.embeddings import EmbeddingGenerator
-from src.domain.rag.retriever import Retriever, RetrievalResult
+from src.domain.rag.retriever import RetrievalResult, Retriever, SimilarityCache
 from src.domain.rag.vector_store import VectorStore
 
 __all__ = [
@@ -11,8 +12,10 @@ __all__ = [
     "ChunkOrdering",
     "ContextBuilder",
     "ContextResult",
+    "EmbeddingCache",
     "EmbeddingGenerator",
     "Retriever",
     "RetrievalResult",
+    "SimilarityCache",
     "VectorStore",
 ]
@@ -1,10 +1,12 @@
 """Semantic chunking functionality for RAG pipeline."""
 
 import logging
+import os
 import re
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
+import numpy as np
 import tiktoken
 
 from src.domain.models.chunk import Chunk
@@ -15,6 +17,26 @@ logger = logging.getLogger(__name__)
 # Default encoding for OpenAI text-embedding-3-small
 DEFAULT_ENCODING = "cl100k_base"
 
+# Runs of characters that aren't allowed in chunk IDs (underscores included,
+# so they collapse with the rest)
+_ID_UNSAFE_RE = re.compile(r"[\W_]+")
+
+# Paragraph breaks: a blank line, possibly holding whitespace
+_PARAGRAPH_BREAK_RE = re.compile(r"\n\s*\n")
+
+# Sentence breaks: whitespace after sentence-ending punctuation and before a
+# capital letter, so the punctuation stays with its sentence
+_SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+
+# Threads for tiktoken's encode_ordinary_batch. Batching only pays off with a
+# few cores and enough texts to spread across them; otherwise encode one by one.
+_ENCODE_THREADS = min(8, os.cpu_count() or 1)
+_MIN_BATCH_SIZE = 16
+
+# Longer texts can't fit in a single chunk, so chunk() doesn't tokenize them
+# whole to check. English text averages about 4 characters per token.
+_MAX_CHARS_PER_TOKEN = 10
+
 
 class Chunker:
     """Stateless semantic chunker that splits documents into meaningful chunks.
@@ -91,30 +113,50 @@ class Chunker:
             logger.warning(f"No paragraphs found in document: {document.file_path}")
             return []
 
-        # Process paragraphs into chunks
-        raw_chunks = Chunker._accumulate_paragraphs(
-            paragraphs=paragraphs,
-            target_size=target_size,
-            max_chunk_size=max_chunk_size,
-            encoding=encoding,
+        # Fast path: a document that fits in a single chunk needs no
+        # accumulation, sentence splitting or overlap. Joining the paragraphs
+        # gives the same text accumulation would, so tokenize it just once.
+        single_chunk_limit = min(target_size, max_chunk_size)
+        full_text = "\n\n".join(paragraphs)
+        full_tokens = (
+            encoding.encode_ordinary(full_text)
+            if len(full_text) <= single_chunk_limit * _MAX_CHARS_PER_TOKEN
+            else None
         )
 
-        if not raw_chunks:
-            return []
+        if full_tokens is not None and len(full_tokens) <= single_chunk_limit:
+            chunks = Chunker._build_chunks(
+                texts=[full_text],
+                document=document,
+                encoding=encoding,
+                token_lists=[full_tokens],
+            )
+        else:
+            # Process paragraphs into chunks
+            raw_chunks, raw_token_lists = Chunker._accumulate_paragraphs(
+                paragraphs=paragraphs,
+                target_size=target_size,
+                max_chunk_size=max_chunk_size,
+                encoding=encoding,
+            )
 
-        # Add overlap between chunks
-        chunks_with_overlap = Chunker._add_overlap(
-            raw_chunks=raw_chunks,
-            overlap_size=overlap_size,
-            encoding=encoding,
-        )
+            if not raw_chunks:
+                return []
 
-        # Build final Chunk objects
-        chunks = Chunker._build_chunks(
-            texts=chunks_with_overlap,
-            document=document,
-            encoding=encoding,
-        )
+            # Add overlap between chunks
+            chunks_with_overlap = Chunker._add_overlap(
+                raw_chunks=raw_chunks,
+                overlap_size=overlap_size,
+                encoding=encoding,
+                token_lists=raw_token_lists,
+            )
+
+            # Build final Chunk objects
+            chunks = Chunker._build_chunks(
+                texts=chunks_with_overlap,
+                document=document,
+                encoding=encoding,
+            )
 
         # Link overlap references
         Chunker._link_overlaps(chunks)
@@ -136,11 +178,9 @@ class Chunker:
         Returns:
             List of non-empty paragraphs
         """
-        # Split by double newlines (paragraph breaks)
-        paragraphs = re.split(r"\n\s*\n", text)
-
-        # Strip whitespace and filter empty paragraphs
-        return [p.strip() for p in paragraphs if p.strip()]
+        # Split by double newlines, then strip and drop empty paragraphs
+        paragraphs = (p.strip() for p in _PARAGRAPH_BREAK_RE.split(text))
+        return [p for p in paragraphs if p]
 
     @staticmethod
     def _split_into_sentences(text: str) -> List[str]:
@@ -154,12 +194,10 @@ class Chunker:
         Returns:
             List of sentences
         """
-        # Split on sentence-ending punctuation followed by space and capital letter
-        # This regex keeps the punctuation with the sentence
-        sentences = re.split(r"(?<=[.!?])\s+(?=[A-Z])", text)
-
-        # Strip and filter empty sentences
-        return [s.strip() for s in sentences if s.strip()]
+        # Split on sentence-ending punctuation followed by space and capital
+        # letter, then strip and drop empty sentences
+        sentences = (s.strip() for s in _SENTENCE_BREAK_RE.split(text))
+        return [s for s in sentences if s]
 
     @staticmethod
     def _count_tokens(text: str, encoding: tiktoken.Encoding) -> int:
@@ -174,7 +212,30 @@ class Chunker:
         """
         if not text:
             return 0
-        return len(encoding.encode(text))
+        return len(encoding.encode_ordinary(text))
+
+    @staticmethod
+    def _count_tokens_batch(texts: List[str], encoding: tiktoken.Encoding) -> List[int]:
+        """Count tokens in several texts.
+
+        Large batches are encoded with encode_ordinary_batch(), which tokenizes on
+        multiple threads outside the GIL.
+
+        Args:
+            texts: Texts to count tokens for
+            encoding: Tiktoken encoding to use
+
+        Returns:
+            Number of tokens in each text, in the same order
+        """
+        if _ENCODE_THREADS < 2 or len(texts) < _MIN_BATCH_SIZE:
+            return [Chunker._count_tokens(text, encoding) for text in texts]
+        return [
+            len(tokens)
+            for tokens in encoding.encode_ordinary_batch(
+                texts, num_threads=_ENCODE_THREADS
+            )
+        ]
 
     @staticmethod
     def _generate_chunk_id(document: Document, position: int) -> str:
@@ -190,16 +251,20 @@ class Chunker:
         # Extract filename without extension
         filename = Path(document.file_path).stem
 
-        # Sanitize filename (replace spaces and special chars with underscores)
-        filename = re.sub(r"[^\w]", "_", filename)
-        filename = re.sub(r"_+", "_", filename)  # Collapse multiple underscores
+        # Sanitize filename: each run of spaces, special chars and underscores
+        # becomes a single underscore
+        filename = _ID_UNSAFE_RE.sub("_", filename)
         filename = filename.strip("_")
 
         return f"{filename}_chunk_{position:03d}"
 
     @staticmethod
     def _extract_overlap(
-        text: str, size: int, encoding: tiktoken.Encoding, from_end: bool = True
+        text: str,
+        size: int,
+        encoding: tiktoken.Encoding,
+        from_end: bool = True,
+        tokens: Optional[List[int]] = None,
     ) -> str:
         """Extract overlap text from a chunk.
 
@@ -208,6 +273,7 @@ class Chunker:
             size: Target overlap size in tokens
             encoding: Tiktoken encoding to use
             from_end: If True, extract from end; if False, extract from start
+            tokens: Token IDs of text, if already encoded
 
         Returns:
             Overlap text
@@ -215,7 +281,8 @@ class Chunker:
         if size <= 0 or not text:
             return ""
 
-        tokens = encoding.encode(text)
+        if tokens is None:
+            tokens = encoding.encode_ordinary(text)
 
         if len(tokens) <= size:
             return text
@@ -233,7 +300,7 @@ class Chunker:
         target_size: int,
         max_chunk_size: int,
         encoding: tiktoken.Encoding,
-    ) -> List[str]:
+    ) -> Tuple[List[str], List[Optional[List[int]]]]:
         """Accumulate paragraphs into chunks.
 
         Args:
@@ -243,20 +310,25 @@ class Chunker:
             encoding: Tiktoken encoding to use
 
         Returns:
-            List of raw chunk texts (before overlap)
+            Tuple of (raw chunk texts before overlap, token IDs of each text
+            where accumulation already encoded it, else None)
         """
         chunks = []
+        chunk_token_lists: List[Optional[List[int]]] = []
         current_text = ""
+        current_tokens = None  # Token IDs of current_text, if encoded
+        para_token_counts = Chunker._count_tokens_batch(paragraphs, encoding)
 
-        for paragraph in paragraphs:
-            para_tokens = Chunker._count_tokens(paragraph, encoding)
+        for paragraph, para_tokens in zip(paragraphs, para_token_counts, strict=True):
 
             # Handle oversized paragraphs
             if para_tokens > max_chunk_size:
                 # Flush current chunk if not empty
                 if current_text:
                     chunks.append(current_text)
+                    chunk_token_lists.append(current_tokens)
                     current_text = ""
+                    current_tokens = None
 
                 # Split paragraph by sentences
                 sentence_chunks = Chunker._split_paragraph_by_sentences(
@@ -266,27 +338,33 @@ class Chunker:
                     encoding=encoding,
                 )
                 chunks.extend(sentence_chunks)
+                chunk_token_lists.extend([None] * len(sentence_chunks))
                 continue
 
-            # Check if adding this paragraph exceeds target
+            # Check if adding this paragraph exceeds target. Keep the token
+            # IDs so the overlap step needn't re-encode the chunk.
             combined_text = (
                 f"{current_text}\n\n{paragraph}" if current_text else paragraph
             )
-            combined_tokens = Chunker._count_tokens(combined_text, encoding)
+            combined_ids = encoding.encode_ordinary(combined_text)
 
-            if combined_tokens > target_size and current_text:
+            if len(combined_ids) > target_size and current_text:
                 # Save current chunk and start new one
                 chunks.append(current_text)
+                chunk_token_lists.append(current_tokens)
                 current_text = paragraph
+                current_tokens = None
             else:
                 # Accumulate
                 current_text = combined_text
+                current_tokens = combined_ids
 
         # Don't forget the last chunk
         if current_text:
             chunks.append(current_text)
+            chunk_token_lists.append(current_tokens)
 
-        return chunks
+        return chunks, chunk_token_lists
 
     @staticmethod
     def _split_paragraph_by_sentences(
@@ -314,9 +392,9 @@ class Chunker:
 
         chunks = []
         current_text = ""
+        sent_token_counts = Chunker._count_tokens_batch(sentences, encoding)
 
-        for sentence in sentences:
-            sent_tokens = Chunker._count_tokens(sentence, encoding)
+        for sentence, sent_tokens in zip(sentences, sent_token_counts, strict=True):
 
             # Handle oversized sentences
             if sent_tokens > max_chunk_size:
@@ -362,7 +440,7 @@ class Chunker:
         Returns:
             List of chunk texts
         """
-        tokens = encoding.encode(text)
+        tokens = encoding.encode_ordinary(text)
         chunks = []
 
         for i in range(0, len(tokens), target_size):
@@ -377,6 +455,7 @@ class Chunker:
         raw_chunks: List[str],
         overlap_size: int,
         encoding: tiktoken.Encoding,
+        token_lists: Optional[List[Optional[List[int]]]] = None,
     ) -> List[str]:
         """Add overlap between chunks.
 
@@ -384,6 +463,8 @@ class Chunker:
             raw_chunks: List of raw chunk texts
             overlap_size: Overlap size in tokens
             encoding: Tiktoken encoding to use
+            token_lists: Token IDs of raw_chunks where already encoded
+                (None entries are encoded here)
 
         Returns:
             List of chunk texts with overlap added
@@ -400,7 +481,11 @@ class Chunker:
             else:
                 # Add overlap from previous chunk
                 overlap = Chunker._extract_overlap(
-                    raw_chunks[i - 1], overlap_size, encoding, from_end=True
+                    raw_chunks[i - 1],
+                    overlap_size,
+                    encoding,
+                    from_end=True,
+                    tokens=token_lists[i - 1] if token_lists is not None else None,
                 )
                 if overlap:
                     result.append(f"{overlap}\n\n{chunk}")
@@ -414,6 +499,7 @@ class Chunker:
         texts: List[str],
         document: Document,
         encoding: tiktoken.Encoding,
+        token_lists: Optional[List[List[int]]] = None,
     ) -> List[Chunk]:
         """Build Chunk objects from text list.
 
@@ -421,6 +507,7 @@ class Chunker:
             texts: List of chunk texts
             document: Source document
             encoding: Tiktoken encoding to use
+            token_lists: Token IDs of texts, if already encoded
 
         Returns:
             List of Chunk objects
@@ -430,7 +517,17 @@ class Chunker:
 
         for i, text in enumerate(texts):
             chunk_id = Chunker._generate_chunk_id(document, i)
-            token_count = Chunker._count_tokens(text, encoding)
+            # Kept as uint32 rather than a list of Python ints, which would
+            # take several times the memory of the text itself
+            tokens = np.array(
+                (
+                    token_lists[i]
+                    if token_lists is not None
+                    else encoding.encode_ordinary(text)
+                ),
+                dtype=np.uint32,
+            )
+            tokens.flags.writeable = False
 
             # Determine overlap flags
             has_overlap_before = i > 0
@@ -442,10 +539,11 @@ class Chunker:
                 source_document=document.file_path,
                 page_numbers=page_numbers,
                 position=i,
-                token_count=token_count,
+                token_count=len(tokens),
                 char_count=len(text),
                 has_overlap_before=has_overlap_before,
                 has_overlap_after=has_overlap_after,
+                tokens=tokens,
             )
             chunks.append(chunk)
 
@@ -4,11 +4,15 @@ Formats retrieved chunks into LLM-ready context strings with proper
 formatting, metadata, and token management.
 """
 
+import functools
 import logging
+import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Sequence
 
 import tiktoken
 
@@ -22,6 +26,19 @@ DEFAULT_ENCODING = "cl100k_base"
 # Ellipsis used for truncated text
 TRUNCATION_ELLIPSIS = "..."
 
+# Threads for tiktoken's encode_ordinary_batch. As in the chunker, batching
+# only pays off with a few cores and enough texts; otherwise encode one by one.
+_ENCODE_THREADS = min(8, os.cpu_count() or 1)
+_MIN_BATCH_SIZE = 16
+
+# Token counts of recently formatted chunks, keyed by (encoding name, text).
+# The same retrieved chunks come back across queries, so most lookups hit.
+# Keyed by text rather than chunk_id: IDs only encode the file name and
+# position, so different documents can share them.
+_TOKEN_COUNT_CACHE_SIZE = 4096
+_token_count_cache: OrderedDict[tuple[str, str], int] = OrderedDict()
+_token_count_cache_lock = threading.Lock()
+
 
 class ChunkOrdering(Enum):
     """Ordering strategy for chunks in context.
@@ -35,10 +52,12 @@ class ChunkOrdering(Enum):
     POSITION = "position"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ContextResult:
     """Result of context building with metadata.
 
+    Immutable: a result describes one finished context build.
+
     Attributes:
         context: The formatted context string
         token_count: Estimated token count
@@ -127,14 +146,13 @@ class ContextBuilder:
         # Apply ordering
         ordered_chunks = ContextBuilder._order_chunks(chunks, ordering)
 
-        # Format each chunk
-        formatted_chunks = []
-        for chunk in ordered_chunks:
-            formatted = ContextBuilder._format_chunk(chunk, include_metadata)
-            formatted_chunks.append(formatted)
-
-        # Join with separator
-        context = separator.join(formatted_chunks)
+        # Format each chunk and join once with the separator
+        context = separator.join(
+            [
+                ContextBuilder._format_chunk(chunk, include_metadata)
+                for chunk in ordered_chunks
+            ]
+        )
 
         logger.debug(
             f"Built context from {len(chunks)} chunks "
@@ -186,15 +204,24 @@ class ContextBuilder:
         # Apply ordering
         ordered_chunks = ContextBuilder._order_chunks(chunks, ordering)
 
+        # Format and count all chunks up front (one batched encode)
+        candidates = [
+            ContextBuilder._format_chunk(chunk, include_metadata)
+            for chunk in ordered_chunks
+        ]
+        candidate_tokens = ContextBuilder._count_chunk_tokens(
+            ordered_chunks, include_metadata, encoding
+        )
+
         # Build context incrementally
         formatted_chunks = []
         total_tokens = 0
         truncated = False
-        separator_tokens = len(encoding.encode(separator))
+        separator_tokens = len(encoding.encode_ordinary(separator))
 
-        for chunk in ordered_chunks:
-            formatted = ContextBuilder._format_chunk(chunk, include_metadata)
-            chunk_tokens = len(encoding.encode(formatted))
+        for chunk, formatted, chunk_tokens in zip(
+            ordered_chunks, candidates, candidate_tokens, strict=True
+        ):
 
             # Account for separator (not needed for first chunk)
             needed_tokens = chunk_tokens
@@ -212,13 +239,21 @@ class ContextBuilder:
                     remaining_tokens -= separator_tokens
 
                 # Account for ellipsis tokens
-                ellipsis_tokens = len(encoding.encode(TRUNCATION_ELLIPSIS))
+                ellipsis_tokens = len(encoding.encode_ordinary(TRUNCATION_ELLIPSIS))
                 min_meaningful_tokens = 50 + ellipsis_tokens
 
                 if remaining_tokens > min_meaningful_tokens:
-                    # Reserve space for ellipsis
+                    # Reserve space for ellipsis. Without metadata the chunk
+                    # is rendered as its text, so the Chunker's tokens apply.
                     truncated_text = ContextBuilder._truncate_to_tokens(
-                        formatted, remaining_tokens - ellipsis_tokens, encoding
+                        formatted,
+                        remaining_tokens - ellipsis_tokens,
+                        encoding,
+                        tokens=(
+                            None
+                            if include_metadata
+                            else ContextBuilder._known_tokens(chunk, encoding)
+                        ),
                     )
                     if truncated_text:
                         formatted_chunks.append(truncated_text + TRUNCATION_ELLIPSIS)
@@ -231,7 +266,7 @@ class ContextBuilder:
         context = separator.join(formatted_chunks)
 
         # Recalculate actual token count
-        actual_tokens = len(encoding.encode(context)) if context else 0
+        actual_tokens = len(encoding.encode_ordinary(context)) if context else 0
 
         logger.debug(
             f"Built context with limit: {len(formatted_chunks)}/{len(chunks)} chunks, "
@@ -273,18 +308,157 @@ class ContextBuilder:
             return 0
 
         encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
-        separator_tokens = len(encoding.encode(separator))  # Cache once
+        separator_tokens = len(encoding.encode_ordinary(separator))  # Cache once
 
-        total_tokens = 0
-        for i, chunk in enumerate(chunks):
-            formatted = ContextBuilder._format_chunk(chunk, include_metadata)
-            total_tokens += len(encoding.encode(formatted))
+        chunk_tokens = ContextBuilder._count_chunk_tokens(
+            chunks, include_metadata, encoding
+        )
+
+        # Separators go between chunks, not before the first
+        return sum(chunk_tokens) + separator_tokens * (len(chunks) - 1)
+
+    @staticmethod
+    def _count_chunk_tokens(
+        chunks: List[Chunk], include_metadata: bool, encoding: tiktoken.Encoding
+    ) -> List[int]:
+        """Count tokens in each chunk as _format_chunk() renders it.
+
+        Chunks from the Chunker carry their text's token IDs, so only the
+        metadata line needs counting, and headers repeat across chunks of
+        the same pages. Adding the two counts is exact: the header ends in
+        "]\n", which cl100k_base always splits off from the text after it,
+        unless the text itself starts with a line break. Those chunks, and
+        chunks without usable tokens (e.g. loaded from storage or edited
+        since chunking), are encoded whole.
+
+        Args:
+            chunks: Chunks to count.
+            include_metadata: Whether the metadata line is rendered.
+            encoding: Tiktoken encoding; Chunk.tokens are only used for
+                DEFAULT_ENCODING, which the Chunker encodes with.
+
+        Returns:
+            Token count of each rendered chunk, in the same order.
+        """
+        known = [ContextBuilder._known_tokens(chunk, encoding) for chunk in chunks]
+        reuse = [
+            tokens is not None
+            and not (include_metadata and chunk.text.startswith(("\r", "\n")))
+            for chunk, tokens in zip(chunks, known, strict=True)
+        ]
+
+        # Texts to encode: the rendered chunk if its tokens can't be reused,
+        # otherwise just its metadata line (nothing without metadata)
+        texts = []
+        for chunk, reusable in zip(chunks, reuse, strict=True):
+            if not reusable:
+                texts.append(ContextBuilder._format_chunk(chunk, include_metadata))
+            elif include_metadata:
+                header = ContextBuilder._metadata_header(
+                    chunk.source_document, tuple(chunk.page_numbers)
+                )
+                texts.append(f"{header}\n")
+        counts = iter(ContextBuilder._count_tokens_batch(texts, encoding))
+
+        chunk_tokens = []
+        for tokens, reusable in zip(known, reuse, strict=True):
+            if not reusable:
+                chunk_tokens.append(next(counts))
+            elif include_metadata:
+                chunk_tokens.append(next(counts) + len(tokens))
+            else:
+                chunk_tokens.append(len(tokens))
+        return chunk_tokens
+
+    @staticmethod
+    def _known_tokens(
+        chunk: Chunk, encoding: tiktoken.Encoding
+    ) -> Optional[Sequence[int]]:
+        """Return the chunk's token IDs from chunking, if they still apply.
+
+        Chunk is mutable and its tokens are not updated when its text is
+        edited, so they are only trusted while token_count and char_count
+        still match them and the text. They are also only valid for
+        DEFAULT_ENCODING, which the Chunker encodes with.
+
+        Args:
+            chunk: Chunk whose tokens to check.
+            encoding: Tiktoken encoding the caller counts with.
+
+        Returns:
+            Token IDs of chunk.text, or None if they must be re-encoded.
+        """
+        tokens = chunk.tokens
+        if (
+            tokens is None
+            or encoding.name != DEFAULT_ENCODING
+            or len(tokens) != chunk.token_count
+            or len(chunk.text) != chunk.char_count
+        ):
+            return None
+        return tokens
+
+    @staticmethod
+    def _count_tokens_batch(texts: List[str], encoding: tiktoken.Encoding) -> List[int]:
+        """Count tokens in several texts.
+
+        Counts are served from a module-level LRU cache where possible. The
+        rest are encoded, with encode_ordinary_batch() for large batches, which
+        tokenizes on multiple threads outside the GIL.
 
-            # Add separator tokens (not for first chunk)
-            if i > 0:
-                total_tokens += separator_tokens
+        Args:
+            texts: Texts to count tokens for.
+            encoding: Tiktoken encoding.
 
-        return total_tokens
+        Returns:
+            Number of tokens in each text, in the same order.
+        """
+        keys = [(encoding.name, text) for text in texts]
+        with _token_count_cache_lock:
+            counts = [_token_count_cache.get(key) for key in keys]
+            for key, count in zip(keys, counts, strict=True):
+                if count is not None:
+                    _token_count_cache.move_to_end(key)
+
+        # Each distinct uncached text is encoded once, even if it repeats
+        missing = list(
+            dict.fromkeys(
+                text for text, count in zip(texts, counts, strict=True) if count is None
+            )
+        )
+        if not missing:
+            return counts
+
+        if _ENCODE_THREADS < 2 or len(missing) < _MIN_BATCH_SIZE:
+            missing_counts = [len(encoding.encode_ordinary(text)) for text in missing]
+        else:
+            missing_counts = [
+                len(tokens)
+                for tokens in encoding.encode_ordinary_batch(
+                    missing, num_threads=_ENCODE_THREADS
+                )
+            ]
+
+        fresh = dict(zip(missing, missing_counts, strict=True))
+        counts = [
+            fresh[text] if count is None else count
+            for text, count in zip(texts, counts, strict=True)
+        ]
+
+        with _token_count_cache_lock:
+            for key, count in zip(keys, counts, strict=True):
+                _token_count_cache[key] = count
+                _token_count_cache.move_to_end(key)
+            while len(_token_count_cache) > _TOKEN_COUNT_CACHE_SIZE:
+                _token_count_cache.popitem(last=False)
+
+        return counts
+
+    @staticmethod
+    def clear_token_cache() -> None:
+        """Drop all cached chunk token counts."""
+        with _token_count_cache_lock:
+            _token_count_cache.clear()
 
     @staticmethod
     def _format_chunk(chunk: Chunk, include_metadata: bool) -> str:
@@ -300,31 +474,60 @@ class ContextBuilder:
         if not include_metadata:
             return chunk.text
 
-        # Format metadata
-        source = Path(chunk.source_document).name
-        pages = chunk.page_numbers
-
-        # Format page numbers compactly
-        if pages:
-            sorted_pages = sorted(pages)
-            if len(sorted_pages) == 1:
-                page_str = str(sorted_pages[0])
-            elif sorted_pages == list(range(sorted_pages[0], sorted_pages[-1] + 1)):
-                # Consecutive range
-                page_str = f"{sorted_pages[0]}-{sorted_pages[-1]}"
-            else:
-                # Non-consecutive - display sorted for consistency
-                page_str = ", ".join(map(str, sorted_pages))
-        else:
-            page_str = "unknown"
-
-        metadata = ContextBuilder.METADATA_FORMAT.format(
-            source=source,
-            pages=page_str,
+        metadata = ContextBuilder._metadata_header(
+            chunk.source_document, tuple(chunk.page_numbers)
         )
 
         return f"{metadata}\n{chunk.text}"
 
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _metadata_header(source_document: str, pages: tuple[int, ...]) -> str:
+        """Build the metadata line shown above a chunk.
+
+        Cached because the same chunks are rendered for query after query.
+        Keyed by the values rather than the chunk, so a chunk whose source
+        or pages change never gets a stale header.
+
+        Args:
+            source_document: Path of the chunk's source document.
+            pages: Page numbers of the chunk.
+
+        Returns:
+            Formatted metadata line, e.g. "[Source: doc.pdf, Pages: 1-3]".
+        """
+        return ContextBuilder.METADATA_FORMAT.format(
+            source=Path(source_document).name,
+            pages=ContextBuilder._format_pages(pages),
+        )
+
+    @staticmethod
+    def _format_pages(pages: Sequence[int]) -> str:
+        """Format page numbers compactly.
+
+        Args:
+            pages: Page numbers, in any order.
+
+        Returns:
+            "5" for one page, "1-5" for a consecutive run, "1, 3, 7" for
+            anything else, or "unknown" if there are no pages.
+        """
+        if not pages:
+            return "unknown"
+
+        sorted_pages = sorted(pages)
+        first, last = sorted_pages[0], sorted_pages[-1]
+        count = len(sorted_pages)
+
+        if count == 1:
+            return str(first)
+        # Sorted, spanning exactly count pages and without duplicates means
+        # consecutive; no need to build the full range to compare against
+        if last - first == count - 1 and len(set(sorted_pages)) == count:
+            return f"{first}-{last}"
+        # Non-consecutive - display sorted for consistency
+        return ", ".join(map(str, sorted_pages))
+
     @staticmethod
     def _order_chunks(chunks: List[Chunk], ordering: ChunkOrdering) -> List[Chunk]:
         """Order chunks according to the specified strategy.
@@ -350,6 +553,7 @@ class ContextBuilder:
         text: str,
         max_tokens: int,
         encoding: tiktoken.Encoding,
+        tokens: Optional[Sequence[int]] = None,
     ) -> str:
         """Truncate text to fit within a token limit.
 
@@ -357,11 +561,13 @@ class ContextBuilder:
             text: Text to truncate.
             max_tokens: Maximum tokens.
             encoding: Tiktoken encoding.
+            tokens: Token IDs of text, if already encoded.
 
         Returns:
             Truncated text.
         """
-        tokens = encoding.encode(text)
+        if tokens is None:
+            tokens = encoding.encode_ordinary(text)
 
         if len(tokens) <= max_tokens:
             return text
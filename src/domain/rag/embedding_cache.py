@@ -0,0 +1,166 @@
+"""Content-addressed cache of embedding vectors."""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Caches embedding vectors by the text they were computed from.
+
+    Entries are keyed by a SHA-256 digest of the model name, dimensions and
+    text, so a vector is only reused for exactly the same input to the same
+    model. Re-indexing a document that was embedded before then costs no API
+    calls for the unchanged chunks.
+
+    Design decisions:
+    - In-memory LRU of at most `capacity` entries; optional SQLite file
+      (stdlib, no extra dependency) so the cache survives between runs and
+      entries evicted from memory can be read back from disk
+    - Vectors stored as float32 bytes, the precision OpenAI returns
+    - Returned arrays are read-only because they are shared between callers
+    - Thread-safe: generate_embeddings() stores results from worker threads
+
+    Example:
+        >>> cache = EmbeddingCache("./embedding_cache.sqlite3")
+        >>> key = cache.make_key("text-embedding-3-small", 1536, "Hello world")
+        >>> cache.get(key) is None
+        True
+    """
+
+    DEFAULT_CAPACITY = 10_000  # About 60 MB of 1536-dim float32 vectors
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        capacity: int = DEFAULT_CAPACITY,
+    ):
+        """Initialize the cache.
+
+        Args:
+            path: SQLite database file for persistent storage. If None, the
+                cache only lives in memory.
+            capacity: Maximum number of vectors held in memory. The least
+                recently used ones are dropped beyond that; with a database
+                they stay on disk.
+
+        Raises:
+            ValueError: If capacity is less than 1.
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+
+        self.capacity = capacity
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._db.commit()
+            logger.info(f"Opened embedding cache at {path}")
+
+    @staticmethod
+    def make_key(model: str, dimensions: int, text: str) -> str:
+        """Build the cache key for a text embedded with a given model.
+
+        Args:
+            model: Embedding model name
+            dimensions: Embedding dimensions
+            text: Text that is embedded
+
+        Returns:
+            Hex digest identifying the (model, dimensions, text) input
+        """
+        return hashlib.sha256(f"{model}:{dimensions}:{text}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Look up a cached embedding.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Read-only float32 embedding, or None if not cached
+        """
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                return vector
+            if self._db is None:
+                return None
+
+            row = self._db.execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            vector = np.frombuffer(row[0], dtype=np.float32)
+            self._memory[key] = vector
+            self._evict()
+            return vector
+
+    def put(self, key: str, vector) -> None:
+        """Store an embedding.
+
+        Args:
+            key: Cache key from make_key()
+            vector: Embedding vector (any sequence of floats)
+        """
+        self.put_many([(key, vector)])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        """Store several embeddings in one database transaction.
+
+        Args:
+            items: (key, vector) pairs, keys from make_key()
+        """
+        rows = []
+        for key, vector in items:
+            stored = np.array(vector, dtype=np.float32)
+            stored.flags.writeable = False
+            rows.append((key, stored))
+
+        with self._lock:
+            for key, stored in rows:
+                self._memory[key] = stored
+                self._memory.move_to_end(key)
+            self._evict()
+            if self._db is not None:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) "
+                        "VALUES (?, ?)",
+                        [(key, stored.tobytes()) for key, stored in rows],
+                    )
+
+    def _evict(self) -> None:
+        """Drop least recently used entries beyond capacity. Caller holds _lock."""
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def __len__(self) -> int:
+        """Number of entries held in memory."""
+        return len(self._memory)
+
+    def close(self) -> None:
+        """Close the SQLite database, if any. In-memory entries are kept."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
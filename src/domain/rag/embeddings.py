@@ -1,29 +1,54 @@
 """Embedding generation for RAG pipeline using OpenAI's text-embedding-3-small."""
 
+import base64
+import functools
+import json
 import logging
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 import openai
 from openai import APIError, RateLimitError
 
 from src.domain.models.chunk import Chunk
+from src.domain.rag.embedding_cache import EmbeddingCache
 from src.infrastructure.config import get_settings
+from src.infrastructure.rate_limiter import TokenBucket
+from src.infrastructure.retry import retry_delay
 
 logger = logging.getLogger(__name__)
 
+# OpenAI SDK clients by API key. Each one owns an HTTP connection pool, so
+# EmbeddingGenerator instances share them instead of opening new connections.
+_OPENAI_CLIENTS: Dict[str, openai.OpenAI] = {}
+_OPENAI_CLIENTS_LOCK = threading.Lock()
+
 
 class EmbeddingGenerator:
     """Generates embeddings for text chunks using OpenAI's embedding API.
 
     Features:
     - Batch processing with automatic splitting for large inputs
-    - Automatic retry with exponential backoff for rate limits and transient errors
+    - Chunks with identical text are embedded once per call
+    - Optional EmbeddingCache: previously embedded texts skip the API call
+    - Concurrent requests when the input spans several batches
+    - Client-side token bucket rate limiting by requests and tokens per minute
+    - Automatic retry with jittered exponential backoff (or the server's
+      retry-after) for rate limits and transient errors
     - Token usage tracking and cost estimation
     - Updates chunks in-place with embedding vectors
+    - Stores embeddings as float32 arrays, the precision OpenAI returns and
+      ChromaDB stores (a list of Python floats takes ~7x the memory)
 
     Design decisions:
     - Instance-based for token tracking across multiple calls
+    - Thread-safe: usage stats and rate limiting are shared across the
+      worker threads of one generate_embeddings() call
     - Uses text-embedding-3-small (1536 dimensions, $0.02 per 1M tokens)
     - Batch size of 2048 (OpenAI limit) for efficiency
     - Retry on rate limits and server errors, fail fast on auth/bad requests
@@ -42,7 +67,9 @@ class EmbeddingGenerator:
     MODEL = "text-embedding-3-small"
     EMBEDDING_DIMENSIONS = 1536
     MAX_BATCH_SIZE = 2048  # OpenAI limit per API call
+    MAX_TOKENS_PER_REQUEST = 300_000  # OpenAI limit per API call, all inputs
     MAX_INPUT_TOKENS = 8191  # Per text input
+    QUERY_CACHE_SIZE = 1024  # Recent query embeddings kept per instance
 
     # Pricing for text-embedding-3-small (per million tokens)
     PRICE_PER_MILLION_TOKENS = 0.02  # $0.02 per 1M tokens
@@ -50,14 +77,24 @@ class EmbeddingGenerator:
     def __init__(
         self,
         api_key: Optional[str] = None,
-        min_request_interval: float = 0.1,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        cache: Optional[EmbeddingCache] = None,
+        warmup: bool = False,
     ):
         """Initialize the embedding generator.
 
         Args:
             api_key: OpenAI API key. If None, loads from settings.
-            min_request_interval: Minimum seconds between requests for rate limiting.
-                Default 0.1s (10 req/sec). Set to 0 to disable.
+            requests_per_minute: Client-side request limit. If None, loads from
+                settings (default 3000). Set to 0 to disable.
+            tokens_per_minute: Client-side limit on input tokens. If None, loads
+                from settings (default 1,000,000). Set to 0 to disable.
+            cache: Cache consulted before calling the API and filled with
+                new embeddings. If None, every chunk is sent to the API.
+            warmup: Send a one-token request right away (see warmup()), so
+                the first real request doesn't pay for connection setup.
+                Default False.
 
         Raises:
             ValueError: If no API key is provided and none found in settings.
@@ -70,31 +107,87 @@ class EmbeddingGenerator:
                 "OpenAI API key required. Set OPENAI_API_KEY in .env or pass api_key."
             )
 
-        # Initialize OpenAI client
-        self.client = openai.OpenAI(api_key=self.api_key)
+        self.cache = cache
 
         # Token tracking
         self.total_tokens = 0
         self.api_calls = 0
 
-        # Rate limiting
-        self.min_request_interval = min_request_interval
-        self.last_request_time = 0.0
+        # Rate limiting (client-side protection): OpenAI limits both requests
+        # and tokens per minute, so a request waits until both buckets allow it
+        if requests_per_minute is None:
+            requests_per_minute = settings.openai_embedding_requests_per_minute
+        if tokens_per_minute is None:
+            tokens_per_minute = settings.openai_embedding_tokens_per_minute
+        self.request_limiter = (
+            TokenBucket.per_minute(requests_per_minute)
+            if requests_per_minute > 0
+            else None
+        )
+        self.token_limiter = (
+            TokenBucket.per_minute(tokens_per_minute) if tokens_per_minute > 0 else None
+        )
+
+        # Recent query embeddings as read-only float32 arrays (about 6 KB
+        # each, against roughly 49 KB as a tuple of Python floats), least
+        # recently used first
+        self._query_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+
+        # Query embeddings being requested right now, so concurrent callers
+        # with the same query share one API call
+        self._query_inflight: Dict[str, Future] = {}
+
+        # Guards usage stats and the query caches
+        self._lock = threading.Lock()
 
         logger.info(f"Initialized EmbeddingGenerator with model: {self.MODEL}")
 
+        if warmup:
+            self.warmup()
+
+    @functools.cached_property
+    def client(self) -> openai.OpenAI:
+        """OpenAI client, looked up on first use.
+
+        Shared per API key so its connection pool is reused. Generators that
+        never call the API don't create one.
+        """
+        return _get_openai_client(self.api_key)
+
+    def warmup(self) -> None:
+        """Open the API connection with a minimal embeddings request.
+
+        The TCP and TLS handshakes happen here instead of on the first real
+        request; the client's connection pool keeps the connection for later
+        calls. Failures are logged and ignored since real requests retry.
+        """
+        try:
+            response = self.client.embeddings.create(model=self.MODEL, input="x")
+        except openai.OpenAIError as e:
+            logger.warning(f"Embedding warmup request failed: {e}")
+            return
+
+        with self._lock:
+            self.total_tokens += response.usage.total_tokens
+            self.api_calls += 1
+        logger.debug("Embedding API connection warmed up")
+
     def generate_embeddings(
         self,
         chunks: List[Chunk],
         max_retries: int = 3,
+        max_workers: int = 4,
     ) -> List[Chunk]:
         """Generate embeddings for a list of chunks.
 
         Updates each chunk's embedding field in-place and returns the chunks.
+        When the chunks span several batches, the batches are requested
+        concurrently on worker threads.
 
         Args:
             chunks: List of Chunk objects to generate embeddings for.
             max_retries: Maximum retry attempts per batch (default: 3).
+            max_workers: Maximum number of concurrent API calls (default: 4).
 
         Returns:
             The same list of chunks with embedding field populated.
@@ -116,52 +209,199 @@ class EmbeddingGenerator:
             logger.warning("No chunks provided for embedding generation")
             return chunks
 
-        # Validate chunks have text
+        for _ in self.iterate_embeddings(chunks, max_retries, max_workers):
+            pass
+
+        logger.info(
+            f"Embedding generation complete. "
+            f"Total tokens: {self.total_tokens}, API calls: {self.api_calls}"
+        )
+
+        return chunks
+
+    def iterate_embeddings(
+        self,
+        chunks: List[Chunk],
+        max_retries: int = 3,
+        max_workers: int = 4,
+    ) -> Iterator[List[Chunk]]:
+        """Generate embeddings, yielding chunks as soon as they are embedded.
+
+        Works like generate_embeddings(), but hands back each group of chunks
+        as soon as its embeddings are set: cache hits first, then each batch
+        (with any duplicates of its texts) in the order the concurrent
+        requests finish. Callers can store one batch while the next is still
+        being embedded. Stopping early cancels batches that haven't started.
+        If batches fail, the error of the first failing batch in batch order
+        is raised, after any earlier batches still running have finished.
+
+        Args:
+            chunks: List of Chunk objects to generate embeddings for.
+            max_retries: Maximum retry attempts per batch (default: 3).
+            max_workers: Maximum number of concurrent API calls (default: 4).
+
+        Returns:
+            Iterator over lists of chunks whose embedding field is populated.
+
+        Raises:
+            ValueError: If a chunk has empty text (raised immediately).
+            openai.APIError: From the iterator, if a batch fails.
+
+        Example:
+            >>> for done in generator.iterate_embeddings(chunks):
+            ...     vector_store.add_chunks(done)
+        """
+        # Validate chunks have text; isspace() avoids a stripped copy per chunk
         for i, chunk in enumerate(chunks):
-            if not chunk.text or not chunk.text.strip():
+            if not chunk.text or chunk.text.isspace():
                 raise ValueError(f"Chunk at index {i} has empty text: {chunk.chunk_id}")
 
+        return self._embed_batches(chunks, max_retries, max_workers)
+
+    def _embed_batches(
+        self,
+        chunks: List[Chunk],
+        max_retries: int,
+        max_workers: int,
+    ) -> Iterator[List[Chunk]]:
+        """Embed validated chunks, yielding each group as it completes.
+
+        Args:
+            chunks: Chunks with non-empty text.
+            max_retries: Maximum retry attempts per batch.
+            max_workers: Maximum number of concurrent API calls.
+
+        Yields:
+            Lists of chunks whose embedding field was just populated.
+        """
+        if not chunks:
+            return
+
         logger.info(f"Generating embeddings for {len(chunks)} chunks")
 
+        # Fill chunks seen before from the cache; only the rest hit the API
+        pending = chunks
+        keys: Dict[str, str] = {}
+        if self.cache is not None:
+            pending = []
+            hits = []
+            for chunk in chunks:
+                if chunk.text not in keys:
+                    keys[chunk.text] = self.cache.make_key(
+                        self.MODEL, self.EMBEDDING_DIMENSIONS, chunk.text
+                    )
+                cached = self.cache.get(keys[chunk.text])
+                if cached is None:
+                    pending.append(chunk)
+                else:
+                    chunk.embedding = cached
+                    hits.append(chunk)
+            logger.info(f"Embedding cache: {len(hits)} hit(s), {len(pending)} miss(es)")
+            if hits:
+                yield hits
+
+        # Send each distinct text once; duplicates get the same embedding
+        same_text: Dict[str, List[Chunk]] = {}
+        unique = []
+        for chunk in pending:
+            group = same_text.get(chunk.text)
+            if group is None:
+                same_text[chunk.text] = [chunk]
+                unique.append(chunk)
+            else:
+                group.append(chunk)
+        if len(unique) < len(pending):
+            logger.info(f"Skipping {len(pending) - len(unique)} duplicate text(s)")
+
         # Split into batches if needed
-        batches = self._create_batches(chunks)
+        batches = self._create_batches(unique)
         logger.info(f"Split into {len(batches)} batch(es)")
 
-        # Process each batch
-        for batch_idx, batch in enumerate(batches):
-            logger.debug(
-                f"Processing batch {batch_idx + 1}/{len(batches)} "
-                f"({len(batch)} chunks)"
-            )
-
+        def embed_batch(batch: List[Chunk]) -> List[Chunk]:
             embeddings = self._generate_batch_embeddings(
                 texts=[chunk.text for chunk in batch],
                 max_retries=max_retries,
+                tokens=sum(chunk.token_count for chunk in batch),
             )
 
             # Update chunks with embeddings
+            done = []
             for chunk, embedding in zip(batch, embeddings, strict=True):
-                chunk.embedding = embedding
-
-        logger.info(
-            f"Embedding generation complete. "
-            f"Total tokens: {self.total_tokens}, API calls: {self.api_calls}"
-        )
-
-        return chunks
+                vector = np.asarray(embedding, dtype=np.float32)
+                group = same_text[chunk.text]
+                if len(group) > 1:
+                    # Shared by the duplicates, so nobody may modify it
+                    vector.flags.writeable = False
+                for duplicate in group:
+                    duplicate.embedding = vector
+                done.extend(group)
+
+            if self.cache is not None:
+                self.cache.put_many(
+                    (keys[chunk.text], chunk.embedding) for chunk in batch
+                )
+            return done
+
+        # Process batches; several at once when there is more than one
+        workers = max(1, min(max_workers, len(batches)))
+        if workers == 1:
+            for batch in batches:
+                yield embed_batch(batch)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(embed_batch, batch) for batch in batches]
+            position = {future: i for i, future in enumerate(futures)}
+            for future in as_completed(futures):
+                if future.exception() is None:
+                    yield future.result()
+                    continue
+
+                # Raise the first failure in batch order, not the first to
+                # finish: drop the later batches, wait for the earlier ones
+                failed = position[future]
+                for later in futures[failed + 1 :]:
+                    later.cancel()
+                wait(futures[:failed])
+                for earlier in futures[: failed + 1]:
+                    if earlier.exception() is not None:
+                        earlier.result()
+        finally:
+            # After an error or an early stop, skip batches not yet started
+            executor.shutdown(wait=True, cancel_futures=True)
 
     def _create_batches(self, chunks: List[Chunk]) -> List[List[Chunk]]:
-        """Split chunks into batches respecting OpenAI's batch size limit.
+        """Split chunks into batches respecting OpenAI's per-request limits.
+
+        Chunks are packed in order until a batch reaches MAX_BATCH_SIZE
+        chunks or the next chunk would take it past MAX_TOKENS_PER_REQUEST
+        tokens (by Chunk.token_count, counted with the model's tokenizer).
 
         Args:
             chunks: List of chunks to batch.
 
         Returns:
-            List of chunk batches, each with at most MAX_BATCH_SIZE chunks.
+            List of chunk batches, each within both limits (a single chunk
+            over the token limit gets a batch of its own).
         """
         batches = []
-        for i in range(0, len(chunks), self.MAX_BATCH_SIZE):
-            batch = chunks[i : i + self.MAX_BATCH_SIZE]
+        batch: List[Chunk] = []
+        batch_tokens = 0
+
+        for chunk in chunks:
+            if batch and (
+                len(batch) == self.MAX_BATCH_SIZE
+                or batch_tokens + chunk.token_count > self.MAX_TOKENS_PER_REQUEST
+            ):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+
+            batch.append(chunk)
+            batch_tokens += chunk.token_count
+
+        if batch:
             batches.append(batch)
         return batches
 
@@ -169,21 +409,31 @@ class EmbeddingGenerator:
         self,
         texts: List[str],
         max_retries: int = 3,
-    ) -> List[List[float]]:
+        tokens: Optional[int] = None,
+    ) -> np.ndarray:
         """Generate embeddings for a batch of texts.
 
+        Embeddings are requested base64-encoded and decoded straight into
+        one float32 matrix, instead of having the SDK build a list of
+        Python floats for every value.
+
         Args:
             texts: List of text strings to embed.
             max_retries: Maximum retry attempts.
+            tokens: Input token count, taken from the token rate limiter for
+                each attempt. If None, estimated as 4 characters per token.
 
         Returns:
-            List of embedding vectors (each is a list of 1536 floats).
+            Float32 matrix with one embedding per row, in input order.
 
         Raises:
             openai.AuthenticationError: Invalid API key.
             openai.BadRequestError: Invalid request.
             openai.APIError: After all retries exhausted.
         """
+        if tokens is None:
+            tokens = sum(len(text) for text in texts) // 4
+
         attempt = 0
         last_error = None
 
@@ -191,14 +441,8 @@ class EmbeddingGenerator:
             try:
                 attempt += 1
 
-                # Rate limiting
-                if self.min_request_interval > 0:
-                    elapsed = time.time() - self.last_request_time
-                    if elapsed < self.min_request_interval:
-                        sleep_time = self.min_request_interval - elapsed
-                        logger.debug(f"Rate limiting: sleeping {sleep_time:.3f}s")
-                        time.sleep(sleep_time)
-                    self.last_request_time = time.time()
+                # Rate limiting: wait for request and token budget if spent
+                self._wait_for_rate_limit(tokens)
 
                 # Make API call
                 logger.debug(
@@ -209,21 +453,26 @@ class EmbeddingGenerator:
                 response = self.client.embeddings.create(
                     model=self.MODEL,
                     input=texts,
+                    encoding_format="base64",
                 )
 
                 # Track usage
-                self.total_tokens += response.usage.total_tokens
-                self.api_calls += 1
+                with self._lock:
+                    self.total_tokens += response.usage.total_tokens
+                    self.api_calls += 1
 
                 logger.debug(
                     f"API call successful. Tokens used: {response.usage.total_tokens}"
                 )
 
-                # Extract embeddings in order
+                # Decode embeddings in order
                 # Response data is ordered by input index
-                embeddings = [item.embedding for item in response.data]
-
-                return embeddings
+                return np.stack(
+                    [
+                        np.frombuffer(base64.b64decode(item.embedding), np.float32)
+                        for item in response.data
+                    ]
+                )
 
             except openai.AuthenticationError as e:
                 logger.error(f"Authentication error: {e}")
@@ -241,10 +490,10 @@ class EmbeddingGenerator:
             ) as e:
                 last_error = e
                 if attempt < max_retries:
-                    wait_time = 2 ** (attempt - 1)  # Exponential backoff
+                    wait_time = retry_delay(e, attempt)
                     logger.warning(
                         f"Retryable error ({type(e).__name__}): {e}. "
-                        f"Retrying in {wait_time}s... "
+                        f"Retrying in {wait_time:.2f}s... "
                         f"(attempt {attempt}/{max_retries})"
                     )
                     time.sleep(wait_time)
@@ -263,6 +512,78 @@ class EmbeddingGenerator:
             raise last_error
         raise APIError("Failed to generate embeddings after all retries")
 
+    def _wait_for_rate_limit(self, tokens: int) -> None:
+        """Take one request and the given tokens, sleeping if either ran out.
+
+        Args:
+            tokens: Input tokens the request will use.
+        """
+        waited = 0.0
+        if self.request_limiter is not None:
+            waited += self.request_limiter.acquire()
+        if self.token_limiter is not None and tokens > 0:
+            waited += self.token_limiter.acquire(tokens)
+        if waited > 0:
+            logger.debug(f"Rate limiting: slept {waited:.3f}s")
+
+    @staticmethod
+    def dump_embeddings(path: Union[str, Path], chunks: List[Chunk]) -> None:
+        """Write chunk embeddings to one contiguous float32 .npy file.
+
+        Chunk IDs go to a JSON sidecar next to it (``<path>.ids.json``), in
+        row order.
+
+        Args:
+            path: Destination .npy file.
+            chunks: Chunks with embeddings, all of the same dimension.
+
+        Raises:
+            ValueError: If a chunk has no embedding or dimensions differ.
+        """
+        path = Path(path)
+        for chunk in chunks:
+            if not chunk.has_embedding():
+                raise ValueError(f"Chunk has no embedding: {chunk.chunk_id}")
+        dims = len(chunks[0].embedding) if chunks else 0
+
+        matrix = np.lib.format.open_memmap(
+            path, mode="w+", dtype=np.float32, shape=(len(chunks), dims)
+        )
+        try:
+            for row, chunk in enumerate(chunks):
+                if len(chunk.embedding) != dims:
+                    raise ValueError(
+                        f"Chunk {chunk.chunk_id} has {len(chunk.embedding)} "
+                        f"dimensions, expected {dims}"
+                    )
+                matrix[row] = chunk.embedding
+            matrix.flush()
+        finally:
+            del matrix
+
+        ids_path = path.with_name(path.name + ".ids.json")
+        ids_path.write_text(json.dumps([chunk.chunk_id for chunk in chunks]))
+        logger.info(f"Wrote {len(chunks)} embeddings to {path}")
+
+    @staticmethod
+    def load_embeddings(path: Union[str, Path]) -> Tuple[List[str], np.ndarray]:
+        """Memory-map embeddings written by dump_embeddings().
+
+        Rows are paged in from the file on access, so nothing is parsed and
+        processes loading the same file share the OS page cache.
+
+        Args:
+            path: File written by dump_embeddings().
+
+        Returns:
+            Tuple of (chunk IDs, read-only float32 matrix with one row per ID).
+        """
+        path = Path(path)
+        matrix = np.load(path, mmap_mode="r")
+        ids_path = path.with_name(path.name + ".ids.json")
+        chunk_ids = json.loads(ids_path.read_text())
+        return chunk_ids, matrix
+
     def get_usage_stats(self) -> Dict[str, Any]:
         """Get token usage statistics and cost estimation.
 
@@ -290,8 +611,9 @@ class EmbeddingGenerator:
 
     def reset_stats(self) -> None:
         """Reset token usage statistics."""
-        self.total_tokens = 0
-        self.api_calls = 0
+        with self._lock:
+            self.total_tokens = 0
+            self.api_calls = 0
         logger.debug("Reset usage statistics")
 
     def generate_query_embedding(
@@ -302,7 +624,10 @@ class EmbeddingGenerator:
         """Generate embedding for a single query string.
 
         Convenience method for generating a single embedding, useful for
-        search queries.
+        search queries. The last QUERY_CACHE_SIZE distinct queries are
+        cached, so repeating a search makes no API call, and concurrent
+        calls for a query that is already being requested wait for that
+        request instead of making their own.
 
         Args:
             query: Query text to embed.
@@ -323,8 +648,123 @@ class EmbeddingGenerator:
             >>> len(query_embedding)
             1536
         """
-        if not query or not query.strip():
+        if not query or query.isspace():
             raise ValueError("Query cannot be empty")
 
-        embeddings = self._generate_batch_embeddings([query], max_retries)
-        return embeddings[0]
+        with self._lock:
+            cached = self._query_cache.get(query)
+            if cached is not None:
+                self._query_cache.move_to_end(query)
+                return cached.tolist()
+
+            inflight = self._query_inflight.get(query)
+            if inflight is None:
+                future: Future = Future()
+                self._query_inflight[query] = future
+
+        if inflight is not None:
+            # Re-raises the first caller's error if its request failed
+            return inflight.result().tolist()
+
+        try:
+            embeddings = self._generate_batch_embeddings([query], max_retries)
+            result = self._frozen_embedding(embeddings[0])
+        except BaseException as e:
+            with self._lock:
+                del self._query_inflight[query]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._query_inflight[query]
+            self._query_cache[query] = result
+            self._query_cache.move_to_end(query)
+            while len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        future.set_result(result)
+
+        return result.tolist()
+
+    def generate_query_embeddings(
+        self,
+        queries: List[str],
+        max_retries: int = 3,
+    ) -> List[List[float]]:
+        """Generate embeddings for several query strings at once.
+
+        Queries that are not in the query cache are embedded together, one
+        API request per MAX_BATCH_SIZE distinct queries, instead of one
+        request per query. Results are added to the query cache.
+
+        Args:
+            queries: Query texts to embed.
+            max_retries: Maximum retry attempts.
+
+        Returns:
+            One embedding vector per query, in the same order.
+
+        Raises:
+            ValueError: If any query is empty.
+            openai.APIError: If API call fails.
+        """
+        for i, query in enumerate(queries):
+            if not query or query.isspace():
+                raise ValueError(f"Query at index {i} cannot be empty")
+
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for query in queries:
+                cached = self._query_cache.get(query)
+                if cached is not None:
+                    self._query_cache.move_to_end(query)
+                    found[query] = cached
+
+        missing = list(dict.fromkeys(q for q in queries if q not in found))
+        for start in range(0, len(missing), self.MAX_BATCH_SIZE):
+            batch = missing[start : start + self.MAX_BATCH_SIZE]
+            embeddings = self._generate_batch_embeddings(batch, max_retries)
+            results = [self._frozen_embedding(row) for row in embeddings]
+            found.update(zip(batch, results, strict=True))
+
+            with self._lock:
+                for query, result in zip(batch, results, strict=True):
+                    self._query_cache[query] = result
+                    self._query_cache.move_to_end(query)
+                while len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+
+        return [found[query].tolist() for query in queries]
+
+    @staticmethod
+    def _frozen_embedding(row: np.ndarray) -> np.ndarray:
+        """Copy an embedding row into a read-only float32 array for the cache.
+
+        The copy keeps a cached row from holding on to the rest of its batch
+        matrix; read-only because cached arrays are shared between callers.
+
+        Args:
+            row: Embedding vector, e.g. one row of a batch matrix.
+
+        Returns:
+            Read-only float32 copy of row.
+        """
+        embedding = np.array(row, dtype=np.float32)
+        embedding.flags.writeable = False
+        return embedding
+
+
+def _get_openai_client(api_key: str) -> openai.OpenAI:
+    """Return the shared OpenAI SDK client for an API key, creating it once.
+
+    Args:
+        api_key: OpenAI API key
+
+    Returns:
+        OpenAI client for that key
+    """
+    with _OPENAI_CLIENTS_LOCK:
+        client = _OPENAI_CLIENTS.get(api_key)
+        if client is None:
+            client = openai.OpenAI(api_key=api_key)
+            _OPENAI_CLIENTS[api_key] = client
+        return client
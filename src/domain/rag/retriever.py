@@ -4,9 +4,13 @@ Orchestrates embedding generation and vector search to provide a simple
 interface for retrieving relevant chunks based on a text query.
 """
 
+import bisect
 import logging
+import threading
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from src.domain.models.chunk import Chunk
 from src.domain.rag.embeddings import EmbeddingGenerator
@@ -15,10 +19,13 @@ from src.domain.rag.vector_store import VectorStore
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RetrievalResult:
     """Result of a retrieval operation with chunk and similarity score.
 
+    Frozen because SimilarityCache hands the same instances to every caller
+    that hits an entry; slotted as one is created per retrieved chunk.
+
     Attributes:
         chunk: The retrieved Chunk object
         score: Similarity score (0-1, higher is more similar)
@@ -33,6 +40,137 @@ class RetrievalResult:
         )
 
 
+class SimilarityCache:
+    """LRU cache of search results keyed by query embedding similarity.
+
+    A lookup hits when a cached query embedding has cosine similarity of at
+    least ``threshold`` with the new one and was stored with the same search
+    context (e.g. top_k and source filter). Near-duplicate queries then reuse
+    the earlier results instead of searching the vector store again.
+
+    Design decisions:
+    - Embeddings are normalized into one float32 matrix, so a lookup is a
+      single matrix-vector product over all entries
+    - Least recently used entry is replaced when full
+    - Thread-safe
+
+    Example:
+        >>> cache = SimilarityCache(capacity=128, threshold=0.97)
+        >>> cache.put(embedding, ("ctx",), results)
+        >>> cache.get(similar_embedding, ("ctx",))
+    """
+
+    def __init__(self, capacity: int = 256, threshold: float = 0.95):
+        """Initialize an empty cache.
+
+        Args:
+            capacity: Maximum number of cached queries.
+            threshold: Minimum cosine similarity for a hit (0-1].
+
+        Raises:
+            ValueError: If capacity is not positive or threshold not in (0, 1].
+        """
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+
+        self.capacity = capacity
+        self.threshold = threshold
+        self._vectors: Optional[np.ndarray] = None  # Allocated on first put
+        self._contexts: List[Hashable] = []
+        self._results: List[List[RetrievalResult]] = []
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of cached queries."""
+        return len(self._results)
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Optional[np.ndarray]:
+        """Return the embedding as a unit float32 vector, or None if zero."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def get(
+        self, embedding: Sequence[float], context: Hashable
+    ) -> Optional[List[RetrievalResult]]:
+        """Find results cached for a similar query with the same context.
+
+        Args:
+            embedding: Query embedding.
+            context: Search parameters the results must have been stored with.
+
+        Returns:
+            Copy of the cached results, or None on a miss.
+        """
+        query = self._normalize(embedding)
+        with self._lock:
+            if query is None or self._vectors is None or not self._results:
+                return None
+            if query.shape[0] != self._vectors.shape[1]:
+                return None
+
+            size = len(self._results)
+            sims = self._vectors[:size] @ query
+            candidates = np.flatnonzero(sims >= self.threshold)
+            for slot in candidates[np.argsort(-sims[candidates])]:
+                if self._contexts[slot] == context:
+                    self._clock += 1
+                    self._last_used[slot] = self._clock
+                    return list(self._results[slot])
+            return None
+
+    def put(
+        self,
+        embedding: Sequence[float],
+        context: Hashable,
+        results: List[RetrievalResult],
+    ) -> None:
+        """Cache results for a query, replacing the least recently used entry.
+
+        Args:
+            embedding: Query embedding.
+            context: Search parameters the results were produced with.
+            results: Results to cache.
+        """
+        query = self._normalize(embedding)
+        if query is None:
+            return
+
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != query.shape[0]:
+                self._vectors = np.zeros(
+                    (self.capacity, query.shape[0]), dtype=np.float32
+                )
+                self._contexts.clear()
+                self._results.clear()
+
+            if len(self._results) < self.capacity:
+                slot = len(self._results)
+                self._contexts.append(context)
+                self._results.append(list(results))
+            else:
+                slot = int(np.argmin(self._last_used))
+                self._contexts[slot] = context
+                self._results[slot] = list(results)
+
+            self._vectors[slot] = query
+            self._clock += 1
+            self._last_used[slot] = self._clock
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._vectors = None
+            self._contexts.clear()
+            self._results.clear()
+            self._last_used[:] = 0
+
+
 class Retriever:
     """Retrieves relevant chunks for a given text query.
 
@@ -45,6 +183,7 @@ class Retriever:
     - Configurable number of results (top_k)
     - Optional filtering by source document
     - Access to similarity scores for debugging/ranking
+    - Optional SimilarityCache so near-duplicate queries skip the search
     - Proper validation and error handling
 
     Design decisions:
@@ -76,21 +215,58 @@ class Retriever:
         self,
         vector_store: VectorStore,
         embedding_generator: EmbeddingGenerator,
+        cache: Optional[SimilarityCache] = None,
     ):
         """Initialize the retriever.
 
         Args:
             vector_store: VectorStore instance for similarity search.
             embedding_generator: EmbeddingGenerator instance for query embeddings.
+            cache: Cache of results for similar queries. Hits return results
+                searched for a slightly different query, so it is off (None)
+                by default.
         """
         self.vector_store = vector_store
         self.embedding_generator = embedding_generator
+        self.cache = cache
+
+        # Counted once rather than on every retrieval, and re-counted when
+        # the store's generation shows chunks were added or deleted
+        self._count_generation = vector_store.generation
+        self._count = vector_store.count()
 
         logger.info(
-            f"Initialized Retriever with store: {vector_store.collection_name} "
-            f"({vector_store.count()} chunks)"
+            "Initialized Retriever with store: %s (%d chunks)",
+            vector_store.collection_name,
+            self._count,
         )
 
+    def refresh_count(self) -> int:
+        """Re-read the number of chunks in the vector store.
+
+        The count is cached and re-read whenever chunks are added or deleted
+        through this retriever's VectorStore instance. Call this after
+        changes made any other way, e.g. through another VectorStore on the
+        same collection. It also clears the similarity cache, which has the
+        same blind spot.
+
+        Returns:
+            Current number of chunks in the vector store.
+        """
+        self._count_generation = self.vector_store.generation
+        self._count = self.vector_store.count()
+        if self.cache is not None:
+            self.cache.clear()
+        return self._count
+
+    def _store_is_empty(self) -> bool:
+        """Check the cached chunk count, re-reading it if the store changed."""
+        generation = self.vector_store.generation
+        if generation != self._count_generation:
+            self._count_generation = generation
+            self._count = self.vector_store.count()
+        return self._count == 0
+
     def retrieve(
         self,
         query: str,
@@ -166,51 +342,228 @@ class Retriever:
             ...     print(f"Score: {result.score:.3f}")
             ...     print(f"Text: {result.chunk.text[:100]}...")
         """
-        # Validate inputs
+        # Validate everything before touching the store or the embeddings
+        # API, so a malformed request costs no network call
         self._validate_query(query)
         self._validate_top_k(top_k)
         self._validate_min_score(min_score)
 
         # Check for empty vector store
-        if self.vector_store.count() == 0:
+        if self._store_is_empty():
             logger.warning("Vector store is empty, returning no results")
             return []
 
         # Generate query embedding
-        logger.debug(f"Generating embedding for query: {query[:50]}...")
+        # Retrieval runs per query, so log arguments are only formatted when
+        # the level is enabled
+        logger.debug("Generating embedding for query: %.50s...", query)
         query_embedding = self.embedding_generator.generate_query_embedding(query)
 
-        # Perform similarity search
-        logger.debug(f"Searching for top {top_k} similar chunks")
-        search_results = self.vector_store.search(
-            query_embedding=query_embedding,
-            top_k=top_k,
-            source_document=source_document,
-        )
+        # The store generation is part of the context so that results
+        # cached before chunks were added or deleted stop matching
+        context = (top_k, source_document, self.vector_store.generation)
+        results = None
+        if self.cache is not None:
+            results = self.cache.get(query_embedding, context)
+            if results is not None:
+                logger.debug("Similarity cache hit, skipping vector search")
+
+        if results is None:
+            # Perform similarity search
+            logger.debug("Searching for top %d similar chunks", top_k)
+            search_results = self.vector_store.search(
+                query_embedding=query_embedding,
+                top_k=top_k,
+                source_document=source_document,
+            )
 
-        # Convert to RetrievalResult objects
-        results = [
-            RetrievalResult(chunk=chunk, score=score) for chunk, score in search_results
-        ]
+            # Convert to RetrievalResult objects
+            results = [
+                RetrievalResult(chunk=chunk, score=score)
+                for chunk, score in search_results
+            ]
+            if self.cache is not None:
+                self.cache.put(query_embedding, context, results)
 
         # Filter by minimum score if specified
-        if min_score is not None and results:
-            original_count = len(results)
-            results = [r for r in results if r.score >= min_score]
-            if len(results) < original_count:
-                logger.debug(
-                    f"Filtered {original_count - len(results)} results below "
-                    f"min_score={min_score}"
-                )
+        results = self._filter_by_score(results, min_score)
 
         if results:
             logger.info(
-                f"Retrieved {len(results)} chunks for query: {query[:30]}... "
-                f"(top score: {results[0].score:.3f})"
+                "Retrieved %d chunks for query: %.30s... (top score: %.3f)",
+                len(results),
+                query,
+                results[0].score,
             )
         else:
-            logger.info(f"Retrieved 0 chunks for query: {query[:30]}...")
+            logger.info("Retrieved 0 chunks for query: %.30s...", query)
+
+        return results
+
+    def retrieve_with_scores_arrays(
+        self,
+        query: str,
+        top_k: int = DEFAULT_TOP_K,
+        source_document: Optional[str] = None,
+        min_score: Optional[float] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Retrieve the IDs and similarity scores of relevant chunks.
+
+        For callers that only need rankings (rerankers, evaluation scripts).
+        The vector store returns IDs and distances only, so no Chunk or
+        RetrievalResult objects are built. The similarity cache is not used,
+        as it holds full results.
 
+        Args:
+            query: Text query to search for.
+            top_k: Number of chunks to return (default: 5).
+            source_document: Optional filter to only search within a specific
+                source document.
+            min_score: Optional minimum similarity score threshold (0-1).
+                Results below this score are filtered out.
+
+        Returns:
+            Tuple of (chunk IDs as a unicode array, scores as a float32
+            array), ordered by score (highest first).
+
+        Raises:
+            ValueError: If query is empty, top_k is invalid, or min_score is invalid.
+
+        Example:
+            >>> ids, scores = retriever.retrieve_with_scores_arrays("What is ML?")
+            >>> ids[scores > 0.5]
+        """
+        self._validate_query(query)
+        self._validate_top_k(top_k)
+        self._validate_min_score(min_score)
+
+        if self._store_is_empty():
+            logger.warning("Vector store is empty, returning no results")
+            return np.array([], dtype=str), np.array([], dtype=np.float32)
+
+        query_embedding = self.embedding_generator.generate_query_embedding(query)
+        chunk_ids, similarities = self.vector_store.search_ids(
+            query_embedding=query_embedding,
+            top_k=top_k,
+            source_document=source_document,
+        )
+
+        ids = np.array(chunk_ids, dtype=str)
+        # Filter before the float32 cast so the threshold compares exactly
+        # like retrieve_with_scores()
+        scores = np.array(similarities, dtype=np.float64)
+        if min_score is not None:
+            keep = scores >= min_score
+            ids, scores = ids[keep], scores[keep]
+
+        return ids, scores.astype(np.float32)
+
+    def retrieve_many(
+        self,
+        queries: List[str],
+        top_k: int = DEFAULT_TOP_K,
+        source_document: Optional[str] = None,
+        min_score: Optional[float] = None,
+    ) -> List[List[RetrievalResult]]:
+        """Retrieve relevant chunks with scores for several queries at once.
+
+        All queries are embedded in one API request and searched with one
+        vector store query, instead of one of each per query.
+
+        Args:
+            queries: Text queries to search for.
+            top_k: Number of chunks to return per query (default: 5).
+            source_document: Optional filter to only search within a specific
+                source document.
+            min_score: Optional minimum similarity score threshold (0-1).
+                Results below this score are filtered out.
+
+        Returns:
+            One list of RetrievalResult objects per query, in query order,
+            each ordered by score (highest first).
+
+        Raises:
+            ValueError: If any query is empty, top_k is invalid, or min_score
+                is invalid.
+
+        Example:
+            >>> retriever = Retriever(store, generator)
+            >>> per_query = retriever.retrieve_many(["What is ML?", "What is AI?"])
+            >>> [len(results) for results in per_query]
+            [5, 5]
+        """
+        for query in queries:
+            self._validate_query(query)
+        self._validate_top_k(top_k)
+        self._validate_min_score(min_score)
+
+        if not queries:
+            return []
+
+        if self._store_is_empty():
+            logger.warning("Vector store is empty, returning no results")
+            return [[] for _ in queries]
+
+        logger.debug("Generating embeddings for %d queries", len(queries))
+        query_embeddings = self.embedding_generator.generate_query_embeddings(queries)
+
+        context = (top_k, source_document, self.vector_store.generation)
+        all_results: List[Optional[List[RetrievalResult]]] = [None] * len(queries)
+        if self.cache is not None:
+            for i, query_embedding in enumerate(query_embeddings):
+                all_results[i] = self.cache.get(query_embedding, context)
+
+        misses = [i for i, results in enumerate(all_results) if results is None]
+        if misses:
+            logger.debug(
+                "Searching for top %d chunks for %d queries", top_k, len(misses)
+            )
+            search_results = self.vector_store.batch_search(
+                query_embeddings=[query_embeddings[i] for i in misses],
+                top_k=top_k,
+                source_document=source_document,
+            )
+            for i, chunks_with_scores in zip(misses, search_results, strict=True):
+                results = [
+                    RetrievalResult(chunk=chunk, score=score)
+                    for chunk, score in chunks_with_scores
+                ]
+                if self.cache is not None:
+                    self.cache.put(query_embeddings[i], context, results)
+                all_results[i] = results
+
+        logger.info("Retrieved chunks for %d queries", len(queries))
+
+        return [self._filter_by_score(results, min_score) for results in all_results]
+
+    def _filter_by_score(
+        self, results: List[RetrievalResult], min_score: Optional[float]
+    ) -> List[RetrievalResult]:
+        """Drop results scoring below min_score.
+
+        Results are ordered by score, highest first, so the ones to keep are
+        a prefix; a binary search finds where it ends without comparing
+        every result.
+
+        Args:
+            results: Results ordered by score (highest first).
+            min_score: Minimum similarity score, or None to keep everything.
+
+        Returns:
+            Results with score >= min_score.
+        """
+        if min_score is None or not results:
+            return results
+
+        original_count = len(results)
+        keep = bisect.bisect_right(results, -min_score, key=lambda r: -r.score)
+        results = results[:keep]
+        if len(results) < original_count:
+            logger.debug(
+                "Filtered %d results below min_score=%s",
+                original_count - len(results),
+                min_score,
+            )
         return results
 
     def _validate_query(self, query: str) -> None:
@@ -236,10 +589,8 @@ class Retriever:
         Raises:
             ValueError: If top_k is not a positive integer.
         """
-        # Check for bool first since bool is a subclass of int in Python
-        if isinstance(top_k, bool):
-            raise ValueError("top_k must be an integer, got bool")
-        if not isinstance(top_k, int):
+        # An exact type check rejects bool (a subclass of int) in one step
+        if type(top_k) is not int:
             raise ValueError(f"top_k must be an integer, got {type(top_k).__name__}")
         if top_k <= 0:
             raise ValueError(f"top_k must be positive, got {top_k}")
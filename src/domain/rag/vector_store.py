@@ -2,14 +2,17 @@
 
 import logging
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-import chromadb
-from chromadb.config import Settings as ChromaSettings
+import numpy as np
 
 from src.domain.models.chunk import Chunk
 from src.infrastructure.config import get_settings
 
+if TYPE_CHECKING:
+    # chromadb is slow to import; it is only loaded once a client is opened
+    from chromadb.api import ClientAPI
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,6 +61,8 @@ class VectorStore:
         self,
         persist_directory: Optional[str] = None,
         collection_name: Optional[str] = None,
+        client: Optional["ClientAPI"] = None,
+        collection_metadata: Optional[Dict[str, Any]] = None,
     ):
         """Initialize the vector store.
 
@@ -66,27 +71,52 @@ class VectorStore:
                 If None, uses settings.chroma_db_path.
             collection_name: Name of the collection to use.
                 If None, uses DEFAULT_COLLECTION_NAME.
+            client: Existing ChromaDB client to use, e.g. an in-memory
+                chromadb.EphemeralClient() shared by several stores. If None,
+                a persistent client is opened at persist_directory.
+            collection_metadata: Extra ChromaDB collection metadata, e.g. HNSW
+                index parameters such as {"hnsw:M": 24,
+                "hnsw:construction_ef": 128, "hnsw:search_ef": 100} for large
+                collections. Index parameters only take effect when the
+                collection is created. Keep "hnsw:space" at its default "l2":
+                similarity scores are derived from L2 distances.
         """
         settings = get_settings()
         self.persist_directory = persist_directory or settings.chroma_db_path
         self.collection_name = collection_name or self.DEFAULT_COLLECTION_NAME
+        self.collection_metadata = {
+            "description": "AnkiAI chunk embeddings for RAG",
+            **(collection_metadata or {}),
+        }
 
-        # Ensure directory exists
-        Path(self.persist_directory).mkdir(parents=True, exist_ok=True)
-
-        # Initialize ChromaDB client with persistent storage
-        self.client = chromadb.PersistentClient(
-            path=self.persist_directory,
-            settings=ChromaSettings(
-                anonymized_telemetry=False,
-                allow_reset=True,
-            ),
-        )
+        # Bumped on every add, delete or clear through this store, so
+        # callers caching search results can tell they are out of date
+        self.generation = 0
+
+        # Only a client opened here is closed by close()
+        self._owns_client = client is None
+        if client is not None:
+            self.client = client
+        else:
+            import chromadb
+            from chromadb.config import Settings as ChromaSettings
+
+            # Ensure directory exists
+            Path(self.persist_directory).mkdir(parents=True, exist_ok=True)
+
+            # Initialize ChromaDB client with persistent storage
+            self.client = chromadb.PersistentClient(
+                path=self.persist_directory,
+                settings=ChromaSettings(
+                    anonymized_telemetry=False,
+                    allow_reset=True,
+                ),
+            )
 
         # Get or create collection
         self.collection = self.client.get_or_create_collection(
             name=self.collection_name,
-            metadata={"description": "AnkiAI chunk embeddings for RAG"},
+            metadata=self.collection_metadata,
         )
 
         logger.info(
@@ -138,6 +168,7 @@ class VectorStore:
             documents=documents,
             metadatas=metadatas,
         )
+        self.generation += 1
 
         logger.info(
             f"Added {len(chunks)} chunks to collection '{self.collection_name}'"
@@ -171,54 +202,130 @@ class VectorStore:
             ...     print(f"Score: {score:.3f}")
             ...     print(f"Text: {chunk.text[:100]}...")
         """
-        if self.collection.count() == 0:
+        return self.batch_search([query_embedding], top_k, source_document)[0]
+
+    def search_ids(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        source_document: Optional[str] = None,
+    ) -> Tuple[List[str], List[float]]:
+        """Search for chunks similar to a query embedding, returning IDs only.
+
+        Like search(), but asks ChromaDB for distances only, so stored
+        embeddings, documents and metadata are neither transferred nor
+        turned into Chunk objects. For callers that only need rankings.
+
+        Args:
+            query_embedding: Query embedding vector (1536 dimensions).
+            top_k: Number of results to return (default: 5).
+            source_document: Optional filter to only search within a specific
+                source document.
+
+        Returns:
+            Tuple of (chunk IDs, similarity scores), both sorted by
+            similarity (highest first).
+        """
+        count = self.collection.count()
+        if count == 0:
             logger.warning("Collection is empty, returning no results")
-            return []
+            return [], []
 
-        # Build where clause for filtering
         where = None
         if source_document:
             where = {"source_document": source_document}
 
-        # Query ChromaDB
         results = self.collection.query(
             query_embeddings=[query_embedding],
-            n_results=min(top_k, self.collection.count()),
+            n_results=min(top_k, count),
             where=where,
-            include=["embeddings", "documents", "metadatas", "distances"],
+            include=["distances"],
         )
 
-        # Convert results to (Chunk, similarity) tuples
-        chunks_with_scores = []
-
         if not results["ids"] or not results["ids"][0]:
-            return []
+            return [], []
 
-        for i, chunk_id in enumerate(results["ids"][0]):
-            # Reconstruct chunk from stored data
-            chunk = self._metadata_to_chunk(
-                chunk_id=chunk_id,
-                text=results["documents"][0][i],
-                metadata=results["metadatas"][0][i],
-                embedding=(
-                    results["embeddings"][0][i] if results["embeddings"] else None
-                ),
-            )
+        # Same L2 distance to similarity conversion as batch_search()
+        similarities = [1 / (1 + distance) for distance in results["distances"][0]]
+        return list(results["ids"][0]), similarities
 
-            # Convert L2 distance to similarity score
-            # ChromaDB returns L2 distance (lower = more similar)
-            # We convert to similarity: 1 / (1 + distance)
-            distance = results["distances"][0][i]
-            similarity = 1 / (1 + distance)
+    def batch_search(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        source_document: Optional[str] = None,
+    ) -> List[List[Tuple[Chunk, float]]]:
+        """Search for chunks similar to each of several query embeddings.
 
-            chunks_with_scores.append((chunk, similarity))
+        All queries go to ChromaDB in a single query call, which is cheaper
+        than calling search() once per query.
 
-        logger.debug(
-            f"Search returned {len(chunks_with_scores)} results "
-            f"(top score: {chunks_with_scores[0][1]:.3f})"
+        Args:
+            query_embeddings: Query embedding vectors (1536 dimensions each).
+            top_k: Number of results to return per query (default: 5).
+            source_document: Optional filter to only search within a specific
+                source document.
+
+        Returns:
+            One list of (Chunk, similarity_score) tuples per query, in query
+            order, each sorted by similarity (highest first).
+        """
+        if not query_embeddings:
+            return []
+
+        count = self.collection.count()
+        if count == 0:
+            logger.warning("Collection is empty, returning no results")
+            return [[] for _ in query_embeddings]
+
+        # Build where clause for filtering
+        where = None
+        if source_document:
+            where = {"source_document": source_document}
+
+        # Query ChromaDB
+        results = self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=min(top_k, count),
+            where=where,
+            include=["embeddings", "documents", "metadatas", "distances"],
         )
 
-        return chunks_with_scores
+        all_results = []
+        for q in range(len(query_embeddings)):
+            ids = results["ids"][q] if results["ids"] else []
+
+            # Convert results to (Chunk, similarity) tuples
+            chunks_with_scores = []
+            for i, chunk_id in enumerate(ids):
+                # Reconstruct chunk from stored data
+                chunk = self._metadata_to_chunk(
+                    chunk_id=chunk_id,
+                    text=results["documents"][q][i],
+                    metadata=results["metadatas"][q][i],
+                    embedding=(
+                        results["embeddings"][q][i]
+                        if results["embeddings"] is not None
+                        else None
+                    ),
+                )
+
+                # Convert L2 distance to similarity score
+                # ChromaDB returns L2 distance (lower = more similar)
+                # We convert to similarity: 1 / (1 + distance)
+                distance = results["distances"][q][i]
+                similarity = 1 / (1 + distance)
+
+                chunks_with_scores.append((chunk, similarity))
+
+            if chunks_with_scores:
+                logger.debug(
+                    f"Search returned {len(chunks_with_scores)} results "
+                    f"(top score: {chunks_with_scores[0][1]:.3f})"
+                )
+            all_results.append(chunks_with_scores)
+
+        return all_results
 
     def get_chunk(self, chunk_id: str) -> Optional[Chunk]:
         """Retrieve a specific chunk by ID.
@@ -277,6 +384,7 @@ class VectorStore:
 
         if count > 0:
             self.collection.delete(ids=chunk_ids)
+            self.generation += 1
             logger.info(f"Deleted {count} chunks")
 
         return count
@@ -305,6 +413,7 @@ class VectorStore:
             return 0
 
         self.collection.delete(ids=results["ids"])
+        self.generation += 1
         logger.info(f"Deleted {len(results['ids'])} chunks from {source_document}")
         return len(results["ids"])
 
@@ -347,12 +456,31 @@ class VectorStore:
             self.client.delete_collection(self.collection_name)
             self.collection = self.client.create_collection(
                 name=self.collection_name,
-                metadata={"description": "AnkiAI chunk embeddings for RAG"},
+                metadata=self.collection_metadata,
             )
+            self.generation += 1
             logger.info(f"Cleared {count} chunks from collection")
         return count
 
-    def _chunk_to_metadata(self, chunk: Chunk) -> dict:
+    def close(self) -> None:
+        """Release the ChromaDB client opened by this store.
+
+        Closes the persistent client's database handles so the directory can
+        be reopened or removed straight away, rather than whenever the store
+        is garbage collected. An injected client is left open for its owner.
+        ChromaDB releases without Client.close() keep the client open, as
+        before. The store must not be used after closing.
+        """
+        if not self._owns_client:
+            return
+
+        close_client = getattr(self.client, "close", None)
+        if close_client is not None:
+            close_client()
+            logger.info(f"Closed VectorStore client at {self.persist_directory}")
+
+    @staticmethod
+    def _chunk_to_metadata(chunk: Chunk) -> dict:
         """Convert chunk fields to ChromaDB metadata dict.
 
         Args:
@@ -373,12 +501,12 @@ class VectorStore:
             "overlap_with_next": chunk.overlap_with_next or "",
         }
 
+    @staticmethod
     def _metadata_to_chunk(
-        self,
         chunk_id: str,
         text: str,
         metadata: dict,
-        embedding: Optional[List[float]] = None,
+        embedding: Optional[np.ndarray] = None,
     ) -> Chunk:
         """Reconstruct a Chunk from ChromaDB metadata.
 
@@ -386,11 +514,18 @@ class VectorStore:
             chunk_id: The chunk ID.
             text: The chunk text.
             metadata: The metadata dictionary.
-            embedding: Optional embedding vector.
+            embedding: Optional embedding vector (a NumPy array, as ChromaDB
+                returns them).
 
         Returns:
-            Reconstructed Chunk object.
+            Reconstructed Chunk object, with the embedding as float32 like
+            freshly generated ones.
         """
+        # ChromaDB hands back float64; halve the memory and match the dtype
+        # EmbeddingGenerator produces
+        if embedding is not None:
+            embedding = np.asarray(embedding, dtype=np.float32)
+
         # Parse page numbers from comma-separated string
         page_numbers_str = metadata.get("page_numbers", "")
         page_numbers = (
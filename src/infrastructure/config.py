@@ -15,6 +15,11 @@ class Settings(BaseSettings):
         claude_model: Claude model to use for generation
         claude_temperature: Temperature for Claude generation (0-1)
         claude_max_tokens: Maximum tokens for Claude response
+        claude_requests_per_minute: Client-side request limit for Claude (0 disables)
+        openai_embedding_requests_per_minute: Client-side request limit for
+            OpenAI embeddings (0 disables)
+        openai_embedding_tokens_per_minute: Client-side token limit for OpenAI
+            embeddings (0 disables)
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
     """
 
@@ -47,6 +52,23 @@ class Settings(BaseSettings):
         gt=0,
         description="Maximum tokens in Claude response",
     )
+    claude_requests_per_minute: int = Field(
+        default=50,
+        ge=0,
+        description="Client-side Claude request limit per minute (0 disables)",
+    )
+
+    # OpenAI Embedding Settings
+    openai_embedding_requests_per_minute: int = Field(
+        default=3000,
+        ge=0,
+        description="Client-side embedding request limit per minute (0 disables)",
+    )
+    openai_embedding_tokens_per_minute: int = Field(
+        default=1_000_000,
+        ge=0,
+        description="Client-side embedding token limit per minute (0 disables)",
+    )
 
     # Application Settings
     log_level: str = Field(
@@ -0,0 +1,81 @@
+"""Client-side rate limiting for external API calls."""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter.
+
+    The bucket holds up to ``capacity`` tokens and refills continuously at
+    ``refill_per_sec``. Each request takes a token. While tokens are left,
+    acquire() returns immediately; once the bucket is empty it sleeps just
+    long enough for the next token, so callers under quota never wait and
+    bursts above it are smoothed out before they reach the API.
+
+    Design decisions:
+    - Tokens are reserved under the lock and the sleep happens outside it,
+      so concurrent callers queue up in order without holding the lock
+    - Uses time.monotonic() so wall-clock changes don't affect refills
+    """
+
+    def __init__(self, capacity: float, refill_per_sec: float):
+        """Initialize a full token bucket.
+
+        Args:
+            capacity: Maximum number of tokens (largest allowed burst)
+            refill_per_sec: Tokens added per second (sustained rate)
+
+        Raises:
+            ValueError: If capacity or refill_per_sec is not positive
+        """
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        if refill_per_sec <= 0:
+            raise ValueError(f"refill_per_sec must be positive, got {refill_per_sec}")
+
+        self.capacity = float(capacity)
+        self.refill_per_sec = float(refill_per_sec)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: int) -> "TokenBucket":
+        """Create a bucket allowing requests_per_minute requests per minute.
+
+        Args:
+            requests_per_minute: Allowed requests per minute
+
+        Returns:
+            TokenBucket with a one-minute burst capacity
+        """
+        return cls(
+            capacity=requests_per_minute, refill_per_sec=requests_per_minute / 60
+        )
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens from the bucket, sleeping until they are available.
+
+        Args:
+            tokens: Number of tokens to take (default: 1)
+
+        Returns:
+            Seconds spent waiting (0.0 if tokens were available)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._last_refill) * self.refill_per_sec,
+            )
+            self._last_refill = now
+
+            # Going negative reserves tokens that haven't been refilled yet;
+            # later callers see the debt and wait behind this one
+            self._tokens -= tokens
+            wait_time = max(0.0, -self._tokens / self.refill_per_sec)
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
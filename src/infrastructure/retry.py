@@ -0,0 +1,42 @@
+"""Retry timing shared by the external API clients."""
+
+import math
+import random
+
+# Upper bound for a single retry backoff (before jitter), in seconds
+MAX_BACKOFF_SECONDS = 30.0
+
+# Upper bound for a server-requested retry-after wait, in seconds, so a
+# large header value can't park a worker thread for an hour
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """Compute how long to wait before retrying a failed request.
+
+    Honors the server's retry-after header when present, capped at
+    MAX_RETRY_AFTER_SECONDS; negative or non-finite values are ignored.
+    Otherwise uses
+    exponential backoff (1s, 2s, 4s, ... capped at MAX_BACKOFF_SECONDS)
+    with +/-50% jitter, so concurrent clients don't retry in lockstep.
+
+    Args:
+        error: The retryable error raised by the API call
+        attempt: The attempt number that failed (1-based)
+
+    Returns:
+        Seconds to sleep before the next attempt
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        try:
+            retry_after = float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+        else:
+            if math.isfinite(retry_after) and retry_after >= 0:
+                return min(retry_after, MAX_RETRY_AFTER_SECONDS)
+
+    backoff = min(MAX_BACKOFF_SECONDS, 2 ** (attempt - 1))
+    return backoff * random.uniform(0.5, 1.5)
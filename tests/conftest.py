@@ -1,9 +1,9 @@
 """Root conftest.py to make fixtures available across all test modules."""
 
+import os
 import sys
 from pathlib import Path
 
-import fitz  # PyMuPDF
 import pytest
 
 # Add src to path for imports
@@ -11,6 +11,19 @@ src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
 
 
+def _save_atomically(doc, pdf_path: Path) -> None:
+    """Save a PyMuPDF document so concurrent writers never expose a partial file.
+
+    Under pytest-xdist every worker runs session fixtures, so several may
+    create the same fixture PDF at once. Each writes to its own temp file and
+    renames it into place; os.replace is atomic, so readers see either no
+    file or a complete one.
+    """
+    tmp_path = pdf_path.with_name(f"{pdf_path.name}.{os.getpid()}.tmp")
+    doc.save(str(tmp_path))
+    os.replace(tmp_path, pdf_path)
+
+
 @pytest.fixture(scope="session")
 def fixtures_dir() -> Path:
     """Return the fixtures directory path."""
@@ -31,8 +44,11 @@ def sample_pdf_path(fixtures_dir: Path) -> Path:
     """
     pdf_path = fixtures_dir / "sample_technical.pdf"
 
-    # Create the PDF if it doesn't exist
+    # Create the PDF if it doesn't exist. PyMuPDF is imported only here so
+    # collecting the suite doesn't load it when the fixture is already on disk.
     if not pdf_path.exists():
+        import fitz  # PyMuPDF
+
         doc = fitz.open()  # Create new PDF
 
         # Define content for each page
@@ -141,12 +157,48 @@ throughout the entire lifecycle of AI systems.
         )
 
         # Save the PDF
-        doc.save(str(pdf_path))
+        _save_atomically(doc, pdf_path)
         doc.close()
 
     return pdf_path
 
 
+@pytest.fixture(scope="session")
+def sample_pdf_str(sample_pdf_path: Path) -> str:
+    """Return the sample PDF as a resolved path string.
+
+    Resolved once per session; this is also the form PDFParser stores in
+    Document.file_path.
+    """
+    return str(sample_pdf_path.resolve())
+
+
+@pytest.fixture(scope="session")
+def parsed_sample_doc(sample_pdf_str: str):
+    """Parse the whole sample PDF once per session.
+
+    Shared by tests that only read the resulting Document. Tests that modify
+    the document should parse their own copy.
+
+    Returns:
+        Document for all pages of the sample PDF
+    """
+    from src.domain.document_processing.pdf_parser import PDFParser
+
+    return PDFParser.parse(sample_pdf_str)
+
+
+@pytest.fixture(scope="session")
+def encoding():
+    """Load the cl100k_base tokenizer once per session.
+
+    Encodings are read-only, so every test can share one.
+    """
+    import tiktoken
+
+    return tiktoken.get_encoding("cl100k_base")
+
+
 @pytest.fixture(scope="session")
 def empty_pdf_path(fixtures_dir: Path) -> Path:
     """Create an empty PDF (no text content) for testing.
@@ -157,10 +209,12 @@ def empty_pdf_path(fixtures_dir: Path) -> Path:
     pdf_path = fixtures_dir / "empty.pdf"
 
     if not pdf_path.exists():
+        import fitz  # PyMuPDF
+
         doc = fitz.open()
         # Create a single blank page
         doc.new_page(width=595, height=842)
-        doc.save(str(pdf_path))
+        _save_atomically(doc, pdf_path)
         doc.close()
 
     return pdf_path
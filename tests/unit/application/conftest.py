@@ -0,0 +1,62 @@
+"""Shared fixtures for application-layer tests.
+
+Fixtures here are module-scoped rather than session-scoped: they are rebuilt
+once per test module (and per pytest-xdist worker) and torn down as soon as
+that module finishes, instead of lingering until the end of the run.
+"""
+
+import pytest
+
+from src.domain.models.document import Document, DocumentFormat, DocumentMetadata
+
+
+@pytest.fixture(scope="module")
+def service_module():
+    """Import the flashcard service module on first use.
+
+    The service pulls in the whole generation/RAG graph (anthropic, openai,
+    chromadb, tiktoken), so importing it lazily keeps ``--collect-only`` and
+    ``-k`` selections cheap and skips cleanly when those deps are missing.
+    """
+    return pytest.importorskip("src.application.flashcard_service")
+
+
+@pytest.fixture(scope="module")
+def output_path(tmp_path_factory) -> str:
+    """Return a throwaway .apkg path shared by the tests in a module."""
+    return str(tmp_path_factory.mktemp("decks") / "test.apkg")
+
+
+@pytest.fixture(scope="module")
+def mock_document():
+    """Create a mock Document for testing.
+
+    The service only reads from the document, so one instance per module
+    is safe to share.
+    """
+    return Document(
+        content="This is test content about machine learning.",
+        file_path="/fake/path/test.pdf",
+        page_range=(1, 1),
+        metadata=DocumentMetadata(
+            total_pages=5,
+            file_size_bytes=1000,
+            file_format=DocumentFormat.PDF,
+        ),
+    )
+
+
+@pytest.fixture(scope="module")
+def mock_usage_stats():
+    """Create mock usage stats (read-only, shared per module)."""
+    return {
+        "api_calls": 1,
+        "total_input_tokens": 500,
+        "total_output_tokens": 100,
+        "total_tokens": 600,
+        "estimated_cost": 0.0025,
+        "cost_breakdown": {
+            "input_cost": 0.0015,
+            "output_cost": 0.001,
+        },
+    }
@@ -4,32 +4,97 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.application.flashcard_service import (
-    FlashcardGeneratorService,
-    RAGConfig,
-    RAGSetupResult,
-)
 from src.domain.models.document import (
     Document,
     DocumentFormat,
     DocumentMetadata,
+    FlashcardResult,
+    GenerationResult,
     ProcessingStatus,
 )
 
+# The ClaudeClient attributes the service touches. Passing a plain name list
+# as spec_set catches typos without autospec's per-attribute class inspection.
+CLAUDE_CLIENT_SURFACE = (
+    "generate_flashcard",
+    "get_usage_stats",
+    "reset_stats",
+    "PRICE_PER_MILLION_INPUT",
+    "PRICE_PER_MILLION_OUTPUT",
+)
+
 
-@pytest.fixture
-def mock_document():
-    """Create a mock Document for testing."""
-    return Document(
-        content="This is test content about machine learning.",
-        file_path="/fake/path/test.pdf",
-        page_range=(1, 1),
-        metadata=DocumentMetadata(
-            total_pages=5,
-            file_size_bytes=1000,
-            file_format=DocumentFormat.PDF,
+# Prebuilt GenerationResult samples. The tests only call read-only methods
+# on them, so sharing one instance per scenario is safe.
+_PAGE_OK = FlashcardResult(
+    flashcards=[{"question": "Q", "answer": "A"}],
+    page_number=1,
+    success=True,
+)
+_PAGE_FAILED = FlashcardResult(
+    flashcards=[],
+    page_number=2,
+    success=False,
+    error_message="Error",
+)
+
+RESULT_ALL_SUCCESS = GenerationResult(
+    flashcards=[{"question": "Q", "answer": "A"}],
+    results=[_PAGE_OK],
+    total_attempted=1,
+    total_success=1,
+    total_failed=0,
+    total_tokens=100,
+    total_cost_usd=0.01,
+    status=ProcessingStatus.SUCCESS,
+)
+
+RESULT_PARTIAL = GenerationResult(
+    flashcards=[{"question": "Q", "answer": "A"}],
+    results=[_PAGE_OK, _PAGE_FAILED],
+    total_attempted=2,
+    total_success=1,
+    total_failed=1,
+    total_tokens=100,
+    total_cost_usd=0.01,
+    status=ProcessingStatus.PARTIAL,
+)
+
+RESULT_EMPTY = GenerationResult(
+    flashcards=[],
+    results=[],
+    total_attempted=0,
+    total_success=0,
+    total_failed=0,
+    total_tokens=0,
+    total_cost_usd=0.0,
+    status=ProcessingStatus.FAILED,
+)
+
+RESULT_FAILED_PAGES = GenerationResult(
+    flashcards=[{"question": "Q", "answer": "A"}],
+    results=[
+        _PAGE_OK,
+        _PAGE_FAILED,
+        FlashcardResult(
+            flashcards=[{"question": "Q2", "answer": "A2"}],
+            page_number=3,
+            success=True,
         ),
-    )
+        FlashcardResult(
+            flashcards=[],
+            page_number=4,
+            success=False,
+            error_message="Error",
+        ),
+    ],
+    total_attempted=4,
+    total_success=2,
+    total_failed=2,
+    total_tokens=200,
+    total_cost_usd=0.02,
+    status=ProcessingStatus.PARTIAL,
+)
 
 
 @pytest.fixture
@@ -41,22 +106,6 @@ def mock_flashcard():
     }
 
 
-@pytest.fixture
-def mock_usage_stats():
-    """Create mock usage stats."""
-    return {
-        "api_calls": 1,
-        "total_input_tokens": 500,
-        "total_output_tokens": 100,
-        "total_tokens": 600,
-        "estimated_cost": 0.0025,
-        "cost_breakdown": {
-            "input_cost": 0.0015,
-            "output_cost": 0.001,
-        },
-    }
-
-
 @pytest.mark.unit
 class TestFlashcardGeneratorService:
     """Test suite for FlashcardGeneratorService."""
@@ -72,28 +121,27 @@ class TestFlashcardGeneratorService:
         mock_document,
         mock_flashcard,
         mock_usage_stats,
-        tmp_path,
+        output_path,
+        service_module,
     ):
         """Test successful flashcard generation for a single page."""
         # Setup mocks
         mock_parser.parse.return_value = mock_document
 
-        mock_client_instance = MagicMock()
+        mock_client_instance = MagicMock(spec_set=CLAUDE_CLIENT_SURFACE)
         mock_client_instance.generate_flashcard.return_value = mock_flashcard
         mock_client_instance.get_usage_stats.return_value = mock_usage_stats
-        mock_client_instance.reset_stats = MagicMock()
         mock_client_instance.PRICE_PER_MILLION_INPUT = 3.0
         mock_client_instance.PRICE_PER_MILLION_OUTPUT = 15.0
         mock_claude.return_value = mock_client_instance
         mock_claude.PRICE_PER_MILLION_INPUT = 3.0
         mock_claude.PRICE_PER_MILLION_OUTPUT = 15.0
 
-        output_path = str(tmp_path / "test.apkg")
         mock_formatter.format_flashcards.return_value = output_path
         mock_formatter.create_tags_from_metadata.return_value = ["test-tag"]
 
         # Create service and generate
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
         # Replace the client with our mock
         service.claude_client = mock_client_instance
 
@@ -124,7 +172,8 @@ class TestFlashcardGeneratorService:
         mock_document,
         mock_flashcard,
         mock_usage_stats,
-        tmp_path,
+        output_path,
+        service_module,
     ):
         """Test partial success when some pages fail."""
         # First page succeeds, second fails
@@ -133,21 +182,19 @@ class TestFlashcardGeneratorService:
             Exception("Parse error"),
         ]
 
-        mock_client_instance = MagicMock()
+        mock_client_instance = MagicMock(spec_set=CLAUDE_CLIENT_SURFACE)
         mock_client_instance.generate_flashcard.return_value = mock_flashcard
         mock_client_instance.get_usage_stats.return_value = mock_usage_stats
-        mock_client_instance.reset_stats = MagicMock()
         mock_client_instance.PRICE_PER_MILLION_INPUT = 3.0
         mock_client_instance.PRICE_PER_MILLION_OUTPUT = 15.0
         mock_claude.return_value = mock_client_instance
         mock_claude.PRICE_PER_MILLION_INPUT = 3.0
         mock_claude.PRICE_PER_MILLION_OUTPUT = 15.0
 
-        output_path = str(tmp_path / "test.apkg")
         mock_formatter.format_flashcards.return_value = output_path
         mock_formatter.create_tags_from_metadata.return_value = ["test-tag"]
 
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
         service.claude_client = mock_client_instance
 
         result = service.generate_flashcards(
@@ -173,17 +220,17 @@ class TestFlashcardGeneratorService:
         mock_claude,
         mock_formatter,
         mock_usage_stats,
-        tmp_path,
+        output_path,
+        service_module,
     ):
         """Test complete failure when all pages fail."""
         mock_parser.parse.side_effect = Exception("Parse error")
 
-        mock_client_instance = MagicMock()
+        mock_client_instance = MagicMock(spec_set=CLAUDE_CLIENT_SURFACE)
         mock_client_instance.get_usage_stats.return_value = mock_usage_stats
-        mock_client_instance.reset_stats = MagicMock()
         mock_claude.return_value = mock_client_instance
 
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
         service.claude_client = mock_client_instance
 
         result = service.generate_flashcards(
@@ -191,7 +238,7 @@ class TestFlashcardGeneratorService:
             page_range=(1, 2),
             cards_per_page=1,
             difficulty="intermediate",
-            output_path=str(tmp_path / "test.apkg"),
+            output_path=output_path,
         )
 
         assert result.status == ProcessingStatus.FAILED
@@ -210,22 +257,21 @@ class TestFlashcardGeneratorService:
         mock_document,
         mock_flashcard,
         mock_usage_stats,
-        tmp_path,
+        output_path,
+        service_module,
     ):
         """Test that progress callback is called for each page."""
         mock_parser.parse.return_value = mock_document
 
-        mock_client_instance = MagicMock()
+        mock_client_instance = MagicMock(spec_set=CLAUDE_CLIENT_SURFACE)
         mock_client_instance.generate_flashcard.return_value = mock_flashcard
         mock_client_instance.get_usage_stats.return_value = mock_usage_stats
-        mock_client_instance.reset_stats = MagicMock()
         mock_client_instance.PRICE_PER_MILLION_INPUT = 3.0
         mock_client_instance.PRICE_PER_MILLION_OUTPUT = 15.0
         mock_claude.return_value = mock_client_instance
         mock_claude.PRICE_PER_MILLION_INPUT = 3.0
         mock_claude.PRICE_PER_MILLION_OUTPUT = 15.0
 
-        output_path = str(tmp_path / "test.apkg")
         mock_formatter.format_flashcards.return_value = output_path
         mock_formatter.create_tags_from_metadata.return_value = ["test-tag"]
 
@@ -234,7 +280,7 @@ class TestFlashcardGeneratorService:
         def track_progress(current, total, message):
             progress_calls.append((current, total, message))
 
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
         service.claude_client = mock_client_instance
 
         service.generate_flashcards(
@@ -266,7 +312,8 @@ class TestFlashcardGeneratorService:
         mock_formatter,
         mock_document,
         mock_usage_stats,
-        tmp_path,
+        output_path,
+        service_module,
     ):
         """Test that empty pages are skipped."""
         # Create document with empty content
@@ -282,12 +329,11 @@ class TestFlashcardGeneratorService:
         )
         mock_parser.parse.return_value = empty_doc
 
-        mock_client_instance = MagicMock()
+        mock_client_instance = MagicMock(spec_set=CLAUDE_CLIENT_SURFACE)
         mock_client_instance.get_usage_stats.return_value = mock_usage_stats
-        mock_client_instance.reset_stats = MagicMock()
         mock_claude.return_value = mock_client_instance
 
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
         service.claude_client = mock_client_instance
 
         result = service.generate_flashcards(
@@ -295,7 +341,7 @@ class TestFlashcardGeneratorService:
             page_range=(1, 1),
             cards_per_page=1,
             difficulty="intermediate",
-            output_path=str(tmp_path / "test.apkg"),
+            output_path=output_path,
         )
 
         # Empty page should be counted as failed
@@ -314,7 +360,8 @@ class TestFlashcardGeneratorService:
         mock_formatter,
         mock_document,
         mock_usage_stats,
-        tmp_path,
+        output_path,
+        service_module,
     ):
         """Test generating multiple cards per page."""
         mock_parser.parse.return_value = mock_document
@@ -325,21 +372,19 @@ class TestFlashcardGeneratorService:
             {"question": "Q2", "answer": "A2"},
         ]
 
-        mock_client_instance = MagicMock()
+        mock_client_instance = MagicMock(spec_set=CLAUDE_CLIENT_SURFACE)
         mock_client_instance.generate_flashcard.return_value = multiple_cards
         mock_client_instance.get_usage_stats.return_value = mock_usage_stats
-        mock_client_instance.reset_stats = MagicMock()
         mock_client_instance.PRICE_PER_MILLION_INPUT = 3.0
         mock_client_instance.PRICE_PER_MILLION_OUTPUT = 15.0
         mock_claude.return_value = mock_client_instance
         mock_claude.PRICE_PER_MILLION_INPUT = 3.0
         mock_claude.PRICE_PER_MILLION_OUTPUT = 15.0
 
-        output_path = str(tmp_path / "test.apkg")
         mock_formatter.format_flashcards.return_value = output_path
         mock_formatter.create_tags_from_metadata.return_value = ["test-tag"]
 
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
         service.claude_client = mock_client_instance
 
         result = service.generate_flashcards(
@@ -362,36 +407,35 @@ class TestFlashcardGeneratorService:
         mock_claude,
         mock_document,
         mock_flashcard,
-        tmp_path,
+        output_path,
+        service_module,
     ):
         """Test that token and cost tracking works correctly."""
         mock_parser.parse.return_value = mock_document
 
         # Setup mock with incrementing usage stats
-        mock_client_instance = MagicMock()
+        mock_client_instance = MagicMock(spec_set=CLAUDE_CLIENT_SURFACE)
         mock_client_instance.generate_flashcard.return_value = mock_flashcard
         mock_client_instance.PRICE_PER_MILLION_INPUT = 3.0
         mock_client_instance.PRICE_PER_MILLION_OUTPUT = 15.0
 
-        # Simulate accumulating stats
-        call_count = [0]
-
-        def get_stats():
-            call_count[0] += 1
-            return {
-                "api_calls": call_count[0],
-                "total_input_tokens": 500 * call_count[0],
-                "total_output_tokens": 100 * call_count[0],
-                "total_tokens": 600 * call_count[0],
-                "estimated_cost": 0.003 * call_count[0],
+        # Simulate accumulating stats: two pages read stats before and after
+        # each call, plus one final read for the totals.
+        stats_sequence = [
+            {
+                "api_calls": i,
+                "total_input_tokens": 500 * i,
+                "total_output_tokens": 100 * i,
+                "total_tokens": 600 * i,
+                "estimated_cost": 0.003 * i,
                 "cost_breakdown": {"input_cost": 0.0015, "output_cost": 0.0015},
             }
-
-        mock_client_instance.get_usage_stats = get_stats
-        mock_client_instance.reset_stats = MagicMock()
+            for i in range(1, 6)
+        ]
+        mock_client_instance.get_usage_stats = iter(stats_sequence).__next__
         mock_claude.return_value = mock_client_instance
 
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
         service.claude_client = mock_client_instance
 
         result = service.generate_flashcards(
@@ -399,7 +443,7 @@ class TestFlashcardGeneratorService:
             page_range=(1, 2),
             cards_per_page=1,
             difficulty="intermediate",
-            output_path=str(tmp_path / "test.apkg"),
+            output_path=output_path,
         )
 
         # Should have accumulated stats from both pages
@@ -413,146 +457,37 @@ class TestGenerationResult:
 
     def test_get_success_rate_all_success(self):
         """Test success rate calculation with all successes."""
-        from src.domain.models.document import (
-            FlashcardResult,
-            GenerationResult,
-            ProcessingStatus,
-        )
-
-        result = GenerationResult(
-            flashcards=[{"question": "Q", "answer": "A"}],
-            results=[
-                FlashcardResult(
-                    flashcards=[{"question": "Q", "answer": "A"}],
-                    page_number=1,
-                    success=True,
-                )
-            ],
-            total_attempted=1,
-            total_success=1,
-            total_failed=0,
-            total_tokens=100,
-            total_cost_usd=0.01,
-            status=ProcessingStatus.SUCCESS,
-        )
-
-        assert result.get_success_rate() == 100.0
+        assert RESULT_ALL_SUCCESS.get_success_rate() == 100.0
 
     def test_get_success_rate_partial(self):
         """Test success rate calculation with partial success."""
-        from src.domain.models.document import (
-            FlashcardResult,
-            GenerationResult,
-            ProcessingStatus,
-        )
-
-        result = GenerationResult(
-            flashcards=[{"question": "Q", "answer": "A"}],
-            results=[
-                FlashcardResult(
-                    flashcards=[{"question": "Q", "answer": "A"}],
-                    page_number=1,
-                    success=True,
-                ),
-                FlashcardResult(
-                    flashcards=[],
-                    page_number=2,
-                    success=False,
-                    error_message="Error",
-                ),
-            ],
-            total_attempted=2,
-            total_success=1,
-            total_failed=1,
-            total_tokens=100,
-            total_cost_usd=0.01,
-            status=ProcessingStatus.PARTIAL,
-        )
-
-        assert result.get_success_rate() == 50.0
+        assert RESULT_PARTIAL.get_success_rate() == 50.0
 
     def test_get_success_rate_zero_attempts(self):
         """Test success rate calculation with zero attempts."""
-        from src.domain.models.document import (
-            GenerationResult,
-            ProcessingStatus,
-        )
-
-        result = GenerationResult(
-            flashcards=[],
-            results=[],
-            total_attempted=0,
-            total_success=0,
-            total_failed=0,
-            total_tokens=0,
-            total_cost_usd=0.0,
-            status=ProcessingStatus.FAILED,
-        )
-
-        assert result.get_success_rate() == 0.0
+        assert RESULT_EMPTY.get_success_rate() == 0.0
 
     def test_get_failed_pages(self):
         """Test getting list of failed pages."""
-        from src.domain.models.document import (
-            FlashcardResult,
-            GenerationResult,
-            ProcessingStatus,
-        )
-
-        result = GenerationResult(
-            flashcards=[{"question": "Q", "answer": "A"}],
-            results=[
-                FlashcardResult(
-                    flashcards=[{"question": "Q", "answer": "A"}],
-                    page_number=1,
-                    success=True,
-                ),
-                FlashcardResult(
-                    flashcards=[],
-                    page_number=2,
-                    success=False,
-                    error_message="Error",
-                ),
-                FlashcardResult(
-                    flashcards=[{"question": "Q2", "answer": "A2"}],
-                    page_number=3,
-                    success=True,
-                ),
-                FlashcardResult(
-                    flashcards=[],
-                    page_number=4,
-                    success=False,
-                    error_message="Error",
-                ),
-            ],
-            total_attempted=4,
-            total_success=2,
-            total_failed=2,
-            total_tokens=200,
-            total_cost_usd=0.02,
-            status=ProcessingStatus.PARTIAL,
-        )
-
-        failed_pages = result.get_failed_pages()
-        assert failed_pages == [2, 4]
+        assert RESULT_FAILED_PAGES.get_failed_pages() == [2, 4]
 
 
 @pytest.mark.unit
 class TestRAGConfig:
     """Test suite for RAGConfig data class."""
 
-    def test_default_values(self):
+    def test_default_values(self, service_module):
         """Test RAGConfig has sensible defaults."""
-        config = RAGConfig()
+        config = service_module.RAGConfig()
 
         assert config.top_k == 3
         assert config.chunk_target_size == 800
         assert config.chunk_overlap_size == 100
         assert config.include_metadata is False
 
-    def test_custom_values(self):
+    def test_custom_values(self, service_module):
         """Test RAGConfig can be customized."""
-        config = RAGConfig(
+        config = service_module.RAGConfig(
             top_k=10,
             chunk_target_size=1000,
             chunk_overlap_size=150,
@@ -569,9 +504,9 @@ class TestRAGConfig:
 class TestRAGSetupResult:
     """Test suite for RAGSetupResult data class."""
 
-    def test_success_result(self):
+    def test_success_result(self, service_module):
         """Test successful RAG setup result."""
-        result = RAGSetupResult(
+        result = service_module.RAGSetupResult(
             success=True,
             num_chunks=50,
             embedding_tokens=10000,
@@ -586,9 +521,9 @@ class TestRAGSetupResult:
         assert result.collection_name == "test_collection"
         assert result.error_message is None
 
-    def test_failure_result(self):
+    def test_failure_result(self, service_module):
         """Test failed RAG setup result."""
-        result = RAGSetupResult(
+        result = service_module.RAGSetupResult(
             success=False,
             error_message="API key invalid",
         )
@@ -602,46 +537,9 @@ class TestRAGSetupResult:
 class TestFlashcardGeneratorServiceRAG:
     """Test suite for RAG functionality in FlashcardGeneratorService."""
 
-    @pytest.fixture
-    def mock_document(self):
-        """Create a mock Document for testing."""
-        return Document(
-            content="This is test content about machine learning and deep learning.",
-            file_path="/fake/path/test.pdf",
-            page_range=(1, 1),
-            metadata=DocumentMetadata(
-                total_pages=5,
-                file_size_bytes=1000,
-                file_format=DocumentFormat.PDF,
-            ),
-        )
-
-    @pytest.fixture
-    def mock_flashcard(self):
-        """Create a mock flashcard response."""
-        return {
-            "question": "What is machine learning?",
-            "answer": "A subset of AI that enables systems to learn from data.",
-        }
-
-    @pytest.fixture
-    def mock_usage_stats(self):
-        """Create mock usage stats."""
-        return {
-            "api_calls": 1,
-            "total_input_tokens": 500,
-            "total_output_tokens": 100,
-            "total_tokens": 600,
-            "estimated_cost": 0.0025,
-            "cost_breakdown": {
-                "input_cost": 0.0015,
-                "output_cost": 0.001,
-            },
-        }
-
-    def test_get_collection_name_deterministic(self):
+    def test_get_collection_name_deterministic(self, service_module):
         """Test that collection name generation is deterministic."""
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
 
         name1 = service._get_collection_name("/path/to/document.pdf")
         name2 = service._get_collection_name("/path/to/document.pdf")
@@ -649,18 +547,18 @@ class TestFlashcardGeneratorServiceRAG:
         assert name1 == name2
         assert "document" in name1 or "ankiai" in name1
 
-    def test_get_collection_name_unique(self):
+    def test_get_collection_name_unique(self, service_module):
         """Test that different paths produce different collection names."""
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
 
         name1 = service._get_collection_name("/path/to/doc1.pdf")
         name2 = service._get_collection_name("/path/to/doc2.pdf")
 
         assert name1 != name2
 
-    def test_build_retrieval_query(self):
+    def test_build_retrieval_query(self, service_module):
         """Test retrieval query building."""
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
 
         page_text = "Machine learning is a subset of artificial intelligence."
         query = service._build_retrieval_query(page_text, page_num=1)
@@ -670,9 +568,9 @@ class TestFlashcardGeneratorServiceRAG:
         # Query should include page text preview
         assert "Machine learning" in query or "artificial" in query
 
-    def test_build_retrieval_query_truncates_long_text(self):
+    def test_build_retrieval_query_truncates_long_text(self, service_module):
         """Test that long page text is truncated in query."""
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
 
         # Create very long text
         long_text = "A" * 1000
@@ -693,26 +591,25 @@ class TestFlashcardGeneratorServiceRAG:
         mock_document,
         mock_flashcard,
         mock_usage_stats,
-        tmp_path,
+        output_path,
+        service_module,
     ):
         """Test that baseline mode (use_rag=False) works as before."""
         mock_parser.parse.return_value = mock_document
 
-        mock_client_instance = MagicMock()
+        mock_client_instance = MagicMock(spec_set=CLAUDE_CLIENT_SURFACE)
         mock_client_instance.generate_flashcard.return_value = mock_flashcard
         mock_client_instance.get_usage_stats.return_value = mock_usage_stats
-        mock_client_instance.reset_stats = MagicMock()
         mock_client_instance.PRICE_PER_MILLION_INPUT = 3.0
         mock_client_instance.PRICE_PER_MILLION_OUTPUT = 15.0
         mock_claude.return_value = mock_client_instance
         mock_claude.PRICE_PER_MILLION_INPUT = 3.0
         mock_claude.PRICE_PER_MILLION_OUTPUT = 15.0
 
-        output_path = str(tmp_path / "test.apkg")
         mock_formatter.format_flashcards.return_value = output_path
         mock_formatter.create_tags_from_metadata.return_value = ["test-tag"]
 
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
         service.claude_client = mock_client_instance
 
         # Explicitly use baseline mode
@@ -751,7 +648,8 @@ class TestFlashcardGeneratorServiceRAG:
         mock_document,
         mock_flashcard,
         mock_usage_stats,
-        tmp_path,
+        output_path,
+        service_module,
     ):
         """Test that RAG mode properly sets up and uses retrieval."""
         mock_parser.parse.return_value = mock_document
@@ -789,21 +687,19 @@ class TestFlashcardGeneratorServiceRAG:
         mock_retriever.return_value = mock_retriever_instance
 
         # Mock Claude client
-        mock_client_instance = MagicMock()
+        mock_client_instance = MagicMock(spec_set=CLAUDE_CLIENT_SURFACE)
         mock_client_instance.generate_flashcard.return_value = mock_flashcard
         mock_client_instance.get_usage_stats.return_value = mock_usage_stats
-        mock_client_instance.reset_stats = MagicMock()
         mock_client_instance.PRICE_PER_MILLION_INPUT = 3.0
         mock_client_instance.PRICE_PER_MILLION_OUTPUT = 15.0
         mock_claude.return_value = mock_client_instance
         mock_claude.PRICE_PER_MILLION_INPUT = 3.0
         mock_claude.PRICE_PER_MILLION_OUTPUT = 15.0
 
-        output_path = str(tmp_path / "test_rag.apkg")
         mock_formatter.format_flashcards.return_value = output_path
         mock_formatter.create_tags_from_metadata.return_value = ["test-tag"]
 
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
         service.claude_client = mock_client_instance
 
         # Use RAG mode
@@ -814,7 +710,7 @@ class TestFlashcardGeneratorServiceRAG:
             difficulty="intermediate",
             output_path=output_path,
             use_rag=True,
-            rag_config=RAGConfig(top_k=3),
+            rag_config=service_module.RAGConfig(top_k=3),
         )
 
         # Should succeed
@@ -837,31 +733,30 @@ class TestFlashcardGeneratorServiceRAG:
         mock_document,
         mock_flashcard,
         mock_usage_stats,
-        tmp_path,
+        output_path,
+        service_module,
     ):
         """Test that RAG mode falls back to baseline if setup fails."""
         mock_parser.parse.return_value = mock_document
 
-        mock_client_instance = MagicMock()
+        mock_client_instance = MagicMock(spec_set=CLAUDE_CLIENT_SURFACE)
         mock_client_instance.generate_flashcard.return_value = mock_flashcard
         mock_client_instance.get_usage_stats.return_value = mock_usage_stats
-        mock_client_instance.reset_stats = MagicMock()
         mock_client_instance.PRICE_PER_MILLION_INPUT = 3.0
         mock_client_instance.PRICE_PER_MILLION_OUTPUT = 15.0
         mock_claude.return_value = mock_client_instance
         mock_claude.PRICE_PER_MILLION_INPUT = 3.0
         mock_claude.PRICE_PER_MILLION_OUTPUT = 15.0
 
-        output_path = str(tmp_path / "test.apkg")
         mock_formatter.format_flashcards.return_value = output_path
         mock_formatter.create_tags_from_metadata.return_value = ["test-tag"]
 
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
         service.claude_client = mock_client_instance
 
         # Mock _setup_rag to fail
         service._setup_rag = MagicMock(
-            return_value=RAGSetupResult(
+            return_value=service_module.RAGSetupResult(
                 success=False,
                 error_message="Embedding API error",
             )
@@ -875,7 +770,7 @@ class TestFlashcardGeneratorServiceRAG:
             difficulty="intermediate",
             output_path=output_path,
             use_rag=True,
-            rag_config=RAGConfig(top_k=3),
+            rag_config=service_module.RAGConfig(top_k=3),
         )
 
         # Should still succeed (fell back to baseline)
@@ -885,9 +780,9 @@ class TestFlashcardGeneratorServiceRAG:
         # Flashcard should NOT have RAG metadata (used baseline)
         assert "rag_metadata" not in result.flashcards[0]
 
-    def test_cleanup_rag_handles_none_components(self):
+    def test_cleanup_rag_handles_none_components(self, service_module):
         """Test that _cleanup_rag handles None components gracefully."""
-        service = FlashcardGeneratorService()
+        service = service_module.FlashcardGeneratorService()
 
         # These should all be None by default
         assert service._embedding_generator is None
@@ -897,11 +792,11 @@ class TestFlashcardGeneratorServiceRAG:
         # Should not raise
         service._cleanup_rag()
 
-    def test_rag_tags_added_to_deck(self):
+    def test_rag_tags_added_to_deck(self, service_module):
         """Test that RAG configuration is added as tag to Anki deck."""
         # This is implicitly tested through the integration tests,
         # but we verify the tag format here
-        rag_config = RAGConfig(top_k=5)
+        rag_config = service_module.RAGConfig(top_k=5)
         expected_tag = f"rag_k{rag_config.top_k}"
 
         assert expected_tag == "rag_k5"
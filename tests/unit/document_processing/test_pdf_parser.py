@@ -1,81 +1,117 @@
 """Unit tests for PDFParser."""
 
-from datetime import datetime
-from pathlib import Path
-from unittest.mock import MagicMock, Mock, patch
+import logging
+from datetime import date, datetime
+from unittest.mock import patch
 
 import pytest
 
-from src.domain.document_processing.pdf_parser import PDFParser
 from src.domain.models.document import Document, DocumentFormat, DocumentMetadata
 
+# Keep this module on one xdist worker under --dist=loadgroup so the
+# shared parser and parse cache below are built once instead of per worker.
+pytestmark = pytest.mark.xdist_group("pdf_parser")
 
-@pytest.fixture
+# Module path of the parser; also the name of its logger.
+PDF_PARSER_MODULE = "src.domain.document_processing.pdf_parser"
+
+# Keywords set on the sample PDF by the root conftest.
+EXPECTED_KEYWORDS = ("machine learning", "deep learning", "AI", "neural networks")
+
+
+@pytest.fixture(scope="session")
 def parser():
-    """Create a PDFParser instance."""
+    """Create a PDFParser instance shared by all tests (it holds no state).
+
+    The parser module is imported here rather than at module level so that
+    collecting the suite doesn't load PyMuPDF.
+    """
+    pytest.importorskip("fitz", reason="PDF tests require PyMuPDF")
+    from src.domain.document_processing.pdf_parser import PDFParser
+
     return PDFParser()
 
 
+class _ParseCache(dict):
+    """Parsed sample documents keyed by (start_page, end_page).
+
+    Missing ranges are parsed on first lookup. PDFParser is stateless and the
+    tests only read from the returned Document, so each range is parsed once.
+    """
+
+    def __init__(self, parser, file_path: str):
+        super().__init__()
+        self._parser = parser
+        self._file_path = file_path
+
+    def __missing__(self, page_range: tuple) -> Document:
+        start_page, end_page = page_range
+        doc = self._parser.parse(
+            self._file_path, start_page=start_page, end_page=end_page
+        )
+        self[page_range] = doc
+        return doc
+
+
 @pytest.mark.unit
 class TestPDFParserSupports:
     """Tests for the supports() method."""
 
-    def test_supports_pdf_format(self, parser):
-        """Should return True for 'pdf' format."""
-        assert parser.supports("pdf") is True
-
-    def test_supports_pdf_format_case_insensitive(self, parser):
-        """Should return True for 'PDF' (case-insensitive)."""
-        assert parser.supports("PDF") is True
-        assert parser.supports("Pdf") is True
-
-    def test_rejects_other_formats(self, parser):
-        """Should return False for non-PDF formats."""
-        assert parser.supports("docx") is False
-        assert parser.supports("txt") is False
-        assert parser.supports("epub") is False
-        assert parser.supports("") is False
+    @pytest.mark.parametrize(
+        "file_format, expected",
+        [
+            ("pdf", True),
+            ("PDF", True),
+            ("Pdf", True),
+            ("docx", False),
+            ("txt", False),
+            ("epub", False),
+            ("", False),
+        ],
+    )
+    def test_supports(self, parser, file_format, expected):
+        """Should accept 'pdf' case-insensitively and reject other formats."""
+        assert parser.supports(file_format) is expected
 
 
 @pytest.mark.unit
 class TestPDFParserParse:
     """Tests for the parse() method."""
 
-    def test_parse_valid_pdf(self, parser, sample_pdf_path):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def parses(cls, parser, sample_pdf_str):
+        """Share parsed sample documents across the tests in this class."""
+        return _ParseCache(parser, sample_pdf_str)
+
+    def test_parse_valid_pdf(self, parses, sample_pdf_str):
         """Should successfully parse a valid PDF and return Document."""
-        result = parser.parse(str(sample_pdf_path))
+        result = parses[(1, None)]
 
-        assert isinstance(result, Document)
+        assert isinstance(result, Document) and isinstance(
+            result.metadata, DocumentMetadata
+        )
         assert result.content is not None
         assert len(result.content) > 0
-        assert result.file_path == str(Path(sample_pdf_path).resolve())
+        assert result.file_path == sample_pdf_str
         assert result.page_range == (1, 5)  # Default: all pages
-        assert isinstance(result.metadata, DocumentMetadata)
-        assert isinstance(result.processed_at, datetime)
 
-    def test_parse_extracts_metadata(self, parser, sample_pdf_path):
+    def test_parse_extracts_metadata(self, parses):
         """Should extract metadata fields correctly."""
-        result = parser.parse(str(sample_pdf_path))
-
-        metadata = result.metadata
+        metadata = parses[(1, None)].metadata
         assert metadata.total_pages == 5
         assert metadata.file_size_bytes > 0
         assert metadata.file_format == DocumentFormat.PDF
         assert metadata.title == "Introduction to Machine Learning"
         assert metadata.author == "Dr. Jane Smith"
         assert metadata.subject == "Machine Learning and AI Fundamentals"
-        assert "machine learning" in metadata.keywords
-        assert "deep learning" in metadata.keywords
-        assert "AI" in metadata.keywords
-        assert "neural networks" in metadata.keywords
-        assert isinstance(metadata.creation_date, datetime)
-        assert metadata.creation_date.year == 2023
-        assert metadata.creation_date.month == 8
-        assert metadata.creation_date.day == 15
-
-    def test_parse_with_page_range(self, parser, sample_pdf_path):
+        assert set(EXPECTED_KEYWORDS) <= set(metadata.keywords)
+        # .date() only exists on date/datetime, so this also checks the type
+        assert metadata.creation_date.date() == date(2023, 8, 15)
+
+    def test_parse_with_page_range(self, parses):
         """Should correctly extract specified page range."""
-        result = parser.parse(str(sample_pdf_path), start_page=2, end_page=4)
+        result = parses[(2, 4)]
 
         assert result.page_range == (2, 4)
         assert result.get_page_count() == 3
@@ -86,24 +122,24 @@ class TestPDFParserParse:
         # Should not contain content from page 1
         assert "Machine Learning Fundamentals" not in result.content
 
-    def test_parse_single_page(self, parser, sample_pdf_path):
+    def test_parse_single_page(self, parses):
         """Should correctly extract a single page."""
-        result = parser.parse(str(sample_pdf_path), start_page=3, end_page=3)
+        result = parses[(3, 3)]
 
         assert result.page_range == (3, 3)
         assert result.get_page_count() == 1
         assert "Natural Language Processing" in result.content
 
-    def test_parse_default_page_range(self, parser, sample_pdf_path):
+    def test_parse_default_page_range(self, parses):
         """Should parse all pages when no end_page specified."""
-        result = parser.parse(str(sample_pdf_path), start_page=1)
+        result = parses[(1, None)]
 
         assert result.page_range == (1, 5)
         assert result.get_page_count() == 5
 
-    def test_parse_content_not_empty(self, parser, sample_pdf_path):
+    def test_parse_content_not_empty(self, parses):
         """Should extract non-empty text content."""
-        result = parser.parse(str(sample_pdf_path))
+        result = parses[(1, None)]
 
         assert len(result.content) > 0
         assert len(result) > 0  # Test __len__ method
@@ -111,28 +147,27 @@ class TestPDFParserParse:
         assert "Machine Learning" in result.content
         assert "Deep Learning" in result.content
 
-    def test_parse_calculates_page_count(self, parser, sample_pdf_path):
+    def test_parse_calculates_page_count(self, parses):
         """Should correctly calculate page count via get_page_count()."""
-        # Test different ranges
-        result1 = parser.parse(str(sample_pdf_path), start_page=1, end_page=5)
-        assert result1.get_page_count() == 5
-
-        result2 = parser.parse(str(sample_pdf_path), start_page=2, end_page=4)
-        assert result2.get_page_count() == 3
-
-        result3 = parser.parse(str(sample_pdf_path), start_page=1, end_page=1)
-        assert result3.get_page_count() == 1
-
-    def test_keywords_parsing(self, parser, sample_pdf_path):
+        full = parses[(1, None)]
+        assert full.get_page_count() == 5
+
+        # The count is pure arithmetic on page_range, so other ranges don't
+        # need another trip through PyMuPDF.
+        for page_range, expected in [((2, 4), 3), ((1, 1), 1)]:
+            doc = Document(
+                content="",
+                file_path="/fake/path.pdf",
+                page_range=page_range,
+                metadata=full.metadata,
+            )
+            assert doc.get_page_count() == expected
+
+    def test_keywords_parsing(self, parses):
         """Should correctly parse comma-separated keywords."""
-        result = parser.parse(str(sample_pdf_path))
-
-        keywords = result.metadata.keywords
+        keywords = parses[(1, None)].metadata.keywords
         assert len(keywords) == 4
-        assert "machine learning" in keywords
-        assert "deep learning" in keywords
-        assert "AI" in keywords
-        assert "neural networks" in keywords
+        assert set(EXPECTED_KEYWORDS) <= set(keywords)
         # Should not have empty strings or extra whitespace
         assert "" not in keywords
         assert all(k == k.strip() for k in keywords)
@@ -142,44 +177,50 @@ class TestPDFParserParse:
 class TestPDFParserValidation:
     """Tests for input validation and error handling."""
 
-    def test_invalid_page_range_start_greater_than_end(self, parser, sample_pdf_path):
+    def test_invalid_page_range_start_greater_than_end(self, parser, sample_pdf_str):
         """Should raise ValueError when start > end."""
         with pytest.raises(ValueError, match="Invalid page range: start.*>.*end"):
-            parser.parse(str(sample_pdf_path), start_page=5, end_page=2)
+            parser.parse(sample_pdf_str, start_page=5, end_page=2)
 
-    def test_invalid_page_range_zero_indexed(self, parser, sample_pdf_path):
+    def test_invalid_page_range_zero_indexed(self, parser, sample_pdf_str):
         """Should raise ValueError for start=0 (pages are 1-indexed)."""
         with pytest.raises(ValueError, match="pages are 1-indexed"):
-            parser.parse(str(sample_pdf_path), start_page=0, end_page=5)
+            parser.parse(sample_pdf_str, start_page=0, end_page=5)
 
-    def test_invalid_page_range_negative_start(self, parser, sample_pdf_path):
+    def test_invalid_page_range_negative_start(self, parser, sample_pdf_str):
         """Should raise ValueError for negative start page."""
         with pytest.raises(ValueError, match="pages are 1-indexed"):
-            parser.parse(str(sample_pdf_path), start_page=-1, end_page=5)
+            parser.parse(sample_pdf_str, start_page=-1, end_page=5)
 
-    def test_invalid_page_range_start_exceeds_total(self, parser, sample_pdf_path):
+    def test_invalid_page_range_start_exceeds_total(self, parser, sample_pdf_str):
         """Should raise ValueError when start exceeds total pages."""
         with pytest.raises(ValueError, match="start.*exceeds total pages"):
-            parser.parse(str(sample_pdf_path), start_page=10, end_page=15)
+            parser.parse(sample_pdf_str, start_page=10, end_page=15)
 
-    def test_page_range_exceeds_document(self, parser, sample_pdf_path, caplog):
+    def test_page_range_exceeds_document(self, parser, sample_pdf_str, caplog):
         """Should clip end_page to document length and log warning."""
-        import logging
+        caplog.set_level(logging.WARNING, logger=PDF_PARSER_MODULE)
 
-        caplog.set_level(logging.WARNING)
-
-        result = parser.parse(str(sample_pdf_path), start_page=1, end_page=10)
+        result = parser.parse(sample_pdf_str, start_page=1, end_page=10)
 
         # Should clip to actual page count
         assert result.page_range == (1, 5)
         assert result.get_page_count() == 5
 
         # Should log a warning
-        assert "Page range exceeds document length" in caplog.text
-        assert "Clipping to page 5" in caplog.text
-
-    def test_parse_nonexistent_file(self, parser):
+        warnings = [
+            r.getMessage()
+            for r in caplog.records
+            if r.name == PDF_PARSER_MODULE and r.levelno == logging.WARNING
+        ]
+        assert any(
+            "Page range exceeds document length" in m and "Clipping to page 5" in m
+            for m in warnings
+        )
+
+    def test_parse_nonexistent_file(self, parser, monkeypatch):
         """Should raise FileNotFoundError for non-existent file."""
+        monkeypatch.setattr(f"{PDF_PARSER_MODULE}.os.path.exists", lambda path: False)
         with pytest.raises(FileNotFoundError, match="File not found"):
             parser.parse("/path/to/nonexistent/file.pdf")
 
@@ -188,81 +229,85 @@ class TestPDFParserValidation:
 class TestPDFParserDateParsing:
     """Tests for PDF date parsing functionality."""
 
-    def test_parse_pdf_date_valid(self):
-        """Should parse valid PDF date string."""
-        date_str = "D:20230815143022+02'00'"
-        result = PDFParser._parse_pdf_date(date_str)
-
-        assert result is not None
-        assert isinstance(result, datetime)
-        assert result.year == 2023
-        assert result.month == 8
-        assert result.day == 15
-        assert result.hour == 14
-        assert result.minute == 30
-        assert result.second == 22
-
-    def test_parse_pdf_date_without_prefix(self):
-        """Should parse PDF date without 'D:' prefix."""
-        date_str = "20230815143022"
-        result = PDFParser._parse_pdf_date(date_str)
-
-        assert result is not None
-        assert result.year == 2023
-        assert result.month == 8
-        assert result.day == 15
-
-    def test_parse_pdf_date_invalid(self):
-        """Should return None for invalid date string."""
-        result = PDFParser._parse_pdf_date("invalid_date")
-        assert result is None
-
-    def test_parse_pdf_date_empty(self):
-        """Should return None for empty date string."""
-        result = PDFParser._parse_pdf_date("")
-        assert result is None
-
-    def test_parse_pdf_date_none(self):
-        """Should return None for None input."""
-        result = PDFParser._parse_pdf_date(None)
-        assert result is None
+    @pytest.mark.parametrize(
+        "date_str, expected",
+        [
+            ("D:20230815143022+02'00'", datetime(2023, 8, 15, 14, 30, 22)),
+            ("20230815143022", datetime(2023, 8, 15, 14, 30, 22)),
+            ("invalid_date", None),
+            ("", None),
+            (None, None),
+        ],
+        ids=["valid", "without_prefix", "invalid", "empty", "none"],
+    )
+    def test_parse_pdf_date(self, parser, date_str, expected):
+        """Should parse PDF date strings, returning None when unparseable."""
+        assert parser._parse_pdf_date(date_str) == expected
+
+
+class _FakePage:
+    """Minimal stand-in for a fitz page."""
+
+    def __init__(self, text: str):
+        self._text = text
+
+    def get_text(self, *args) -> str:
+        return self._text
+
+
+class _FakePDF:
+    """Minimal stand-in for a fitz document.
+
+    PDFParser only calls len(), indexes pages, reads .metadata and closes
+    the document, so a plain class is enough and far cheaper than a MagicMock.
+    """
+
+    def __init__(self, metadata: dict, page_texts: list[str]):
+        self.metadata = metadata
+        self._pages = [_FakePage(text) for text in page_texts]
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def __getitem__(self, idx: int) -> _FakePage:
+        return self._pages[idx]
+
+    def close(self) -> None:
+        pass
 
 
 @pytest.mark.unit
 class TestPDFParserMetadataExtraction:
     """Tests for metadata extraction with various scenarios."""
 
-    @patch("fitz.open")
-    @patch("os.path.exists")
-    @patch("os.path.getsize")
+    @pytest.fixture
+    def fake_fs(self, monkeypatch):
+        """Pretend any path exists and is 1024 bytes."""
+        monkeypatch.setattr("os.path.exists", lambda path: True)
+        monkeypatch.setattr("os.path.getsize", lambda path: 1024)
+
+    @pytest.fixture(scope="class")
+    @classmethod
+    def mock_fitz_open(cls):
+        """Patch fitz.open once for the whole class; tests set return_value."""
+        with patch("fitz.open") as mock_open:
+            yield mock_open
+
     def test_extract_metadata_with_missing_fields(
-        self, mock_getsize, mock_exists, mock_fitz_open, parser
+        self, mock_fitz_open, parser, fake_fs
     ):
         """Should handle missing optional metadata fields gracefully."""
-        # Setup mocks
-        mock_exists.return_value = True
-        mock_getsize.return_value = 1024
-
         # Create mock document with minimal metadata
-        mock_doc = MagicMock()
-        mock_doc.__len__ = Mock(return_value=3)
-        mock_doc.metadata = {
-            "title": None,
-            "author": None,
-            "subject": None,
-            "keywords": None,
-            "creationDate": None,
-        }
-
-        # Create mock pages
-        mock_pages = []
-        for i in range(3):
-            mock_page = MagicMock()
-            mock_page.get_text.return_value = f"Page {i+1} content"
-            mock_pages.append(mock_page)
-
-        mock_doc.__getitem__ = lambda self, idx: mock_pages[idx]
-        mock_fitz_open.return_value = mock_doc
+        mock_fitz_open.return_value = _FakePDF(
+            {
+                "title": None,
+                "author": None,
+                "subject": None,
+                "keywords": None,
+                "creationDate": None,
+            },
+            [f"Page {i+1} content" for i in range(3)],
+        )
 
         result = parser.parse("/fake/path.pdf")
 
@@ -275,51 +320,23 @@ class TestPDFParserMetadataExtraction:
         assert result.metadata.total_pages == 3
         assert result.metadata.file_size_bytes == 1024
 
-    @patch("fitz.open")
-    @patch("os.path.exists")
-    @patch("os.path.getsize")
     def test_extract_metadata_with_empty_keywords(
-        self, mock_getsize, mock_exists, mock_fitz_open, parser
+        self, mock_fitz_open, parser, fake_fs
     ):
         """Should handle empty keywords string correctly."""
-        # Setup mocks
-        mock_exists.return_value = True
-        mock_getsize.return_value = 1024
-
-        mock_doc = MagicMock()
-        mock_doc.__len__ = Mock(return_value=1)
-        mock_doc.metadata = {"keywords": ""}
-
-        mock_page = MagicMock()
-        mock_page.get_text.return_value = "Content"
-        mock_doc.__getitem__ = lambda self, idx: mock_page
-
-        mock_fitz_open.return_value = mock_doc
+        mock_fitz_open.return_value = _FakePDF({"keywords": ""}, ["Content"])
 
         result = parser.parse("/fake/path.pdf")
 
         assert result.metadata.keywords == []
 
-    @patch("fitz.open")
-    @patch("os.path.exists")
-    @patch("os.path.getsize")
     def test_extract_metadata_with_whitespace_keywords(
-        self, mock_getsize, mock_exists, mock_fitz_open, parser
+        self, mock_fitz_open, parser, fake_fs
     ):
         """Should trim whitespace from keywords."""
-        # Setup mocks
-        mock_exists.return_value = True
-        mock_getsize.return_value = 1024
-
-        mock_doc = MagicMock()
-        mock_doc.__len__ = Mock(return_value=1)
-        mock_doc.metadata = {"keywords": "  keyword1  ,  keyword2  , keyword3  "}
-
-        mock_page = MagicMock()
-        mock_page.get_text.return_value = "Content"
-        mock_doc.__getitem__ = lambda self, idx: mock_page
-
-        mock_fitz_open.return_value = mock_doc
+        mock_fitz_open.return_value = _FakePDF(
+            {"keywords": "  keyword1  ,  keyword2  , keyword3  "}, ["Content"]
+        )
 
         result = parser.parse("/fake/path.pdf")
 
@@ -330,10 +347,10 @@ class TestPDFParserMetadataExtraction:
 class TestPDFParserStateless:
     """Tests to verify stateless behavior."""
 
-    def test_multiple_parses_independent(self, parser, sample_pdf_path):
+    def test_multiple_parses_independent(self, parser, sample_pdf_str):
         """Should handle multiple parse calls independently (stateless)."""
-        result1 = parser.parse(str(sample_pdf_path), start_page=1, end_page=2)
-        result2 = parser.parse(str(sample_pdf_path), start_page=3, end_page=5)
+        result1 = parser.parse(sample_pdf_str, start_page=1, end_page=2)
+        result2 = parser.parse(sample_pdf_str, start_page=3, end_page=5)
 
         # Results should be independent
         assert result1.page_range == (1, 2)
@@ -1,6 +1,7 @@
 """Unit tests for ClaudeClient."""
 
-from unittest.mock import Mock, patch
+from collections import namedtuple
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 from anthropic import (
@@ -16,6 +17,12 @@ from src.domain.generation.claude_client import (
     extract_json_from_text,
 )
 
+# Lightweight stand-ins for Anthropic response objects. The client only reads
+# these attributes, and namedtuples are far cheaper to build than Mocks.
+FakeContent = namedtuple("FakeContent", ["text"])
+FakeUsage = namedtuple("FakeUsage", ["input_tokens", "output_tokens"])
+FakeResp = namedtuple("FakeResp", ["content", "usage"])
+
 
 @pytest.mark.unit
 class TestClaudeClient:
@@ -30,6 +37,7 @@ class TestClaudeClient:
             settings.claude_model = "claude-sonnet-4-5-20250929"
             settings.claude_temperature = 0.7
             settings.claude_max_tokens = 1024
+            settings.claude_requests_per_minute = 50
             mock.return_value = settings
             yield mock
 
@@ -37,7 +45,7 @@ class TestClaudeClient:
     def client(self, mock_settings):
         """Create a ClaudeClient instance for testing."""
         # Disable rate limiting in tests to avoid interfering with retry timing tests
-        return ClaudeClient(min_request_interval=0)
+        return ClaudeClient(requests_per_minute=0)
 
     def test_initialization(self, client):
         """Test client initialization."""
@@ -49,18 +57,46 @@ class TestClaudeClient:
         assert client.total_output_tokens == 0
         assert client.api_calls == 0
 
+    def test_initialization_uses_slots(self, client):
+        """Test that instances have no __dict__ (attributes live in slots)."""
+        assert not hasattr(client, "__dict__")
+        with pytest.raises(AttributeError):
+            client.unknown_attribute = 1
+
     def test_initialization_with_custom_api_key(self, mock_settings):
         """Test initialization with custom API key."""
         client = ClaudeClient(api_key="custom-key")
         assert client.api_key == "custom-key"
 
+    @patch.dict("src.domain.generation.claude_client._ANTHROPIC_CLIENTS", clear=True)
+    @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    def test_anthropic_client_shared_per_api_key(self, mock_anthropic, mock_settings):
+        """Test that instances with the same key share one SDK client."""
+        mock_anthropic.side_effect = lambda api_key: Mock(api_key=api_key)
+
+        first = ClaudeClient()
+        second = ClaudeClient()
+        other = ClaudeClient(api_key="other-key")
+
+        assert first.client is second.client
+        assert other.client is not first.client
+        assert mock_anthropic.call_count == 2
+
+    def test_initialization_rate_limiter(self, mock_settings):
+        """Test that the rate limiter follows settings and can be disabled."""
+        client = ClaudeClient()
+        assert client.rate_limiter.capacity == 50
+        assert client.rate_limiter.refill_per_sec == pytest.approx(50 / 60)
+
+        assert ClaudeClient(requests_per_minute=0).rate_limiter is None
+
     @patch("src.domain.generation.claude_client.anthropic.Anthropic")
     def test_generate_flashcard_success(self, mock_anthropic, client):
         """Test successful flashcard generation."""
         # Mock API response
-        mock_response = Mock()
-        mock_response.content = [Mock(text='{"question": "Q?", "answer": "A."}')]
-        mock_response.usage = Mock(input_tokens=100, output_tokens=50)
+        mock_response = FakeResp(
+            [FakeContent('{"question": "Q?", "answer": "A."}')], FakeUsage(100, 50)
+        )
 
         mock_anthropic.return_value.messages.create.return_value = mock_response
         client.client = mock_anthropic.return_value
@@ -80,13 +116,14 @@ class TestClaudeClient:
     def test_generate_flashcard_multiple_cards(self, mock_anthropic, client):
         """Test generation of multiple flashcards."""
         # Mock API response with array
-        mock_response = Mock()
-        mock_response.content = [
-            Mock(
-                text='[{"question": "Q1?", "answer": "A1."}, {"question": "Q2?", "answer": "A2."}]'
-            )
-        ]
-        mock_response.usage = Mock(input_tokens=150, output_tokens=75)
+        mock_response = FakeResp(
+            content=[
+                FakeContent(
+                    '[{"question": "Q1?", "answer": "A1."}, {"question": "Q2?", "answer": "A2."}]'
+                )
+            ],
+            usage=FakeUsage(150, 75),
+        )
 
         mock_anthropic.return_value.messages.create.return_value = mock_response
         client.client = mock_anthropic.return_value
@@ -100,17 +137,36 @@ class TestClaudeClient:
         assert result[0] == {"question": "Q1?", "answer": "A1."}
         assert result[1] == {"question": "Q2?", "answer": "A2."}
 
+    def test_generate_flashcard_streaming(self, client):
+        """Test that streamed text deltas are joined and usage is tracked."""
+        stream = Mock()
+        stream.text_stream = iter(['{"question": ', '"Q?", "answer"', ': "A."}'])
+        stream.get_final_message.return_value = FakeResp([], FakeUsage(100, 50))
+
+        client.stream = True
+        client.client = MagicMock()
+        client.client.messages.stream.return_value.__enter__.return_value = stream
+
+        result = client.generate_flashcard("Test prompt")
+
+        assert result == {"question": "Q?", "answer": "A."}
+        assert client.total_input_tokens == 100
+        assert client.total_output_tokens == 50
+        assert client.api_calls == 1
+        client.client.messages.create.assert_not_called()
+
     @patch("src.domain.generation.claude_client.anthropic.Anthropic")
     def test_generate_flashcard_with_surrounding_text(self, mock_anthropic, client):
         """Test parsing JSON with surrounding text."""
         # Mock API response with surrounding text
-        mock_response = Mock()
-        mock_response.content = [
-            Mock(
-                text='Here is the flashcard:\n{"question": "Q?", "answer": "A."}\n\nI hope this helps!'
-            )
-        ]
-        mock_response.usage = Mock(input_tokens=100, output_tokens=60)
+        mock_response = FakeResp(
+            content=[
+                FakeContent(
+                    'Here is the flashcard:\n{"question": "Q?", "answer": "A."}\n\nI hope this helps!'
+                )
+            ],
+            usage=FakeUsage(100, 60),
+        )
 
         mock_anthropic.return_value.messages.create.return_value = mock_response
         client.client = mock_anthropic.return_value
@@ -156,15 +212,16 @@ class TestClaudeClient:
         assert mock_anthropic.return_value.messages.create.call_count == 1
 
     @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    @patch("src.infrastructure.retry.random.uniform", return_value=1.0)
     @patch("src.domain.generation.claude_client.time.sleep")
     def test_generate_flashcard_rate_limit_retry_success(
-        self, mock_sleep, mock_anthropic, client
+        self, mock_sleep, mock_uniform, mock_anthropic, client
     ):
         """Test retry on rate limit error."""
         # First call fails, second succeeds
-        mock_response = Mock()
-        mock_response.content = [Mock(text='{"question": "Q?", "answer": "A."}')]
-        mock_response.usage = Mock(input_tokens=100, output_tokens=50)
+        mock_response = FakeResp(
+            [FakeContent('{"question": "Q?", "answer": "A."}')], FakeUsage(100, 50)
+        )
 
         mock_anthropic.return_value.messages.create.side_effect = [
             RateLimitError("Rate limited", response=Mock(), body=None),
@@ -187,9 +244,9 @@ class TestClaudeClient:
     ):
         """Test retry on server error."""
         # First call fails, second succeeds
-        mock_response = Mock()
-        mock_response.content = [Mock(text='{"question": "Q?", "answer": "A."}')]
-        mock_response.usage = Mock(input_tokens=100, output_tokens=50)
+        mock_response = FakeResp(
+            [FakeContent('{"question": "Q?", "answer": "A."}')], FakeUsage(100, 50)
+        )
 
         mock_anthropic.return_value.messages.create.side_effect = [
             InternalServerError("Server error", response=Mock(), body=None),
@@ -210,9 +267,9 @@ class TestClaudeClient:
     ):
         """Test retry on connection error."""
         # First call fails, second succeeds
-        mock_response = Mock()
-        mock_response.content = [Mock(text='{"question": "Q?", "answer": "A."}')]
-        mock_response.usage = Mock(input_tokens=100, output_tokens=50)
+        mock_response = FakeResp(
+            [FakeContent('{"question": "Q?", "answer": "A."}')], FakeUsage(100, 50)
+        )
 
         # APIConnectionError requires message and request parameters
         connection_error = APIConnectionError(
@@ -252,11 +309,12 @@ class TestClaudeClient:
         assert mock_sleep.call_count == 2
 
     @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    @patch("src.infrastructure.retry.random.uniform", return_value=1.0)
     @patch("src.domain.generation.claude_client.time.sleep")
     def test_generate_flashcard_exponential_backoff(
-        self, mock_sleep, mock_anthropic, client
+        self, mock_sleep, mock_uniform, mock_anthropic, client
     ):
-        """Test exponential backoff timing."""
+        """Test exponential backoff timing (jitter factor pinned to 1.0)."""
         # All calls fail
         mock_anthropic.return_value.messages.create.side_effect = RateLimitError(
             "Rate limited", response=Mock(), body=None
@@ -271,13 +329,51 @@ class TestClaudeClient:
         assert mock_sleep.call_count == 2
         mock_sleep.assert_any_call(1)  # First retry
         mock_sleep.assert_any_call(2)  # Second retry
+        mock_uniform.assert_called_with(0.5, 1.5)
+
+    @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    @patch("src.domain.generation.claude_client.time.sleep")
+    def test_generate_flashcard_backoff_jitter_range(
+        self, mock_sleep, mock_anthropic, client
+    ):
+        """Test that jittered backoff stays within +/-50% of the base delay."""
+        mock_anthropic.return_value.messages.create.side_effect = RateLimitError(
+            "Rate limited", response=Mock(), body=None
+        )
+        client.client = mock_anthropic.return_value
+
+        with pytest.raises(RateLimitError):
+            client.generate_flashcard("Test prompt", max_retries=3)
+
+        first, second = (c.args[0] for c in mock_sleep.call_args_list)
+        assert 0.5 <= first <= 1.5
+        assert 1.0 <= second <= 3.0
+
+    @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    @patch("src.domain.generation.claude_client.time.sleep")
+    def test_generate_flashcard_honors_retry_after(
+        self, mock_sleep, mock_anthropic, client
+    ):
+        """Test that the retry-after header overrides the computed backoff."""
+        mock_response = FakeResp(
+            [FakeContent('{"question": "Q?", "answer": "A."}')], FakeUsage(100, 50)
+        )
+
+        rate_limited = Mock(headers={"retry-after": "7"})
+        mock_anthropic.return_value.messages.create.side_effect = [
+            RateLimitError("Rate limited", response=rate_limited, body=None),
+            mock_response,
+        ]
+        client.client = mock_anthropic.return_value
+
+        client.generate_flashcard("Test prompt")
+
+        mock_sleep.assert_called_once_with(7.0)
 
     @patch("src.domain.generation.claude_client.anthropic.Anthropic")
     def test_generate_flashcard_invalid_json_raises_error(self, mock_anthropic, client):
         """Test that invalid JSON raises ValueError."""
-        mock_response = Mock()
-        mock_response.content = [Mock(text="This is not JSON")]
-        mock_response.usage = Mock(input_tokens=100, output_tokens=50)
+        mock_response = FakeResp([FakeContent("This is not JSON")], FakeUsage(100, 50))
 
         mock_anthropic.return_value.messages.create.return_value = mock_response
         client.client = mock_anthropic.return_value
@@ -289,9 +385,9 @@ class TestClaudeClient:
     @patch("src.domain.generation.claude_client.anthropic.Anthropic")
     def test_generate_flashcard_missing_required_field(self, mock_anthropic, client):
         """Test that flashcard missing required field raises error."""
-        mock_response = Mock()
-        mock_response.content = [Mock(text='{"question": "Q?"}')]  # Missing answer
-        mock_response.usage = Mock(input_tokens=100, output_tokens=50)
+        mock_response = FakeResp(
+            [FakeContent('{"question": "Q?"}')], FakeUsage(100, 50)
+        )  # Missing answer
 
         mock_anthropic.return_value.messages.create.return_value = mock_response
         client.client = mock_anthropic.return_value
@@ -300,12 +396,25 @@ class TestClaudeClient:
         with pytest.raises(ValueError, match="missing required field"):
             client.generate_flashcard("Test prompt")
 
+    @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    def test_generate_flashcard_non_object_card(self, mock_anthropic, client):
+        """Test that array items which aren't objects raise an error."""
+        mock_response = FakeResp(
+            [FakeContent('["question", "answer"]')], FakeUsage(100, 50)
+        )
+
+        mock_anthropic.return_value.messages.create.return_value = mock_response
+        client.client = mock_anthropic.return_value
+
+        with pytest.raises(ValueError, match="must be a JSON object"):
+            client.generate_flashcard("Test prompt")
+
     @patch("src.domain.generation.claude_client.anthropic.Anthropic")
     def test_generate_flashcard_empty_field(self, mock_anthropic, client):
         """Test that flashcard with empty field raises error."""
-        mock_response = Mock()
-        mock_response.content = [Mock(text='{"question": "Q?", "answer": ""}')]
-        mock_response.usage = Mock(input_tokens=100, output_tokens=50)
+        mock_response = FakeResp(
+            [FakeContent('{"question": "Q?", "answer": ""}')], FakeUsage(100, 50)
+        )
 
         mock_anthropic.return_value.messages.create.return_value = mock_response
         client.client = mock_anthropic.return_value
@@ -314,6 +423,205 @@ class TestClaudeClient:
         with pytest.raises(ValueError, match="cannot be empty"):
             client.generate_flashcard("Test prompt")
 
+    @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    def test_generate_flashcards_batch_success(self, mock_anthropic, client):
+        """Test that a batch response is split into one group per context."""
+        mock_response = FakeResp(
+            content=[
+                FakeContent(
+                    '[[{"question": "Q1?", "answer": "A1."}], '
+                    '[{"question": "Q2?", "answer": "A2."}, '
+                    '{"question": "Q3?", "answer": "A3."}]]'
+                )
+            ],
+            usage=FakeUsage(300, 120),
+        )
+
+        mock_anthropic.return_value.messages.create.return_value = mock_response
+        client.client = mock_anthropic.return_value
+
+        result = client.generate_flashcards_batch("Batch prompt", num_contexts=2)
+
+        assert result == [
+            [{"question": "Q1?", "answer": "A1."}],
+            [
+                {"question": "Q2?", "answer": "A2."},
+                {"question": "Q3?", "answer": "A3."},
+            ],
+        ]
+        # One API call for the whole batch
+        assert client.api_calls == 1
+        assert client.total_input_tokens == 300
+
+    @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    def test_generate_flashcards_batch_wraps_single_objects(
+        self, mock_anthropic, client
+    ):
+        """Test that a group given as a bare object is wrapped in a list."""
+        mock_response = FakeResp(
+            content=[
+                FakeContent(
+                    '[{"question": "Q1?", "answer": "A1."}, '
+                    '[{"question": "Q2?", "answer": "A2."}]]'
+                )
+            ],
+            usage=FakeUsage(200, 80),
+        )
+
+        mock_anthropic.return_value.messages.create.return_value = mock_response
+        client.client = mock_anthropic.return_value
+
+        result = client.generate_flashcards_batch("Batch prompt", num_contexts=2)
+
+        assert result[0] == [{"question": "Q1?", "answer": "A1."}]
+        assert result[1] == [{"question": "Q2?", "answer": "A2."}]
+
+    @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    def test_generate_flashcards_batch_wrong_group_count(self, mock_anthropic, client):
+        """Test that a response with the wrong number of groups raises."""
+        mock_response = FakeResp(
+            [FakeContent('[[{"question": "Q?", "answer": "A."}]]')], FakeUsage(200, 40)
+        )
+
+        mock_anthropic.return_value.messages.create.return_value = mock_response
+        client.client = mock_anthropic.return_value
+
+        with pytest.raises(ValueError, match="Expected 3 flashcard groups, got 1"):
+            client.generate_flashcards_batch("Batch prompt", num_contexts=3)
+
+        # Parse errors are not retried
+        assert mock_anthropic.return_value.messages.create.call_count == 1
+
+    @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    def test_generate_flashcards_parallel_preserves_order(self, mock_anthropic, client):
+        """Test that parallel results follow prompt order and stats add up."""
+
+        def create(**kwargs):
+            prompt = kwargs["messages"][0]["content"]
+            text = f'{{"question": "{prompt}?", "answer": "A."}}'
+            return FakeResp([FakeContent(text)], FakeUsage(100, 50))
+
+        mock_anthropic.return_value.messages.create.side_effect = create
+        client.client = mock_anthropic.return_value
+
+        prompts = [f"P{i}" for i in range(10)]
+        results = client.generate_flashcards_parallel(prompts, max_workers=4)
+
+        assert [card["question"] for card in results] == [f"{p}?" for p in prompts]
+        assert client.api_calls == 10
+        assert client.total_input_tokens == 1000
+        assert client.total_output_tokens == 500
+
+    @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    def test_generate_flashcards_parallel_propagates_errors(
+        self, mock_anthropic, client
+    ):
+        """Test that a failing prompt raises from the parallel call."""
+        mock_response = FakeResp([FakeContent("This is not JSON")], FakeUsage(100, 50))
+
+        mock_anthropic.return_value.messages.create.return_value = mock_response
+        client.client = mock_anthropic.return_value
+
+        with pytest.raises(ValueError, match="Could not extract valid JSON"):
+            client.generate_flashcards_parallel(["P1", "P2"])
+
+    def test_generate_flashcards_parallel_empty(self, client):
+        """Test that no prompts means no API calls."""
+        assert client.generate_flashcards_parallel([]) == []
+        assert client.api_calls == 0
+
+    @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    def test_generate_flashcard_cached_at_temperature_zero(
+        self, mock_anthropic, client
+    ):
+        """Test that repeated deterministic prompts are served from the cache."""
+        mock_response = FakeResp(
+            [FakeContent('{"question": "Q?", "answer": "A."}')], FakeUsage(100, 50)
+        )
+        mock_anthropic.return_value.messages.create.return_value = mock_response
+        client.client = mock_anthropic.return_value
+        client.temperature = 0
+
+        first = client.generate_flashcard("Test prompt")
+        first["question"] = "Modified by caller"
+        second = client.generate_flashcard("Test prompt")
+
+        # Second call is a cache hit: no API call and no extra usage
+        assert mock_anthropic.return_value.messages.create.call_count == 1
+        assert client.api_calls == 1
+        assert client.total_input_tokens == 100
+        # Each call gets its own parsed copy
+        assert second == {"question": "Q?", "answer": "A."}
+
+        # A different prompt misses the cache
+        client.generate_flashcard("Other prompt")
+        assert mock_anthropic.return_value.messages.create.call_count == 2
+
+        # Clearing the cache forces a new call
+        client.clear_cache()
+        client.generate_flashcard("Test prompt")
+        assert mock_anthropic.return_value.messages.create.call_count == 3
+
+    @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    def test_generate_flashcard_not_cached_with_temperature(
+        self, mock_anthropic, client
+    ):
+        """Test that sampling with temperature > 0 always calls the API."""
+        mock_response = FakeResp(
+            [FakeContent('{"question": "Q?", "answer": "A."}')], FakeUsage(100, 50)
+        )
+        mock_anthropic.return_value.messages.create.return_value = mock_response
+        client.client = mock_anthropic.return_value
+
+        client.generate_flashcard("Test prompt")
+        client.generate_flashcard("Test prompt")
+
+        assert mock_anthropic.return_value.messages.create.call_count == 2
+        assert client.api_calls == 2
+
+    @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    def test_generate_flashcard_invalid_response_not_cached(
+        self, mock_anthropic, client
+    ):
+        """Test that responses which fail to parse are not cached."""
+        mock_anthropic.return_value.messages.create.side_effect = [
+            FakeResp([FakeContent("This is not JSON")], FakeUsage(100, 50)),
+            FakeResp(
+                [FakeContent('{"question": "Q?", "answer": "A."}')], FakeUsage(100, 50)
+            ),
+        ]
+        client.client = mock_anthropic.return_value
+        client.temperature = 0
+
+        with pytest.raises(ValueError):
+            client.generate_flashcard("Test prompt")
+
+        assert client.generate_flashcard("Test prompt") == {
+            "question": "Q?",
+            "answer": "A.",
+        }
+
+    @patch("src.domain.generation.claude_client._RESPONSE_CACHE_SIZE", 2)
+    @patch("src.domain.generation.claude_client.anthropic.Anthropic")
+    def test_response_cache_evicts_least_recently_used(self, mock_anthropic, client):
+        """Test that the cache is bounded and evicts the oldest entry."""
+        mock_anthropic.return_value.messages.create.return_value = FakeResp(
+            [FakeContent('{"question": "Q?", "answer": "A."}')], FakeUsage(100, 50)
+        )
+        client.client = mock_anthropic.return_value
+        client.temperature = 0
+
+        for prompt in ["P1", "P2", "P1", "P3"]:  # P1 reused, so P2 is evicted
+            client.generate_flashcard(prompt)
+        calls_before = mock_anthropic.return_value.messages.create.call_count
+
+        client.generate_flashcard("P1")  # Still cached
+        assert mock_anthropic.return_value.messages.create.call_count == calls_before
+        client.generate_flashcard("P2")  # Evicted
+        assert (
+            mock_anthropic.return_value.messages.create.call_count == calls_before + 1
+        )
+
     def test_get_usage_stats(self, client):
         """Test usage statistics calculation."""
         # Manually set token counts
@@ -336,6 +644,23 @@ class TestClaudeClient:
         assert stats["cost_breakdown"]["input_cost"] == 0.003
         assert stats["cost_breakdown"]["output_cost"] == 0.0075
 
+    def test_get_usage_stats_uses_overridden_prices(self, mock_settings):
+        """Test that a subclass's prices are used in the cost estimate."""
+
+        class DiscountClient(ClaudeClient):
+            __slots__ = ()
+            PRICE_PER_MILLION_INPUT = 1.00
+            PRICE_PER_MILLION_OUTPUT = 5.00
+
+        client = DiscountClient(requests_per_minute=0)
+        client.total_input_tokens = 1000
+        client.total_output_tokens = 500
+
+        stats = client.get_usage_stats()
+
+        assert stats["cost_breakdown"]["input_cost"] == 0.001
+        assert stats["cost_breakdown"]["output_cost"] == 0.0025
+
     def test_get_usage_stats_zero(self, client):
         """Test usage stats when no calls made."""
         stats = client.get_usage_stats()
@@ -31,6 +31,13 @@ class TestPromptBuilder:
         # Check for example content
         assert "leader node" in prompt or "replication" in prompt
 
+    def test_example_flashcards_are_read_only(self):
+        """Test that the examples rendered at import can't be changed later."""
+        with pytest.raises(AttributeError):
+            PromptBuilder.EXAMPLE_FLASHCARDS.append({"question": "Q?"})
+        with pytest.raises(TypeError):
+            PromptBuilder.EXAMPLE_FLASHCARDS[0]["question"] = "Q?"
+
     def test_build_flashcard_prompt_difficulty_intermediate(self):
         """Test prompt generation with intermediate difficulty."""
         context = "Test context"
@@ -138,3 +145,44 @@ class TestPromptBuilder:
         """Test token estimation with empty string."""
         tokens = PromptBuilder.estimate_prompt_tokens("")
         assert tokens == 0
+
+    def test_build_batch_flashcard_prompt_numbers_contexts(self):
+        """Test that every context appears once, numbered in order."""
+        contexts = ["First context", "Second context", "Third context"]
+        prompt = PromptBuilder.build_batch_flashcard_prompt(
+            contexts, cards_per_context=2
+        )
+
+        positions = [
+            prompt.index(f"[{i}]\n{context}") for i, context in enumerate(contexts, 1)
+        ]
+        assert positions == sorted(positions)
+        assert "exactly 3 elements" in prompt
+        assert "exactly 2 flashcards" in prompt
+
+    def test_build_batch_flashcard_prompt_shares_instructions(self):
+        """Test that the batch prompt is shorter than separate prompts."""
+        contexts = [f"Context number {i}" for i in range(5)]
+
+        batch_prompt = PromptBuilder.build_batch_flashcard_prompt(contexts)
+        separate_length = sum(
+            len(PromptBuilder.build_flashcard_prompt(context)) for context in contexts
+        )
+
+        # Quality criteria and examples are sent once, not once per context
+        assert batch_prompt.count("QUALITY CRITERIA") == 1
+        assert len(batch_prompt) < separate_length / 2
+
+    def test_build_batch_flashcard_prompt_invalid_difficulty(self, caplog):
+        """Test that batch prompts fall back to intermediate like single ones."""
+        prompt = PromptBuilder.build_batch_flashcard_prompt(
+            ["Test context"], difficulty="expert"
+        )
+
+        assert "DIFFICULTY LEVEL: intermediate" in prompt
+        assert "Invalid difficulty" in caplog.text
+
+    def test_build_batch_flashcard_prompt_empty_contexts_raises(self):
+        """Test that an empty batch is rejected."""
+        with pytest.raises(ValueError, match="contexts must not be empty"):
+            PromptBuilder.build_batch_flashcard_prompt([])
@@ -0,0 +1,111 @@
+"""Unit tests for TokenBucket."""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from src.infrastructure.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    """Deterministic stand-in for time.monotonic/time.sleep."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+        self.advance_on_sleep = True
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        if self.advance_on_sleep:
+            self.now += seconds
+
+
+@pytest.mark.unit
+class TestTokenBucket:
+    """Test cases for TokenBucket class."""
+
+    @pytest.fixture
+    def clock(self):
+        """Patch the rate limiter's clock with a fake one."""
+        clock = FakeClock()
+        with patch("src.infrastructure.rate_limiter.time") as mock_time:
+            mock_time.monotonic.side_effect = clock.monotonic
+            mock_time.sleep.side_effect = clock.sleep
+            yield clock
+
+    def test_burst_up_to_capacity_does_not_wait(self, clock):
+        """Test that a full bucket serves capacity requests immediately."""
+        bucket = TokenBucket(capacity=3, refill_per_sec=1)
+
+        waits = [bucket.acquire() for _ in range(3)]
+
+        assert waits == [0.0, 0.0, 0.0]
+        assert clock.sleeps == []
+
+    def test_empty_bucket_waits_for_refill(self, clock):
+        """Test that an empty bucket sleeps just long enough for one token."""
+        bucket = TokenBucket(capacity=2, refill_per_sec=4)
+        bucket.acquire()
+        bucket.acquire()
+
+        waited = bucket.acquire()
+
+        assert waited == pytest.approx(0.25)
+        assert clock.sleeps == [pytest.approx(0.25)]
+
+    def test_refills_over_time(self, clock):
+        """Test that tokens come back as time passes, up to capacity."""
+        bucket = TokenBucket(capacity=2, refill_per_sec=1)
+        bucket.acquire()
+        bucket.acquire()
+
+        clock.now += 60  # Far longer than needed to refill
+
+        assert bucket.acquire() == 0.0
+        assert bucket.acquire() == 0.0
+        # Refill is capped at capacity, so the third request waits
+        assert bucket.acquire() == pytest.approx(1.0)
+
+    def test_per_minute(self):
+        """Test per-minute construction."""
+        bucket = TokenBucket.per_minute(120)
+
+        assert bucket.capacity == 120
+        assert bucket.refill_per_sec == pytest.approx(2.0)
+
+    @pytest.mark.parametrize(
+        "capacity, refill_per_sec",
+        [(0, 1), (-1, 1), (1, 0), (1, -1)],
+    )
+    def test_invalid_parameters_raise(self, capacity, refill_per_sec):
+        """Test that non-positive capacity or refill rate is rejected."""
+        with pytest.raises(ValueError, match="must be positive"):
+            TokenBucket(capacity=capacity, refill_per_sec=refill_per_sec)
+
+    def test_concurrent_acquire_spaces_out_requests(self, clock):
+        """Test that concurrent callers each reserve a distinct refill slot."""
+        # Freeze time so the result doesn't depend on thread scheduling
+        clock.advance_on_sleep = False
+        bucket = TokenBucket(capacity=1, refill_per_sec=10)
+        waits = []
+        waits_lock = threading.Lock()
+
+        def worker():
+            waited = bucket.acquire()
+            with waits_lock:
+                waits.append(round(waited, 6))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # One token available up front, then one every 0.1s; each caller
+        # queues behind the reservations made before it
+        assert sorted(waits) == [0.0, 0.1, 0.2, 0.3, 0.4]
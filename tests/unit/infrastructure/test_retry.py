@@ -0,0 +1,43 @@
+"""Unit tests for retry_delay."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.infrastructure.retry import (
+    MAX_BACKOFF_SECONDS,
+    MAX_RETRY_AFTER_SECONDS,
+    retry_delay,
+)
+
+
+def error_with_retry_after(value) -> Exception:
+    """Build an API-style error whose response carries a retry-after header."""
+    error = Exception("Rate limited")
+    error.response = SimpleNamespace(headers={"retry-after": value})
+    return error
+
+
+@pytest.mark.unit
+class TestRetryDelay:
+    """Test cases for retry_delay function."""
+
+    def test_honors_retry_after(self):
+        """Test that a valid retry-after header is used as is."""
+        assert retry_delay(error_with_retry_after("7"), attempt=1) == 7.0
+
+    def test_caps_retry_after(self):
+        """Test that a very large retry-after is clamped."""
+        delay = retry_delay(error_with_retry_after("3600"), attempt=1)
+        assert delay == MAX_RETRY_AFTER_SECONDS
+
+    @pytest.mark.parametrize("value", ["inf", "-inf", "nan", "-1", "soon", None])
+    def test_invalid_retry_after_falls_back_to_backoff(self, value):
+        """Test that unusable retry-after values use the jittered backoff."""
+        delay = retry_delay(error_with_retry_after(value), attempt=1)
+        assert 0.5 <= delay <= 1.5
+
+    def test_backoff_is_capped(self):
+        """Test that exponential backoff stops growing at the cap."""
+        delay = retry_delay(Exception("Server error"), attempt=20)
+        assert MAX_BACKOFF_SECONDS * 0.5 <= delay <= MAX_BACKOFF_SECONDS * 1.5
@@ -1,5 +1,6 @@
 """Unit tests for AnkiFormatter."""
 
+import io
 import os
 import zipfile
 
@@ -8,16 +9,22 @@ import pytest
 from src.domain.output.anki_formatter import AnkiFormatter
 
 
+@pytest.fixture(scope="module")
+def output_dir(tmp_path_factory):
+    """One temp directory for the module; each test writes its own file name."""
+    return tmp_path_factory.mktemp("anki_formatter")
+
+
 @pytest.mark.unit
 class TestAnkiFormatter:
     """Test suite for AnkiFormatter class."""
 
-    def test_format_flashcards_creates_file(self, tmp_path):
+    def test_format_flashcards_creates_file(self, output_dir):
         """Test that format_flashcards creates an .apkg file."""
         flashcards = [
             {"question": "What is Python?", "answer": "A programming language."},
         ]
-        output_path = tmp_path / "test.apkg"
+        output_path = output_dir / "creates_file.apkg"
 
         result_path = AnkiFormatter.format_flashcards(
             flashcards=flashcards,
@@ -27,13 +34,14 @@ class TestAnkiFormatter:
 
         assert os.path.exists(result_path)
         assert result_path.endswith(".apkg")
+        assert zipfile.is_zipfile(result_path)
 
-    def test_format_flashcards_returns_absolute_path(self, tmp_path):
+    def test_format_flashcards_returns_absolute_path(self, output_dir):
         """Test that the returned path is absolute."""
         flashcards = [
             {"question": "Q1", "answer": "A1"},
         ]
-        output_path = tmp_path / "test.apkg"
+        output_path = output_dir / "absolute_path.apkg"
 
         result_path = AnkiFormatter.format_flashcards(
             flashcards=flashcards,
@@ -43,46 +51,58 @@ class TestAnkiFormatter:
 
         assert os.path.isabs(result_path)
 
-    def test_format_flashcards_with_multiple_cards(self, tmp_path):
-        """Test formatting multiple flashcards."""
+    def test_write_flashcards_to_stream(self):
+        """Test that write_flashcards writes an .apkg archive to a stream."""
+        flashcards = [
+            {"question": "What is Python?", "answer": "A programming language."},
+        ]
+        buf = io.BytesIO()
+
+        AnkiFormatter.write_flashcards(flashcards, buf, deck_name="Test Deck")
+
+        buf.seek(0)
+        assert zipfile.is_zipfile(buf)
+
+    def test_write_flashcards_with_multiple_cards(self):
+        """Test writing multiple flashcards."""
         flashcards = [
             {"question": "Q1", "answer": "A1"},
             {"question": "Q2", "answer": "A2"},
             {"question": "Q3", "answer": "A3"},
         ]
-        output_path = tmp_path / "multi.apkg"
+        buf = io.BytesIO()
 
-        result_path = AnkiFormatter.format_flashcards(
-            flashcards=flashcards,
-            deck_name="Multi Card Deck",
-            output_path=str(output_path),
-        )
+        AnkiFormatter.write_flashcards(flashcards, buf, deck_name="Multi Card Deck")
 
-        assert os.path.exists(result_path)
-        # Verify it's a valid zip (apkg is a zip file)
-        assert zipfile.is_zipfile(result_path)
+        # apkg is a zip file holding the collection database
+        buf.seek(0)
+        with zipfile.ZipFile(buf) as apkg:
+            assert "collection.anki2" in apkg.namelist()
 
-    def test_format_flashcards_with_tags(self, tmp_path):
-        """Test that tags are properly included."""
+    def test_write_flashcards_with_tags(self):
+        """Test that tags are accepted and the caller's list is left unchanged."""
         flashcards = [
             {"question": "Q1", "answer": "A1"},
         ]
         tags = ["test-tag", "chapter-1"]
-        output_path = tmp_path / "tagged.apkg"
+        buf = io.BytesIO()
 
-        result_path = AnkiFormatter.format_flashcards(
-            flashcards=flashcards,
-            deck_name="Tagged Deck",
-            tags=tags,
-            output_path=str(output_path),
+        AnkiFormatter.write_flashcards(
+            flashcards, buf, deck_name="Tagged Deck", tags=tags
         )
 
-        # Verify file was created
-        assert os.path.exists(result_path)
+        buf.seek(0)
+        assert zipfile.is_zipfile(buf)
+        assert tags == ["test-tag", "chapter-1"]
+
+    def test_write_flashcards_empty_list_raises_error(self):
+        """Test that write_flashcards validates cards like format_flashcards."""
+        with pytest.raises(ValueError, match="Cannot create deck with no flashcards"):
+            AnkiFormatter.write_flashcards([], io.BytesIO())
 
-    def test_format_flashcards_empty_list_raises_error(self, tmp_path):
+    def test_format_flashcards_empty_list_raises_error(self, output_dir):
         """Test that empty flashcard list raises ValueError."""
-        output_path = tmp_path / "empty.apkg"
+        output_path = output_dir / "empty.apkg"
 
         with pytest.raises(ValueError, match="Cannot create deck with no flashcards"):
             AnkiFormatter.format_flashcards(
@@ -91,9 +111,9 @@ class TestAnkiFormatter:
                 output_path=str(output_path),
             )
 
-    def test_format_flashcards_invalid_card_structure_raises_error(self, tmp_path):
+    def test_format_flashcards_invalid_card_structure_raises_error(self, output_dir):
         """Test that malformed flashcards raise ValueError."""
-        output_path = tmp_path / "invalid.apkg"
+        output_path = output_dir / "invalid.apkg"
 
         # Missing 'answer' key
         with pytest.raises(ValueError, match="missing required"):
@@ -111,9 +131,9 @@ class TestAnkiFormatter:
                 output_path=str(output_path),
             )
 
-    def test_format_flashcards_non_dict_raises_error(self, tmp_path):
+    def test_format_flashcards_non_dict_raises_error(self, output_dir):
         """Test that non-dict flashcard raises ValueError."""
-        output_path = tmp_path / "invalid.apkg"
+        output_path = output_dir / "invalid.apkg"
 
         with pytest.raises(ValueError, match="is not a dictionary"):
             AnkiFormatter.format_flashcards(
@@ -122,12 +142,12 @@ class TestAnkiFormatter:
                 output_path=str(output_path),
             )
 
-    def test_format_flashcards_creates_parent_directories(self, tmp_path):
+    def test_format_flashcards_creates_parent_directories(self, output_dir):
         """Test that parent directories are created if they don't exist."""
         flashcards = [
             {"question": "Q1", "answer": "A1"},
         ]
-        output_path = tmp_path / "nested" / "dirs" / "test.apkg"
+        output_path = output_dir / "nested" / "dirs" / "test.apkg"
 
         result_path = AnkiFormatter.format_flashcards(
             flashcards=flashcards,
@@ -178,6 +198,14 @@ class TestAnkiFormatter:
 
         assert guid1 == guid2
 
+    def test_generate_note_guid_is_stable(self):
+        """Test that note GUIDs match previously exported decks."""
+        # Anki dedupes notes on import by GUID; a different value here means
+        # re-imported decks would get duplicate notes
+        guid = AnkiFormatter._generate_note_guid("What is X?", "X is Y.")
+
+        assert guid == "bf80f0c882"
+
     def test_generate_note_guid_differs_for_different_content(self):
         """Test that note GUIDs differ for different content."""
         guid1 = AnkiFormatter._generate_note_guid("Q1", "A1")
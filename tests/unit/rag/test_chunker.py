@@ -1,21 +1,27 @@
 """Unit tests for Chunker."""
 
+from unittest.mock import patch
 
 import pytest
-import tiktoken
 
 from src.domain.models.chunk import Chunk
 from src.domain.models.document import Document, DocumentFormat, DocumentMetadata
-from src.domain.rag.chunker import DEFAULT_ENCODING, Chunker
-
-
-@pytest.fixture
-def encoding():
-    """Get tiktoken encoding for tests."""
-    return tiktoken.get_encoding(DEFAULT_ENCODING)
-
-
-@pytest.fixture
+from src.domain.rag.chunker import Chunker
+
+# A single paragraph that exceeds 1200 tokens, so it needs sentence splitting
+_LONG_SENTENCES = [
+    "Machine learning is a subset of artificial intelligence that enables systems to learn from data.",
+    "Deep learning uses neural networks with multiple layers to extract features.",
+    "Natural language processing allows computers to understand human language.",
+    "Computer vision enables machines to interpret visual information.",
+    "Reinforcement learning trains agents through trial and error in environments.",
+]
+_LONG_CONTENT = " ".join(_LONG_SENTENCES * 50)
+
+
+# Document fixtures are module-scoped: Chunker never modifies its input and no
+# test mutates them, so each is built once per module.
+@pytest.fixture(scope="module")
 def simple_document():
     """Create a simple document with one paragraph."""
     return Document(
@@ -30,7 +36,7 @@ def simple_document():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def multi_paragraph_document():
     """Create a document with multiple paragraphs."""
     content = """Machine learning is a fascinating field that combines mathematics, statistics, and computer science to create systems that can learn from data. The fundamental idea behind machine learning is that computers can automatically learn patterns and make decisions with minimal human intervention. This has led to breakthrough applications in many industries including healthcare, finance, and technology.
@@ -52,22 +58,11 @@ Computer vision is the field that enables machines to interpret and understand v
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def long_paragraph_document():
     """Create a document with a very long paragraph that needs sentence splitting."""
-    # Create a paragraph that will exceed 1200 tokens
-    sentences = [
-        "Machine learning is a subset of artificial intelligence that enables systems to learn from data.",
-        "Deep learning uses neural networks with multiple layers to extract features.",
-        "Natural language processing allows computers to understand human language.",
-        "Computer vision enables machines to interpret visual information.",
-        "Reinforcement learning trains agents through trial and error in environments.",
-    ]
-    # Repeat to make it long enough
-    long_content = " ".join(sentences * 50)
-
     return Document(
-        content=long_content,
+        content=_LONG_CONTENT,
         file_path="/test/long_paragraph.pdf",
         page_range=(1, 5),
         metadata=DocumentMetadata(
@@ -78,7 +73,7 @@ def long_paragraph_document():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def empty_document():
     """Create an empty document."""
     return Document(
@@ -93,7 +88,7 @@ def empty_document():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def whitespace_document():
     """Create a document with only whitespace."""
     return Document(
@@ -180,8 +175,17 @@ class TestChunkerTokenCounting:
         chunks = Chunker.chunk(simple_document)
 
         for chunk in chunks:
-            expected_tokens = len(encoding.encode(chunk.text))
-            assert chunk.token_count == expected_tokens
+            expected_tokens = encoding.encode(chunk.text)
+            assert chunk.tokens.tolist() == expected_tokens
+            assert chunk.token_count == len(expected_tokens)
+
+    def test_chunks_carry_tokens(self, multi_paragraph_document, encoding):
+        """Chunks from the multi-chunk path should carry their token IDs too."""
+        chunks = Chunker.chunk(multi_paragraph_document, target_size=200)
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert chunk.tokens.tolist() == encoding.encode(chunk.text)
 
     def test_char_count_tracking(self, simple_document):
         """Character count should match text length."""
@@ -347,6 +351,41 @@ class TestChunkerEdgeCases:
         assert chunks[0].has_overlap_before is False
         assert chunks[0].has_overlap_after is False
 
+    def test_chunk_short_multi_paragraph_document_is_one_chunk(self):
+        """Document that fits in one chunk skips accumulation entirely."""
+        doc = Document(
+            content="  First paragraph.  \n \n\nSecond paragraph.\n",
+            file_path="/test/short.pdf",
+            page_range=(1, 1),
+            metadata=DocumentMetadata(
+                total_pages=1,
+                file_size_bytes=100,
+                file_format=DocumentFormat.PDF,
+            ),
+        )
+
+        with patch.object(Chunker, "_accumulate_paragraphs") as accumulate:
+            chunks = Chunker.chunk(doc, target_size=100, overlap_size=10)
+
+        accumulate.assert_not_called()
+        assert len(chunks) == 1
+        # Same text the accumulation path would build
+        assert chunks[0].text == "First paragraph.\n\nSecond paragraph."
+
+    def test_chunk_short_document_respects_max_chunk_size(
+        self, multi_paragraph_document
+    ):
+        """Fast path doesn't apply when max_chunk_size is below target_size."""
+        # Fits in target_size, but every paragraph exceeds max_chunk_size
+        chunks = Chunker.chunk(
+            multi_paragraph_document,
+            target_size=1000,
+            overlap_size=0,
+            max_chunk_size=50,
+        )
+
+        assert len(chunks) > 1
+
     def test_chunk_very_long_single_paragraph(self):
         """Very long paragraph should be split into multiple chunks."""
         # Create a document with one very long paragraph
@@ -483,15 +522,9 @@ class TestChunkerMetadata:
 class TestChunkerIntegration:
     """Integration tests with real PDF."""
 
-    def test_chunk_with_real_pdf(self, sample_pdf_path):
+    def test_chunk_with_real_pdf(self, parsed_sample_doc):
         """Should chunk a real PDF document."""
-        from src.domain.document_processing.pdf_parser import PDFParser
-
-        # Parse the PDF
-        doc = PDFParser.parse(str(sample_pdf_path))
-
-        # Chunk it
-        chunks = Chunker.chunk(doc, target_size=200, overlap_size=30)
+        chunks = Chunker.chunk(parsed_sample_doc, target_size=200, overlap_size=30)
 
         # Should produce chunks
         assert len(chunks) > 0
@@ -504,28 +537,26 @@ class TestChunkerIntegration:
             assert chunk.char_count > 0
             assert chunk.chunk_id
 
-    def test_chunk_multiple_configurations(self, sample_pdf_path):
-        """Should work with different configuration values."""
-        from src.domain.document_processing.pdf_parser import PDFParser
-
-        doc = PDFParser.parse(str(sample_pdf_path))
-
-        configs = [
+    @pytest.mark.parametrize(
+        "config",
+        [
             {"target_size": 100, "overlap_size": 20},
             {"target_size": 500, "overlap_size": 50},
             {"target_size": 800, "overlap_size": 100},
             {"target_size": 1000, "overlap_size": 0},
-        ]
-
-        for config in configs:
-            chunks = Chunker.chunk(doc, **config)
+        ],
+        ids=["100-20", "500-50", "800-100", "1000-0"],
+    )
+    def test_chunk_multiple_configurations(self, parsed_sample_doc, config):
+        """Should work with different configuration values."""
+        chunks = Chunker.chunk(parsed_sample_doc, **config)
 
-            # Should produce chunks for each config
-            assert len(chunks) > 0
+        # Should produce chunks for each config
+        assert len(chunks) > 0
 
-            # Verify consistency
-            for i, chunk in enumerate(chunks):
-                assert chunk.position == i
+        # Verify consistency
+        for i, chunk in enumerate(chunks):
+            assert chunk.position == i
 
 
 # =============================================================================
@@ -621,6 +652,24 @@ class TestChunkModel:
 
         assert chunk.has_embedding() is False
 
+    def test_chunk_uses_slots(self):
+        """Chunk instances should have no __dict__ (attributes live in slots)."""
+        chunk = Chunk(
+            chunk_id="test_chunk_000",
+            text="Test",
+            source_document="/test.pdf",
+            page_numbers=[1],
+            position=0,
+            token_count=1,
+            char_count=4,
+            has_overlap_before=False,
+            has_overlap_after=False,
+        )
+
+        assert not hasattr(chunk, "__dict__")
+        with pytest.raises(AttributeError):
+            chunk.unknown_attribute = 1
+
 
 # =============================================================================
 # Helper Method Tests
@@ -674,6 +723,24 @@ class TestChunkerHelperMethods:
         result = Chunker._count_tokens("", encoding)
         assert result == 0
 
+    def test_count_tokens_special_token_text_is_ordinary(self, encoding):
+        """Special-token markup in document text should count as plain text."""
+        text = "Models end output with <|endoftext|>."
+
+        result = Chunker._count_tokens(text, encoding)
+
+        assert result == len(encoding.encode(text, disallowed_special=()))
+
+    @pytest.mark.parametrize("threads", [1, 4], ids=["sequential", "batched"])
+    def test_count_tokens_batch(self, encoding, threads):
+        """Should match per-text counts whether or not batch encoding is used."""
+        texts = ["Hello world", "", "Machine learning is great."] * 10
+
+        with patch("src.domain.rag.chunker._ENCODE_THREADS", threads):
+            result = Chunker._count_tokens_batch(texts, encoding)
+
+        assert result == [len(encoding.encode(text)) for text in texts]
+
     def test_generate_chunk_id(self, simple_document):
         """Should generate correct chunk ID format."""
         result = Chunker._generate_chunk_id(simple_document, 5)
@@ -699,3 +766,28 @@ class TestChunkerHelperMethods:
         expected_tokens = encoding.encode(text)[:3]
         expected = encoding.decode(expected_tokens)
         assert overlap == expected
+
+    def test_extract_overlap_reuses_given_tokens(self, encoding):
+        """Should slice the given token IDs instead of re-encoding the text."""
+        text = "This is a test sentence with multiple tokens."
+        tokens = encoding.encode(text)
+
+        with patch.object(encoding, "encode_ordinary") as encode:
+            overlap = Chunker._extract_overlap(text, 3, encoding, tokens=tokens)
+
+        encode.assert_not_called()
+        assert overlap == encoding.decode(tokens[-3:])
+
+    def test_accumulate_paragraphs_returns_known_tokens(self, encoding):
+        """Token IDs returned alongside raw chunks should match their text."""
+        paragraphs = [f"Paragraph {i} has a few words in it." for i in range(20)]
+
+        texts, token_lists = Chunker._accumulate_paragraphs(
+            paragraphs, target_size=30, max_chunk_size=100, encoding=encoding
+        )
+
+        assert len(token_lists) == len(texts)
+        assert any(tokens is not None for tokens in token_lists)
+        for text, tokens in zip(texts, token_lists, strict=True):
+            if tokens is not None:
+                assert tokens == encoding.encode(text)
@@ -1,5 +1,9 @@
 """Unit tests for ContextBuilder component."""
 
+import dataclasses
+from unittest.mock import patch
+
+import numpy as np
 import pytest
 import tiktoken
 
@@ -8,6 +12,7 @@ from src.domain.rag.context_builder import (
     ChunkOrdering,
     ContextBuilder,
     ContextResult,
+    _token_count_cache,
 )
 
 
@@ -39,6 +44,13 @@ def create_test_chunk(
     )
 
 
+def add_chunker_tokens(chunk: Chunk, encoding: tiktoken.Encoding) -> Chunk:
+    """Give chunk its text's token IDs and count, as the Chunker does."""
+    chunk.tokens = np.array(encoding.encode(chunk.text), dtype=np.uint32)
+    chunk.token_count = len(chunk.tokens)
+    return chunk
+
+
 @pytest.mark.unit
 class TestBuildContextEmpty:
     """Test cases for empty input handling."""
@@ -222,6 +234,17 @@ class TestMetadataFormatting:
         # Should recognize as consecutive range after sorting
         assert "Pages: 1-3]" in context
 
+    def test_header_follows_changed_chunk_metadata(self):
+        """Test that cached headers never go stale when a chunk is edited."""
+        chunk = create_test_chunk(page_numbers=[1, 2])
+        ContextBuilder.build_context([chunk], include_metadata=True)
+
+        chunk.page_numbers = [4]
+        chunk.source_document = "/other/notes.pdf"
+        context = ContextBuilder.build_context([chunk], include_metadata=True)
+
+        assert context.startswith("[Source: notes.pdf, Pages: 4]")
+
 
 @pytest.mark.unit
 class TestEstimateTokens:
@@ -263,6 +286,39 @@ class TestEstimateTokens:
 
         assert tokens_with > tokens_without
 
+    def test_estimate_tokens_uses_chunk_tokens(self, encoding):
+        """Test that chunks carrying their tokens are not re-encoded."""
+        encoded = create_test_chunk("chunk_001", "First chunk text.", 0)
+        add_chunker_tokens(encoded, encoding)
+        plain = create_test_chunk("chunk_002", "Second chunk text.", 1)
+        ContextBuilder.clear_token_cache()
+        original_encode = tiktoken.Encoding.encode_ordinary
+
+        with patch.object(
+            tiktoken.Encoding,
+            "encode_ordinary",
+            autospec=True,
+            side_effect=original_encode,
+        ) as spy:
+            tokens = ContextBuilder.estimate_tokens([encoded, plain])
+
+        assert tokens == sum(
+            len(encoding.encode(text))
+            for text in (encoded.text, ContextBuilder.DEFAULT_SEPARATOR, plain.text)
+        )
+        encoded_texts = [c.args[1] for c in spy.call_args_list]
+        assert encoded.text not in encoded_texts
+        assert plain.text in encoded_texts
+
+    def test_estimate_tokens_ignores_stale_chunk_tokens(self, encoding):
+        """Test that a chunk whose text was edited after chunking is re-encoded."""
+        chunk = add_chunker_tokens(create_test_chunk(text="Short."), encoding)
+        chunk.text = "A rather longer text than the one that was chunked."
+
+        tokens = ContextBuilder.estimate_tokens([chunk])
+
+        assert tokens == len(encoding.encode(chunk.text))
+
 
 @pytest.mark.unit
 class TestBuildContextWithLimit:
@@ -315,6 +371,39 @@ class TestBuildContextWithLimit:
         assert result.token_count <= 500
         assert result.chunk_count < 3 or result.truncated
 
+    def test_build_with_limit_truncates_from_chunk_tokens(self, encoding):
+        """Test that a chunk carrying its tokens is truncated without re-encoding."""
+        chunk = create_test_chunk(text="This is a longer text. " * 50)
+        add_chunker_tokens(chunk, encoding)
+        ContextBuilder.clear_token_cache()
+        original_encode = tiktoken.Encoding.encode_ordinary
+
+        with patch.object(
+            tiktoken.Encoding,
+            "encode_ordinary",
+            autospec=True,
+            side_effect=original_encode,
+        ) as spy:
+            result = ContextBuilder.build_context_with_limit([chunk], max_tokens=100)
+
+        assert result.truncated is True
+        assert result.context == encoding.decode(chunk.tokens[:99]) + "..."
+        # Only the separator, ellipsis and final context get encoded
+        assert chunk.text not in [c.args[1] for c in spy.call_args_list]
+
+    def test_build_with_limit_ignores_stale_chunk_tokens(self, encoding):
+        """Test that tokens from before the text was edited are not decoded."""
+        chunk = add_chunker_tokens(
+            create_test_chunk(text="Original text. " * 60), encoding
+        )
+        chunk.text = "Edited text. " * 60  # char_count still describes the old text
+
+        result = ContextBuilder.build_context_with_limit([chunk], max_tokens=100)
+
+        assert result.truncated is True
+        assert result.context.startswith("Edited text.")
+        assert "Original" not in result.context
+
     def test_build_with_limit_respects_token_count(self):
         """Test that result stays within token limit."""
         long_text = "Word " * 100
@@ -366,7 +455,7 @@ class TestBuildContextWithLimit:
 class TestTokenAccuracy:
     """Test cases for token counting accuracy."""
 
-    def test_token_count_matches_tiktoken(self):
+    def test_token_count_matches_tiktoken(self, encoding):
         """Test that token estimates match tiktoken directly."""
         text = "The quick brown fox jumps over the lazy dog."
         chunk = create_test_chunk(text=text)
@@ -374,12 +463,44 @@ class TestTokenAccuracy:
         estimated = ContextBuilder.estimate_tokens([chunk])
 
         # Verify against tiktoken directly
-        encoding = tiktoken.get_encoding("cl100k_base")
         actual = len(encoding.encode(text))
 
         assert estimated == actual
 
-    def test_context_result_token_count_accurate(self):
+    @pytest.mark.parametrize("threads", [1, 4], ids=["sequential", "batched"])
+    def test_estimate_tokens_many_chunks_matches_tiktoken(self, encoding, threads):
+        """Test that estimates match tiktoken whether or not batch encoding is used."""
+        chunks = [
+            create_test_chunk(f"chunk_{i:03d}", f"Chunk number {i} of the test.", i)
+            for i in range(20)
+        ]
+
+        ContextBuilder.clear_token_cache()
+        with patch("src.domain.rag.context_builder._ENCODE_THREADS", threads):
+            estimated = ContextBuilder.estimate_tokens(chunks, include_metadata=True)
+
+        separator = ContextBuilder.DEFAULT_SEPARATOR
+        context = ContextBuilder.build_context(chunks, include_metadata=True)
+        chunk_tokens = sum(len(encoding.encode(t)) for t in context.split(separator))
+        separator_tokens = len(encoding.encode(separator)) * (len(chunks) - 1)
+
+        assert estimated == chunk_tokens + separator_tokens
+
+    @pytest.mark.parametrize(
+        "text",
+        ["The quick brown fox.", " leading space", "(parenthesised)", "\nnewline"],
+    )
+    def test_metadata_estimate_with_chunk_tokens_matches_tiktoken(self, encoding, text):
+        """Test that header plus chunk token counts equal encoding the whole."""
+        chunk = create_test_chunk(text=text, source_document="/docs/my notes.pdf")
+        add_chunker_tokens(chunk, encoding)
+
+        estimated = ContextBuilder.estimate_tokens([chunk], include_metadata=True)
+
+        context = ContextBuilder.build_context([chunk], include_metadata=True)
+        assert estimated == len(encoding.encode(context))
+
+    def test_context_result_token_count_accurate(self, encoding):
         """Test that ContextResult.token_count is accurate."""
         chunks = [
             create_test_chunk("chunk_001", "First test chunk text.", 0),
@@ -389,12 +510,11 @@ class TestTokenAccuracy:
         result = ContextBuilder.build_context_with_limit(chunks, max_tokens=10000)
 
         # Verify against tiktoken directly
-        encoding = tiktoken.get_encoding("cl100k_base")
         actual = len(encoding.encode(result.context))
 
         assert result.token_count == actual
 
-    def test_truncated_context_respects_token_limit(self):
+    def test_truncated_context_respects_token_limit(self, encoding):
         """Test that truncation with ellipsis stays within max_tokens."""
         # Create a chunk that will definitely need truncation
         long_text = "This is a test sentence. " * 100  # Much longer than limit
@@ -404,7 +524,6 @@ class TestTokenAccuracy:
         result = ContextBuilder.build_context_with_limit([chunk], max_tokens=max_tokens)
 
         # Verify against tiktoken directly
-        encoding = tiktoken.get_encoding("cl100k_base")
         actual_tokens = len(encoding.encode(result.context))
 
         # The actual token count should not exceed max_tokens
@@ -415,6 +534,83 @@ class TestTokenAccuracy:
         assert result.context.endswith("...")
 
 
+@pytest.mark.unit
+class TestTokenCountCache:
+    """Test cases for the chunk token count cache."""
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        """Start each test with an empty cache."""
+        ContextBuilder.clear_token_cache()
+        yield
+        ContextBuilder.clear_token_cache()
+
+    def test_repeated_estimate_reuses_counts(self):
+        """Test that chunks seen before are not re-tokenized."""
+        chunks = [
+            create_test_chunk("chunk_001", "First chunk text.", 0),
+            create_test_chunk("chunk_002", "Second chunk text.", 1),
+        ]
+        first = ContextBuilder.estimate_tokens(chunks)
+        original_encode = tiktoken.Encoding.encode_ordinary
+
+        with patch.object(
+            tiktoken.Encoding,
+            "encode_ordinary",
+            autospec=True,
+            side_effect=original_encode,
+        ) as spy:
+            second = ContextBuilder.estimate_tokens(chunks)
+
+        assert second == first
+        # Only the separator is encoded; both chunk counts come from the cache
+        assert [c.args[1] for c in spy.call_args_list] == [
+            ContextBuilder.DEFAULT_SEPARATOR
+        ]
+
+    def test_duplicate_texts_are_encoded_once(self, encoding):
+        """Test that repeated texts in one call are tokenized only once."""
+        chunks = [create_test_chunk(text="Same text.") for _ in range(3)]
+        chunks.append(create_test_chunk(text="Other text."))
+        original_encode = tiktoken.Encoding.encode_ordinary
+
+        with patch.object(
+            tiktoken.Encoding,
+            "encode_ordinary",
+            autospec=True,
+            side_effect=original_encode,
+        ) as spy:
+            counts = ContextBuilder._count_tokens_batch(
+                [chunk.text for chunk in chunks], encoding
+            )
+
+        assert [c.args[1] for c in spy.call_args_list] == ["Same text.", "Other text."]
+        assert counts[0] == counts[1] == counts[2]
+
+    def test_cache_is_keyed_by_text(self):
+        """Test that a chunk ID reused for different text gets a fresh count."""
+        short = create_test_chunk("same_id", "Short.")
+        longer = create_test_chunk("same_id", "A much longer chunk text than before.")
+
+        short_tokens = ContextBuilder.estimate_tokens([short])
+        longer_tokens = ContextBuilder.estimate_tokens([longer])
+
+        assert short_tokens < longer_tokens
+
+    def test_cache_is_bounded(self):
+        """Test that the least recently used counts are evicted past the limit."""
+        chunks = [create_test_chunk(text=f"Text {i}.") for i in range(5)]
+
+        with patch("src.domain.rag.context_builder._TOKEN_COUNT_CACHE_SIZE", 3):
+            ContextBuilder.estimate_tokens(chunks)
+
+            assert [text for _, text in _token_count_cache] == [
+                "Text 2.",
+                "Text 3.",
+                "Text 4.",
+            ]
+
+
 @pytest.mark.unit
 class TestContextResult:
     """Test cases for ContextResult dataclass."""
@@ -442,3 +638,11 @@ class TestContextResult:
         )
 
         assert result.truncated is False
+
+    def test_context_result_is_immutable(self):
+        """Test that ContextResult fields can't be reassigned or added."""
+        result = ContextResult(context="Test", token_count=1, chunk_count=1)
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.truncated = True
+        assert not hasattr(result, "__dict__")
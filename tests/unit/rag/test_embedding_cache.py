@@ -0,0 +1,79 @@
+"""Unit tests for EmbeddingCache."""
+
+import numpy as np
+import pytest
+
+from src.domain.rag.embedding_cache import EmbeddingCache
+
+
+@pytest.mark.unit
+class TestEmbeddingCache:
+    """Test cases for EmbeddingCache class."""
+
+    def test_get_missing_returns_none(self):
+        """Test that an unknown key is a miss."""
+        cache = EmbeddingCache()
+        assert cache.get("missing") is None
+
+    def test_put_and_get_roundtrip(self):
+        """Test that stored vectors come back as read-only float32 arrays."""
+        cache = EmbeddingCache()
+        cache.put("key", [0.1, 0.2, 0.3])
+
+        vector = cache.get("key")
+
+        assert vector.dtype == np.float32
+        assert vector.tolist() == pytest.approx([0.1, 0.2, 0.3])
+        assert not vector.flags.writeable
+        assert len(cache) == 1
+
+    def test_memory_evicts_least_recently_used(self):
+        """Test that memory holds at most capacity entries, dropping the LRU."""
+        cache = EmbeddingCache(capacity=2)
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", [3.0])
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a").tolist() == [1.0]
+        assert cache.get("c").tolist() == [3.0]
+
+    def test_evicted_entries_are_read_back_from_disk(self, tmp_path):
+        """Test that a database-backed cache keeps evicted entries on disk."""
+        cache = EmbeddingCache(tmp_path / "embeddings.sqlite3", capacity=1)
+        cache.put_many([("a", [1.0]), ("b", [2.0])])
+
+        assert len(cache) == 1
+        assert cache.get("a").tolist() == [1.0]
+        assert len(cache) == 1
+        cache.close()
+
+    def test_invalid_capacity_raises(self):
+        """Test that a capacity below one is rejected."""
+        with pytest.raises(ValueError, match="capacity must be at least 1"):
+            EmbeddingCache(capacity=0)
+
+    def test_make_key_depends_on_model_dimensions_and_text(self):
+        """Test that keys differ whenever any part of the input differs."""
+        key = EmbeddingCache.make_key("model", 1536, "text")
+
+        assert key == EmbeddingCache.make_key("model", 1536, "text")
+        assert key != EmbeddingCache.make_key("other-model", 1536, "text")
+        assert key != EmbeddingCache.make_key("model", 512, "text")
+        assert key != EmbeddingCache.make_key("model", 1536, "text ")
+
+    def test_persists_to_disk(self, tmp_path):
+        """Test that entries written to the database survive a new instance."""
+        path = tmp_path / "cache" / "embeddings.sqlite3"
+        cache = EmbeddingCache(path)
+        cache.put_many([("a", [1.0, 2.0]), ("b", [3.0, 4.0])])
+        cache.close()
+
+        reopened = EmbeddingCache(path)
+
+        assert reopened.get("a").tolist() == [1.0, 2.0]
+        assert reopened.get("b").tolist() == [3.0, 4.0]
+        assert reopened.get("c") is None
+        reopened.close()
@@ -1,7 +1,11 @@
 """Unit tests for EmbeddingGenerator."""
 
+import base64
+import threading
+from collections import namedtuple
 from unittest.mock import Mock, patch
 
+import numpy as np
 import pytest
 from openai import (
     APIConnectionError,
@@ -12,8 +16,15 @@ from openai import (
 )
 
 from src.domain.models.chunk import Chunk
+from src.domain.rag.embedding_cache import EmbeddingCache
 from src.domain.rag.embeddings import EmbeddingGenerator
 
+# Plain-data stand-ins for the embeddings.create() response, which are much
+# cheaper to build than Mocks with one item per input text.
+FakeEmbedding = namedtuple("FakeEmbedding", ["embedding", "index"])
+FakeUsage = namedtuple("FakeUsage", ["total_tokens"])
+FakeResponse = namedtuple("FakeResponse", ["data", "usage"])
+
 
 def create_test_chunk(
     chunk_id: str = "test_chunk_001",
@@ -34,6 +45,22 @@ def create_test_chunk(
     )
 
 
+def b64(values) -> str:
+    """Encode an embedding the way the API does for encoding_format="base64"."""
+    return base64.b64encode(np.asarray(values, dtype=np.float32).tobytes()).decode()
+
+
+def fake_create(model, input, encoding_format):
+    """Stand in for embeddings.create: one embedding per text, from its length."""
+    return FakeResponse(
+        [
+            FakeEmbedding(b64([float(len(text))] * 1536), i)
+            for i, text in enumerate(input)
+        ],
+        FakeUsage(10 * len(input)),
+    )
+
+
 @pytest.mark.unit
 class TestEmbeddingGeneratorInit:
     """Test cases for EmbeddingGenerator initialization."""
@@ -44,6 +71,8 @@ class TestEmbeddingGeneratorInit:
         with patch("src.domain.rag.embeddings.get_settings") as mock:
             settings = Mock()
             settings.openai_api_key = "test-api-key"
+            settings.openai_embedding_requests_per_minute = 3000
+            settings.openai_embedding_tokens_per_minute = 1_000_000
             mock.return_value = settings
             yield mock
 
@@ -69,6 +98,78 @@ class TestEmbeddingGeneratorInit:
             with pytest.raises(ValueError, match="OpenAI API key required"):
                 EmbeddingGenerator()
 
+    def test_initialization_rate_limiters(self, mock_settings):
+        """Test that request and token limits come from settings."""
+        generator = EmbeddingGenerator()
+        assert generator.request_limiter.capacity == 3000
+        assert generator.token_limiter.capacity == 1_000_000
+
+        generator = EmbeddingGenerator(requests_per_minute=0, tokens_per_minute=0)
+        assert generator.request_limiter is None
+        assert generator.token_limiter is None
+
+    @patch.dict("src.domain.rag.embeddings._OPENAI_CLIENTS", clear=True)
+    @patch("src.domain.rag.embeddings.openai.OpenAI")
+    def test_openai_client_shared_per_api_key(self, mock_openai, mock_settings):
+        """Test that instances with the same key share one SDK client."""
+        mock_openai.side_effect = lambda api_key: Mock(api_key=api_key)
+
+        first = EmbeddingGenerator()
+        second = EmbeddingGenerator()
+        other = EmbeddingGenerator(api_key="other-key")
+
+        assert first.client is second.client
+        assert other.client is not first.client
+        assert mock_openai.call_count == 2
+
+    @patch.dict("src.domain.rag.embeddings._OPENAI_CLIENTS", clear=True)
+    @patch("src.domain.rag.embeddings.openai.OpenAI")
+    def test_client_not_constructed_until_used(self, mock_openai, mock_settings):
+        """Test that the SDK client is only created once it is needed."""
+        create = mock_openai.return_value.embeddings.create
+        create.return_value = FakeResponse(
+            [FakeEmbedding(b64([0.5] * 4), 0)], FakeUsage(1)
+        )
+
+        generator = EmbeddingGenerator(requests_per_minute=0, tokens_per_minute=0)
+        mock_openai.assert_not_called()
+
+        generator.generate_query_embedding("query")
+        mock_openai.assert_called_once_with(api_key="test-api-key")
+
+    @patch.dict("src.domain.rag.embeddings._OPENAI_CLIENTS", clear=True)
+    def test_warmup_primes_connection(self, mock_settings):
+        """Test that warmup=True sends one minimal request during init."""
+        mock_response = FakeResponse([], FakeUsage(1))
+
+        with patch("src.domain.rag.embeddings.openai.OpenAI") as mock_openai:
+            create = mock_openai.return_value.embeddings.create
+            create.return_value = mock_response
+            generator = EmbeddingGenerator(warmup=True)
+
+        create.assert_called_once_with(model=generator.MODEL, input="x")
+        assert generator.api_calls == 1
+        assert generator.total_tokens == 1
+
+    @patch.dict("src.domain.rag.embeddings._OPENAI_CLIENTS", clear=True)
+    def test_warmup_failure_is_ignored(self, mock_settings):
+        """Test that a failed warmup request doesn't fail initialization."""
+        with patch("src.domain.rag.embeddings.openai.OpenAI") as mock_openai:
+            mock_openai.return_value.embeddings.create.side_effect = APIConnectionError(
+                message="Connection failed", request=Mock()
+            )
+            generator = EmbeddingGenerator(warmup=True)
+
+        assert generator.api_calls == 0
+
+    @patch.dict("src.domain.rag.embeddings._OPENAI_CLIENTS", clear=True)
+    def test_no_warmup_by_default(self, mock_settings):
+        """Test that init makes no request unless warmup is requested."""
+        with patch("src.domain.rag.embeddings.openai.OpenAI") as mock_openai:
+            EmbeddingGenerator()
+
+        mock_openai.return_value.embeddings.create.assert_not_called()
+
     def test_initialization_model_constants(self, mock_settings):
         """Test model constants are set correctly."""
         generator = EmbeddingGenerator()
@@ -93,22 +194,26 @@ class TestGenerateEmbeddings:
     @pytest.fixture
     def generator(self, mock_settings):
         """Create an EmbeddingGenerator instance for testing."""
-        return EmbeddingGenerator(min_request_interval=0)
+        return EmbeddingGenerator(requests_per_minute=0, tokens_per_minute=0)
 
     def test_generate_embeddings_success(self, generator):
         """Test successful embedding generation."""
-        chunks = [create_test_chunk("chunk_001"), create_test_chunk("chunk_002")]
+        chunks = [
+            create_test_chunk("chunk_001", text="First chunk."),
+            create_test_chunk("chunk_002", text="Second chunk."),
+        ]
 
         # Create mock embedding (1536 dimensions)
         mock_embedding = [0.1] * 1536
 
         # Mock OpenAI response
-        mock_response = Mock()
-        mock_response.data = [
-            Mock(embedding=mock_embedding, index=0),
-            Mock(embedding=mock_embedding, index=1),
-        ]
-        mock_response.usage = Mock(total_tokens=100)
+        mock_response = FakeResponse(
+            [
+                FakeEmbedding(b64(mock_embedding), 0),
+                FakeEmbedding(b64(mock_embedding), 1),
+            ],
+            FakeUsage(100),
+        )
 
         with patch.object(
             generator.client.embeddings, "create", return_value=mock_response
@@ -155,9 +260,9 @@ class TestGenerateEmbeddings:
         chunks = [create_test_chunk()]
         mock_embedding = [0.5] * 1536
 
-        mock_response = Mock()
-        mock_response.data = [Mock(embedding=mock_embedding, index=0)]
-        mock_response.usage = Mock(total_tokens=50)
+        mock_response = FakeResponse(
+            [FakeEmbedding(b64(mock_embedding), 0)], FakeUsage(50)
+        )
 
         with patch.object(
             generator.client.embeddings, "create", return_value=mock_response
@@ -165,9 +270,141 @@ class TestGenerateEmbeddings:
             result = generator.generate_embeddings(chunks)
 
         # Verify original chunks are modified
-        assert chunks[0].embedding == mock_embedding
+        assert chunks[0].embedding.tolist() == mock_embedding
         assert result[0] is chunks[0]
 
+    def test_generate_embeddings_decodes_base64_batch(self, generator):
+        """Test that embeddings are requested as base64 and decoded in bulk."""
+        chunks = [
+            create_test_chunk("a", text="First chunk."),
+            create_test_chunk("b", text="Second chunk."),
+        ]
+
+        with patch.object(
+            generator.client.embeddings, "create", side_effect=fake_create
+        ) as mock_create:
+            generator.generate_embeddings(chunks)
+
+        assert mock_create.call_args.kwargs["encoding_format"] == "base64"
+        assert chunks[0].embedding.tolist() == [12.0] * 1536
+        assert chunks[1].embedding.tolist() == [13.0] * 1536
+        # Both rows are views into the one decoded batch matrix
+        assert chunks[0].embedding.base is chunks[1].embedding.base
+
+    def test_duplicate_texts_deduped(self, generator):
+        """Test that identical texts are sent once and share the result."""
+        chunks = [create_test_chunk(f"dup_{i}", text="Page 1") for i in range(100)]
+        chunks.append(create_test_chunk("other", text="Other text"))
+
+        with patch.object(
+            generator.client.embeddings, "create", side_effect=fake_create
+        ) as mock_create:
+            generator.generate_embeddings(chunks)
+
+        mock_create.assert_called_once()
+        assert mock_create.call_args.kwargs["input"] == ["Page 1", "Other text"]
+        assert all(chunk.embedding is chunks[0].embedding for chunk in chunks[:100])
+        assert chunks[0].embedding.tolist() == [6.0] * 1536
+        assert not chunks[0].embedding.flags.writeable
+        assert chunks[100].embedding.tolist() == [10.0] * 1536
+
+    def test_generate_embeddings_stores_float32_arrays(self, generator):
+        """Test that embeddings are stored as compact float32 arrays."""
+        chunks = [create_test_chunk()]
+        mock_response = FakeResponse(
+            [FakeEmbedding(b64([0.25] * 1536), 0)], FakeUsage(50)
+        )
+
+        with patch.object(
+            generator.client.embeddings, "create", return_value=mock_response
+        ):
+            generator.generate_embeddings(chunks)
+
+        assert isinstance(chunks[0].embedding, np.ndarray)
+        assert chunks[0].embedding.dtype == np.float32
+        assert chunks[0].embedding.shape == (1536,)
+
+
+@pytest.mark.unit
+class TestEmbeddingCaching:
+    """Test cases for generate_embeddings with an EmbeddingCache."""
+
+    @pytest.fixture
+    def mock_settings(self):
+        """Mock settings for testing."""
+        with patch("src.domain.rag.embeddings.get_settings") as mock:
+            settings = Mock()
+            settings.openai_api_key = "test-api-key"
+            mock.return_value = settings
+            yield mock
+
+    @pytest.fixture
+    def generator(self, mock_settings):
+        """Create an EmbeddingGenerator with an in-memory cache."""
+        return EmbeddingGenerator(
+            requests_per_minute=0, tokens_per_minute=0, cache=EmbeddingCache()
+        )
+
+    def cache_key(self, generator, text):
+        """Build the cache key the generator uses for text."""
+        return generator.cache.make_key(
+            generator.MODEL, generator.EMBEDDING_DIMENSIONS, text
+        )
+
+    def test_cache_hit_skips_api(self, generator):
+        """Test that fully cached chunks are embedded without an API call."""
+        chunks = [create_test_chunk("a", text="alpha"), create_test_chunk("b")]
+        for chunk in chunks:
+            generator.cache.put(self.cache_key(generator, chunk.text), [0.5] * 1536)
+
+        with patch.object(generator.client.embeddings, "create") as mock_create:
+            generator.generate_embeddings(chunks)
+
+        mock_create.assert_not_called()
+        assert all(chunk.embedding.tolist() == [0.5] * 1536 for chunk in chunks)
+        assert generator.api_calls == 0
+
+    def test_partial_cache_hits_only_embed_misses(self, generator):
+        """Test that only uncached texts are sent to the API."""
+        cached = create_test_chunk("cached", text="seen before")
+        fresh = create_test_chunk("fresh", text="new text")
+        generator.cache.put(self.cache_key(generator, cached.text), [0.5] * 1536)
+
+        with patch.object(
+            generator.client.embeddings, "create", side_effect=fake_create
+        ) as mock_create:
+            generator.generate_embeddings([cached, fresh])
+
+        mock_create.assert_called_once()
+        assert mock_create.call_args.kwargs["input"] == ["new text"]
+        assert cached.embedding.tolist() == [0.5] * 1536
+        assert fresh.embedding.tolist() == [8.0] * 1536
+
+    def test_iterate_yields_cache_hits_first(self, generator):
+        """Test that cached chunks are handed back before any API batch."""
+        cached = create_test_chunk("cached", text="seen before")
+        fresh = create_test_chunk("fresh", text="new text")
+        generator.cache.put(self.cache_key(generator, cached.text), [0.5] * 1536)
+
+        with patch.object(
+            generator.client.embeddings, "create", side_effect=fake_create
+        ):
+            yielded = list(generator.iterate_embeddings([fresh, cached]))
+
+        assert yielded == [[cached], [fresh]]
+
+    def test_new_embeddings_are_cached(self, generator):
+        """Test that a second run over the same texts makes no API calls."""
+        with patch.object(
+            generator.client.embeddings, "create", side_effect=fake_create
+        ) as mock_create:
+            generator.generate_embeddings([create_test_chunk(text="some text")])
+            again = [create_test_chunk("again", text="some text")]
+            generator.generate_embeddings(again)
+
+        assert mock_create.call_count == 1
+        assert again[0].embedding.tolist() == [9.0] * 1536
+
 
 @pytest.mark.unit
 class TestBatching:
@@ -185,7 +422,7 @@ class TestBatching:
     @pytest.fixture
     def generator(self, mock_settings):
         """Create an EmbeddingGenerator instance for testing."""
-        return EmbeddingGenerator(min_request_interval=0)
+        return EmbeddingGenerator(requests_per_minute=0, tokens_per_minute=0)
 
     def test_create_batches_single_batch(self, generator):
         """Test that small chunk list stays in single batch."""
@@ -211,6 +448,30 @@ class TestBatching:
         assert len(batches) == 1
         assert len(batches[0]) == 2048
 
+    def test_create_batches_respects_token_budget(self, generator):
+        """Test that a batch is closed before it exceeds the token budget."""
+        generator.MAX_TOKENS_PER_REQUEST = 25
+        chunks = [create_test_chunk(f"chunk_{i}") for i in range(7)]  # 10 tokens
+
+        batches = generator._create_batches(chunks)
+
+        assert [len(batch) for batch in batches] == [2, 2, 2, 1]
+        assert [c for batch in batches for c in batch] == chunks
+
+    def test_create_batches_oversized_chunk_gets_own_batch(self, generator):
+        """Test that a chunk above the token budget is still sent, alone."""
+        generator.MAX_TOKENS_PER_REQUEST = 25
+        chunks = [create_test_chunk(f"chunk_{i}") for i in range(3)]
+        chunks[1].token_count = 40
+
+        batches = generator._create_batches(chunks)
+
+        assert [[c.chunk_id for c in batch] for batch in batches] == [
+            ["chunk_0"],
+            ["chunk_1"],
+            ["chunk_2"],
+        ]
+
     def test_generate_embeddings_processes_all_batches(self, generator):
         """Test that all batches are processed."""
         # Create 5 chunks
@@ -219,23 +480,168 @@ class TestBatching:
 
         # Mock to return embeddings for any input
         def create_mock_response(input_texts):
-            mock_response = Mock()
-            mock_response.data = [
-                Mock(embedding=mock_embedding, index=i) for i in range(len(input_texts))
-            ]
-            mock_response.usage = Mock(total_tokens=50 * len(input_texts))
-            return mock_response
+            return FakeResponse(
+                [
+                    FakeEmbedding(b64(mock_embedding), i)
+                    for i in range(len(input_texts))
+                ],
+                FakeUsage(50 * len(input_texts)),
+            )
 
         with patch.object(
             generator.client.embeddings,
             "create",
-            side_effect=lambda model, input: create_mock_response(input),
+            side_effect=lambda model, input, encoding_format: create_mock_response(
+                input
+            ),
         ):
             generator.generate_embeddings(chunks)
 
         # All chunks should have embeddings
         assert all(chunk.has_embedding() for chunk in chunks)
 
+    def test_generate_embeddings_concurrent_batches(self, generator):
+        """Test that concurrent batches land on the right chunks and stats add up."""
+        generator.MAX_BATCH_SIZE = 2
+        chunks = [create_test_chunk(f"chunk_{i}", text=f"Text {i}") for i in range(7)]
+
+        def create_mock_response(input_texts):
+            # Encode each text's number in its embedding to check the mapping
+            return FakeResponse(
+                [
+                    FakeEmbedding(b64([float(text.split()[1])] * 3), i)
+                    for i, text in enumerate(input_texts)
+                ],
+                FakeUsage(10 * len(input_texts)),
+            )
+
+        with patch.object(
+            generator.client.embeddings,
+            "create",
+            side_effect=lambda model, input, encoding_format: create_mock_response(
+                input
+            ),
+        ) as mock_create:
+            generator.generate_embeddings(chunks, max_workers=4)
+
+        assert mock_create.call_count == 4
+        assert [chunk.embedding[0] for chunk in chunks] == list(range(7))
+        assert generator.api_calls == 4
+        assert generator.total_tokens == 70
+
+    def test_rate_limiters_take_requests_and_batch_tokens(self, generator):
+        """Test that each batch takes one request and its tokens from the limits."""
+        generator.MAX_BATCH_SIZE = 2
+        generator.request_limiter = Mock(**{"acquire.return_value": 0.0})
+        generator.token_limiter = Mock(**{"acquire.return_value": 0.0})
+        chunks = [
+            create_test_chunk(f"chunk_{i}", text=f"Text {i}") for i in range(3)
+        ]  # 10 tokens
+
+        with patch.object(
+            generator.client.embeddings, "create", side_effect=fake_create
+        ):
+            generator.generate_embeddings(chunks, max_workers=1)
+
+        assert generator.request_limiter.acquire.call_count == 2
+        token_calls = [c.args for c in generator.token_limiter.acquire.call_args_list]
+        assert token_calls == [(20,), (10,)]
+
+    @patch("src.infrastructure.rate_limiter.time")
+    def test_token_limit_delays_requests(self, mock_time, mock_settings):
+        """Test that a spent token budget makes the next batch wait."""
+        mock_time.monotonic.return_value = 100.0  # Frozen clock
+        generator = EmbeddingGenerator(requests_per_minute=0, tokens_per_minute=600)
+        generator.MAX_BATCH_SIZE = 30  # 300 tokens per batch
+        chunks = [create_test_chunk(f"chunk_{i}", text=f"Text {i}") for i in range(90)]
+
+        with patch.object(
+            generator.client.embeddings, "create", side_effect=fake_create
+        ):
+            generator.generate_embeddings(chunks, max_workers=1)
+
+        # 600 tokens/min refills 10/s: the first two batches fit in the
+        # budget, the third waits for 300 tokens
+        sleeps = [c.args[0] for c in mock_time.sleep.call_args_list]
+        assert sleeps == [pytest.approx(30.0)]
+
+    def test_iterate_yields_batches_in_order_with_one_worker(self, generator):
+        """Test that batches are yielded one at a time, each fully embedded."""
+        generator.MAX_BATCH_SIZE = 2
+        chunks = [create_test_chunk(f"c{i}", text=f"Text {i}") for i in range(5)]
+
+        yielded = []
+        with patch.object(
+            generator.client.embeddings, "create", side_effect=fake_create
+        ):
+            for done in generator.iterate_embeddings(chunks, max_workers=1):
+                assert all(chunk.has_embedding() for chunk in done)
+                yielded.append([chunk.chunk_id for chunk in done])
+
+        assert yielded == [["c0", "c1"], ["c2", "c3"], ["c4"]]
+
+    def test_iterate_yields_as_completed(self, generator):
+        """Test that a slow batch doesn't hold back batches finished after it."""
+        generator.MAX_BATCH_SIZE = 1
+        chunks = [create_test_chunk(f"c{i}", text=f"Text {i}") for i in range(3)]
+        release = threading.Event()
+
+        def create(model, input, encoding_format):
+            if input == ["Text 0"]:
+                release.wait(timeout=5)
+            return fake_create(model, input, encoding_format)
+
+        yielded = []
+        with patch.object(generator.client.embeddings, "create", side_effect=create):
+            for done in generator.iterate_embeddings(chunks, max_workers=3):
+                yielded.append([chunk.chunk_id for chunk in done])
+                release.set()
+
+        # The first batch was blocked until something else had been yielded
+        assert yielded[0] != ["c0"]
+        assert sorted(yielded) == [["c0"], ["c1"], ["c2"]]
+
+    def test_iterate_validates_before_iteration(self, generator):
+        """Test that empty text is rejected when the iterator is created."""
+        chunk = create_test_chunk()
+        chunk.text = ""
+
+        with pytest.raises(ValueError, match="has empty text"):
+            generator.iterate_embeddings([chunk])
+
+    def test_generate_embeddings_concurrent_batch_error_propagates(self, generator):
+        """Test that a failing batch raises from the concurrent call."""
+        generator.MAX_BATCH_SIZE = 1
+        chunks = [create_test_chunk(f"chunk_{i}") for i in range(3)]
+
+        with patch.object(
+            generator.client.embeddings,
+            "create",
+            side_effect=BadRequestError("Invalid request", response=Mock(), body=None),
+        ):
+            with pytest.raises(BadRequestError):
+                generator.generate_embeddings(chunks)
+
+    def test_concurrent_batch_errors_raise_first_in_batch_order(self, generator):
+        """Test that the earliest failing batch wins, even if it fails last."""
+        generator.MAX_BATCH_SIZE = 1
+        chunks = [create_test_chunk(f"c{i}", text=f"Text {i}") for i in range(3)]
+        later_failed = threading.Event()
+
+        def create(model, input, encoding_format):
+            if input == ["Text 0"]:
+                # Fail only after batch 1 has already failed
+                later_failed.wait(timeout=5)
+                raise BadRequestError("batch 0", response=Mock(), body=None)
+            if input == ["Text 1"]:
+                later_failed.set()
+                raise BadRequestError("batch 1", response=Mock(), body=None)
+            return fake_create(model, input, encoding_format)
+
+        with patch.object(generator.client.embeddings, "create", side_effect=create):
+            with pytest.raises(BadRequestError, match="batch 0"):
+                generator.generate_embeddings(chunks, max_workers=3)
+
 
 @pytest.mark.unit
 class TestRetryLogic:
@@ -253,7 +659,7 @@ class TestRetryLogic:
     @pytest.fixture
     def generator(self, mock_settings):
         """Create an EmbeddingGenerator instance for testing."""
-        return EmbeddingGenerator(min_request_interval=0)
+        return EmbeddingGenerator(requests_per_minute=0, tokens_per_minute=0)
 
     def test_authentication_error_no_retry(self, generator):
         """Test that authentication errors are not retried."""
@@ -284,15 +690,16 @@ class TestRetryLogic:
             with pytest.raises(BadRequestError):
                 generator.generate_embeddings(chunks)
 
+    @patch("src.infrastructure.retry.random.uniform", return_value=1.0)
     @patch("src.domain.rag.embeddings.time.sleep")
-    def test_rate_limit_retry_success(self, mock_sleep, generator):
+    def test_rate_limit_retry_success(self, mock_sleep, mock_uniform, generator):
         """Test retry on rate limit error."""
         chunks = [create_test_chunk()]
         mock_embedding = [0.1] * 1536
 
-        mock_response = Mock()
-        mock_response.data = [Mock(embedding=mock_embedding, index=0)]
-        mock_response.usage = Mock(total_tokens=50)
+        mock_response = FakeResponse(
+            [FakeEmbedding(b64(mock_embedding), 0)], FakeUsage(50)
+        )
 
         # First call fails, second succeeds
         with patch.object(
@@ -314,9 +721,9 @@ class TestRetryLogic:
         chunks = [create_test_chunk()]
         mock_embedding = [0.1] * 1536
 
-        mock_response = Mock()
-        mock_response.data = [Mock(embedding=mock_embedding, index=0)]
-        mock_response.usage = Mock(total_tokens=50)
+        mock_response = FakeResponse(
+            [FakeEmbedding(b64(mock_embedding), 0)], FakeUsage(50)
+        )
 
         # First call fails, second succeeds
         with patch.object(
@@ -337,9 +744,9 @@ class TestRetryLogic:
         chunks = [create_test_chunk()]
         mock_embedding = [0.1] * 1536
 
-        mock_response = Mock()
-        mock_response.data = [Mock(embedding=mock_embedding, index=0)]
-        mock_response.usage = Mock(total_tokens=50)
+        mock_response = FakeResponse(
+            [FakeEmbedding(b64(mock_embedding), 0)], FakeUsage(50)
+        )
 
         # First call fails, second succeeds
         with patch.object(
@@ -370,8 +777,9 @@ class TestRetryLogic:
         # Should sleep before retry 2 and 3
         assert mock_sleep.call_count == 2
 
+    @patch("src.infrastructure.retry.random.uniform", return_value=1.0)
     @patch("src.domain.rag.embeddings.time.sleep")
-    def test_exponential_backoff(self, mock_sleep, generator):
+    def test_exponential_backoff(self, mock_sleep, mock_uniform, generator):
         """Test exponential backoff timing."""
         chunks = [create_test_chunk()]
 
@@ -383,9 +791,86 @@ class TestRetryLogic:
             with pytest.raises(RateLimitError):
                 generator.generate_embeddings(chunks, max_retries=3)
 
-        # Check backoff times: 2^0=1s, 2^1=2s
+        # Check backoff times before jitter: 2^0=1s, 2^1=2s
         mock_sleep.assert_any_call(1)
         mock_sleep.assert_any_call(2)
+        mock_uniform.assert_called_with(0.5, 1.5)
+
+    @patch("src.domain.rag.embeddings.time.sleep")
+    def test_backoff_jitter_range(self, mock_sleep, generator):
+        """Test that jittered backoff stays within +/-50% of the base delay."""
+        chunks = [create_test_chunk()]
+
+        with patch.object(
+            generator.client.embeddings,
+            "create",
+            side_effect=RateLimitError("Rate limited", response=Mock(), body=None),
+        ):
+            with pytest.raises(RateLimitError):
+                generator.generate_embeddings(chunks, max_retries=3)
+
+        first, second = (c.args[0] for c in mock_sleep.call_args_list)
+        assert 0.5 <= first <= 1.5
+        assert 1.0 <= second <= 3.0
+
+    @patch("src.domain.rag.embeddings.time.sleep")
+    def test_retry_after_header_honored(self, mock_sleep, generator):
+        """Test that the retry-after header overrides the computed backoff."""
+        chunks = [create_test_chunk()]
+        mock_response = FakeResponse(
+            [FakeEmbedding(b64([0.1] * 1536), 0)], FakeUsage(50)
+        )
+        rate_limited = Mock(headers={"retry-after": "7"})
+
+        with patch.object(
+            generator.client.embeddings,
+            "create",
+            side_effect=[
+                RateLimitError("Rate limited", response=rate_limited, body=None),
+                mock_response,
+            ],
+        ):
+            generator.generate_embeddings(chunks)
+
+        mock_sleep.assert_called_once_with(7.0)
+
+
+@pytest.mark.unit
+class TestEmbeddingFiles:
+    """Test cases for dump_embeddings and load_embeddings."""
+
+    def test_dump_and_memmap_roundtrip(self, tmp_path):
+        """Test that dumped embeddings load back as a memory-mapped matrix."""
+        chunks = [create_test_chunk(f"chunk_{i}") for i in range(3)]
+        for i, chunk in enumerate(chunks):
+            chunk.embedding = np.full(8, i + 0.5, dtype=np.float32)
+        path = tmp_path / "embeddings.npy"
+
+        EmbeddingGenerator.dump_embeddings(path, chunks)
+        chunk_ids, matrix = EmbeddingGenerator.load_embeddings(path)
+
+        assert chunk_ids == ["chunk_0", "chunk_1", "chunk_2"]
+        assert isinstance(matrix, np.memmap)
+        assert matrix.dtype == np.float32
+        assert matrix.shape == (3, 8)
+        assert np.array_equal(matrix[1], chunks[1].embedding)
+        assert not matrix.flags.writeable
+
+    def test_dump_without_embedding_raises_error(self, tmp_path):
+        """Test that every chunk must have an embedding."""
+        chunks = [create_test_chunk()]
+
+        with pytest.raises(ValueError, match="has no embedding"):
+            EmbeddingGenerator.dump_embeddings(tmp_path / "embeddings.npy", chunks)
+
+    def test_dump_mismatched_dimensions_raises_error(self, tmp_path):
+        """Test that all embeddings must have the same dimension."""
+        chunks = [create_test_chunk("a"), create_test_chunk("b")]
+        chunks[0].embedding = np.zeros(8, dtype=np.float32)
+        chunks[1].embedding = np.zeros(4, dtype=np.float32)
+
+        with pytest.raises(ValueError, match="expected 8"):
+            EmbeddingGenerator.dump_embeddings(tmp_path / "embeddings.npy", chunks)
 
 
 @pytest.mark.unit
@@ -404,7 +889,7 @@ class TestUsageTracking:
     @pytest.fixture
     def generator(self, mock_settings):
         """Create an EmbeddingGenerator instance for testing."""
-        return EmbeddingGenerator(min_request_interval=0)
+        return EmbeddingGenerator(requests_per_minute=0, tokens_per_minute=0)
 
     def test_get_usage_stats_initial(self, generator):
         """Test initial usage stats."""
@@ -443,17 +928,18 @@ class TestUsageTracking:
         mock_embedding = [0.1] * 1536
 
         def create_response(input_texts):
-            mock_response = Mock()
-            mock_response.data = [
-                Mock(embedding=mock_embedding, index=i) for i in range(len(input_texts))
-            ]
-            mock_response.usage = Mock(total_tokens=100)
-            return mock_response
+            return FakeResponse(
+                [
+                    FakeEmbedding(b64(mock_embedding), i)
+                    for i in range(len(input_texts))
+                ],
+                FakeUsage(100),
+            )
 
         with patch.object(
             generator.client.embeddings,
             "create",
-            side_effect=lambda model, input: create_response(input),
+            side_effect=lambda model, input, encoding_format: create_response(input),
         ):
             generator.generate_embeddings([create_test_chunk("chunk_1")])
             generator.generate_embeddings([create_test_chunk("chunk_2")])
@@ -479,15 +965,15 @@ class TestGenerateQueryEmbedding:
     @pytest.fixture
     def generator(self, mock_settings):
         """Create an EmbeddingGenerator instance for testing."""
-        return EmbeddingGenerator(min_request_interval=0)
+        return EmbeddingGenerator(requests_per_minute=0, tokens_per_minute=0)
 
     def test_generate_query_embedding_success(self, generator):
         """Test successful query embedding generation."""
         mock_embedding = [0.5] * 1536
 
-        mock_response = Mock()
-        mock_response.data = [Mock(embedding=mock_embedding, index=0)]
-        mock_response.usage = Mock(total_tokens=10)
+        mock_response = FakeResponse(
+            [FakeEmbedding(b64(mock_embedding), 0)], FakeUsage(10)
+        )
 
         with patch.object(
             generator.client.embeddings, "create", return_value=mock_response
@@ -497,6 +983,173 @@ class TestGenerateQueryEmbedding:
         assert result == mock_embedding
         assert len(result) == 1536
 
+    def test_generate_query_embedding_cached(self, generator):
+        """Test that repeating a query reuses the first embedding."""
+        mock_response = FakeResponse(
+            [FakeEmbedding(b64([0.5] * 1536), 0)], FakeUsage(10)
+        )
+
+        with patch.object(
+            generator.client.embeddings, "create", return_value=mock_response
+        ) as mock_create:
+            first = generator.generate_query_embedding("What is machine learning?")
+            second = generator.generate_query_embedding("What is machine learning?")
+
+        assert mock_create.call_count == 1
+        assert second == first
+        assert second is not first  # Callers get their own list
+        assert generator.api_calls == 1
+
+    def test_query_cache_stores_read_only_float32(self, generator):
+        """Test that cached query embeddings are compact, read-only arrays."""
+        with patch.object(
+            generator.client.embeddings, "create", side_effect=fake_create
+        ):
+            generator.generate_query_embedding("single")
+            generator.generate_query_embeddings(["batch_a", "batch_b"])
+
+        for cached in generator._query_cache.values():
+            assert cached.dtype == np.float32
+            assert cached.shape == (1536,)
+            assert not cached.flags.writeable
+
+    def test_generate_query_embedding_cache_evicts_least_recent(self, generator):
+        """Test that the query cache keeps only the most recent queries."""
+        generator.QUERY_CACHE_SIZE = 2
+        mock_response = FakeResponse(
+            [FakeEmbedding(b64([0.5] * 1536), 0)], FakeUsage(10)
+        )
+
+        with patch.object(
+            generator.client.embeddings, "create", return_value=mock_response
+        ) as mock_create:
+            for query in ["a", "b", "a", "c", "a", "b"]:
+                generator.generate_query_embedding(query)
+
+        # "b" was evicted by "c"; "a" stayed because it was used again
+        assert [c.kwargs["input"] for c in mock_create.call_args_list] == [
+            ["a"],
+            ["b"],
+            ["c"],
+            ["b"],
+        ]
+
+    def test_concurrent_identical_queries_coalesce(self, generator):
+        """Test that concurrent calls for one query share a single API call."""
+        generator.QUERY_CACHE_SIZE = 0  # Only coalescing can avoid extra calls
+        mock_response = FakeResponse(
+            [FakeEmbedding(b64([0.5] * 1536), 0)], FakeUsage(10)
+        )
+
+        in_create = threading.Event()
+        release = threading.Event()
+
+        def slow_create(**kwargs):
+            in_create.set()
+            release.wait(timeout=5)
+            return mock_response
+
+        # Let the request finish once every waiter has found it in flight
+        waiters = 4
+        found = threading.Semaphore(0)
+
+        class CountingDict(dict):
+            def get(self, key, default=None):
+                value = super().get(key, default)
+                if value is not None:
+                    found.release()
+                return value
+
+        generator._query_inflight = CountingDict()
+        results = []
+
+        def query():
+            results.append(generator.generate_query_embedding("same query"))
+
+        with patch.object(
+            generator.client.embeddings, "create", side_effect=slow_create
+        ) as mock_create:
+            threads = [threading.Thread(target=query) for _ in range(waiters + 1)]
+            threads[0].start()
+            assert in_create.wait(timeout=5)
+            for thread in threads[1:]:
+                thread.start()
+            for _ in range(waiters):
+                assert found.acquire(timeout=5)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        assert mock_create.call_count == 1
+        assert results == [[0.5] * 1536] * (waiters + 1)
+        assert generator._query_inflight == {}
+
+    def test_query_error_is_not_cached(self, generator):
+        """Test that a failed query request is retried by the next call."""
+        mock_response = FakeResponse(
+            [FakeEmbedding(b64([0.5] * 1536), 0)], FakeUsage(10)
+        )
+
+        with patch.object(
+            generator.client.embeddings,
+            "create",
+            side_effect=[
+                BadRequestError("Invalid request", response=Mock(), body=None),
+                mock_response,
+            ],
+        ):
+            with pytest.raises(BadRequestError):
+                generator.generate_query_embedding("query")
+            result = generator.generate_query_embedding("query")
+
+        assert result == [0.5] * 1536
+
+    def test_generate_query_embeddings_one_request(self, generator):
+        """Test that several queries are embedded in a single API request."""
+        with patch.object(
+            generator.client.embeddings, "create", side_effect=fake_create
+        ) as mock_create:
+            result = generator.generate_query_embeddings(["a", "bb", "a"])
+
+        mock_create.assert_called_once()
+        assert mock_create.call_args.kwargs["input"] == ["a", "bb"]
+        assert [vector[0] for vector in result] == [1.0, 2.0, 1.0]
+
+    def test_generate_query_embeddings_uses_query_cache(self, generator):
+        """Test that batch queries share the single-query cache."""
+        with patch.object(
+            generator.client.embeddings, "create", side_effect=fake_create
+        ) as mock_create:
+            generator.generate_query_embedding("cached")
+            result = generator.generate_query_embeddings(["cached", "new"])
+            again = generator.generate_query_embedding("new")
+
+        assert mock_create.call_count == 2
+        assert mock_create.call_args_list[1].kwargs["input"] == ["new"]
+        assert result[1] == again
+
+    def test_generate_query_embeddings_empty_query_raises(self, generator):
+        """Test that an empty query in the batch is rejected up front."""
+        with patch.object(generator.client.embeddings, "create") as mock_create:
+            with pytest.raises(ValueError, match="index 1 cannot be empty"):
+                generator.generate_query_embeddings(["ok", "  "])
+
+        mock_create.assert_not_called()
+
+    def test_empty_query_does_not_call_rate_limiter(self, generator):
+        """Test that invalid queries are rejected before any rate limiting."""
+        generator.request_limiter = Mock()
+        generator.token_limiter = Mock()
+
+        with patch.object(generator.client.embeddings, "create") as mock_create:
+            for query in ["", " \n\t "]:
+                with pytest.raises(ValueError, match="Query cannot be empty"):
+                    generator.generate_query_embedding(query)
+
+        generator.request_limiter.acquire.assert_not_called()
+        generator.token_limiter.acquire.assert_not_called()
+        mock_create.assert_not_called()
+
     def test_generate_query_embedding_empty_raises_error(self, generator):
         """Test that empty query raises ValueError."""
         with pytest.raises(ValueError, match="Query cannot be empty"):
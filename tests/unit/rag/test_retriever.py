@@ -1,11 +1,12 @@
 """Unit tests for Retriever component."""
 
-from unittest.mock import Mock
+from dataclasses import FrozenInstanceError
 
+import numpy as np
 import pytest
 
 from src.domain.models.chunk import Chunk
-from src.domain.rag.retriever import RetrievalResult, Retriever
+from src.domain.rag.retriever import RetrievalResult, Retriever, SimilarityCache
 
 
 def create_test_chunk(
@@ -13,11 +14,11 @@ def create_test_chunk(
     text: str = "This is test text for retrieval.",
     position: int = 0,
     source_document: str = "/path/to/test.pdf",
-    embedding: list = None,
+    embedding: np.ndarray = None,
 ) -> Chunk:
     """Create a test chunk with default values."""
     if embedding is None:
-        embedding = [0.1] * 1536
+        embedding = np.full(1536, 0.1, dtype=np.float32)
 
     return Chunk(
         chunk_id=chunk_id,
@@ -35,64 +36,131 @@ def create_test_chunk(
     )
 
 
-@pytest.fixture
-def mock_embedding_generator():
-    """Create a mock EmbeddingGenerator."""
-    generator = Mock()
-    generator.generate_query_embedding.return_value = [0.1] * 1536
-    return generator
+class StubEmbeddingGenerator:
+    """Stand-in for EmbeddingGenerator that records the queries it embeds."""
+
+    def __init__(self):
+        self.query_calls = []
+        self.batch_calls = []
+
+    def generate_query_embedding(self, query):
+        self.query_calls.append(query)
+        return [0.1] * 1536
+
+    def generate_query_embeddings(self, queries):
+        self.batch_calls.append(list(queries))
+        return [[0.1] * 1536 for _ in queries]
+
+
+class StubVectorStore:
+    """Stand-in for VectorStore returning fixed results and recording calls."""
+
+    collection_name = "test_collection"
+
+    def __init__(self, results=(), count=10):
+        self.results = list(results)
+        self.chunk_count = count
+        self.generation = 0
+        self.count_calls = 0
+        self.search_calls = []
+        self.search_ids_calls = []
+        self.batch_search_calls = []
+
+    def count(self):
+        self.count_calls += 1
+        return self.chunk_count
+
+    def search(self, **kwargs):
+        self.search_calls.append(kwargs)
+        return list(self.results)
+
+    def search_ids(self, **kwargs):
+        self.search_ids_calls.append(kwargs)
+        return (
+            [chunk.chunk_id for chunk, _ in self.results],
+            [score for _, score in self.results],
+        )
+
+    def batch_search(self, **kwargs):
+        self.batch_search_calls.append(kwargs)
+        return [list(self.results) for _ in kwargs["query_embeddings"]]
 
 
 @pytest.fixture
-def mock_vector_store():
-    """Create a mock VectorStore with test data."""
-    store = Mock()
-    store.collection_name = "test_collection"
-    store.count.return_value = 10
+def embedding_generator():
+    """Create a stub EmbeddingGenerator."""
+    return StubEmbeddingGenerator()
+
+
+@pytest.fixture(scope="module")
+def search_results():
+    """Build the default (chunk, score) search results once per module.
 
-    # Default search results
+    Tests only read these, and the stubs hand out copies of the list.
+    """
     chunks = [
         create_test_chunk("chunk_001", "Machine learning is a subset of AI.", 0),
         create_test_chunk("chunk_002", "Deep learning uses neural networks.", 1),
         create_test_chunk("chunk_003", "AI can solve complex problems.", 2),
     ]
-    store.search.return_value = [
-        (chunks[0], 0.95),
-        (chunks[1], 0.85),
-        (chunks[2], 0.75),
-    ]
+    return ((chunks[0], 0.95), (chunks[1], 0.85), (chunks[2], 0.75))
+
+
+@pytest.fixture
+def vector_store(search_results):
+    """Create a stub VectorStore with test data.
 
-    return store
+    Function scoped because the stub records the calls made to it.
+    """
+    return StubVectorStore(search_results)
 
 
 @pytest.fixture
-def retriever(mock_vector_store, mock_embedding_generator):
-    """Create a Retriever instance with mocked dependencies."""
-    return Retriever(mock_vector_store, mock_embedding_generator)
+def retriever(vector_store, embedding_generator):
+    """Create a Retriever instance with stubbed dependencies."""
+    return Retriever(vector_store, embedding_generator)
 
 
 @pytest.mark.unit
 class TestRetrieverInit:
     """Test cases for Retriever initialization."""
 
-    def test_initialization(self, mock_vector_store, mock_embedding_generator):
+    def test_initialization(self, vector_store, embedding_generator):
         """Test successful initialization."""
-        retriever = Retriever(mock_vector_store, mock_embedding_generator)
+        retriever = Retriever(vector_store, embedding_generator)
 
-        assert retriever.vector_store is mock_vector_store
-        assert retriever.embedding_generator is mock_embedding_generator
+        assert retriever.vector_store is vector_store
+        assert retriever.embedding_generator is embedding_generator
 
     def test_initialization_logs_chunk_count(
-        self, mock_vector_store, mock_embedding_generator, caplog
+        self, vector_store, embedding_generator, caplog
     ):
         """Test that initialization logs the chunk count."""
         import logging
 
         with caplog.at_level(logging.INFO):
-            Retriever(mock_vector_store, mock_embedding_generator)
+            Retriever(vector_store, embedding_generator)
 
         assert "10 chunks" in caplog.text
 
+    def test_disabled_log_messages_are_not_formatted(
+        self, vector_store, embedding_generator, caplog
+    ):
+        """Test that log arguments are only formatted when the level is enabled."""
+        import logging
+
+        class Unprintable:
+            def __str__(self):
+                raise AssertionError("log message was formatted")
+
+        vector_store.collection_name = Unprintable()
+        caplog.set_level(logging.WARNING, logger="src.domain.rag.retriever")
+
+        retriever = Retriever(vector_store, embedding_generator)
+        results = retriever.retrieve_with_scores("What is ML?", min_score=0.8)
+
+        assert len(results) == 2
+
 
 @pytest.mark.unit
 class TestRetrieve:
@@ -113,39 +181,34 @@ class TestRetrieve:
         assert chunks[1].chunk_id == "chunk_002"
         assert chunks[2].chunk_id == "chunk_003"
 
-    def test_retrieve_generates_query_embedding(
-        self, retriever, mock_embedding_generator
-    ):
+    def test_retrieve_generates_query_embedding(self, retriever, embedding_generator):
         """Test that retrieve generates embedding for the query."""
         retriever.retrieve("What is AI?", top_k=3)
 
-        mock_embedding_generator.generate_query_embedding.assert_called_once_with(
-            "What is AI?"
-        )
+        assert embedding_generator.query_calls == ["What is AI?"]
 
-    def test_retrieve_calls_vector_store_search(self, retriever, mock_vector_store):
+    def test_retrieve_calls_vector_store_search(self, retriever, vector_store):
         """Test that retrieve calls vector store search with correct parameters."""
         retriever.retrieve("test query", top_k=5)
 
-        mock_vector_store.search.assert_called_once()
-        call_kwargs = mock_vector_store.search.call_args.kwargs
+        (call_kwargs,) = vector_store.search_calls
         assert call_kwargs["top_k"] == 5
         assert call_kwargs["source_document"] is None
 
-    def test_retrieve_with_source_filter(self, retriever, mock_vector_store):
+    def test_retrieve_with_source_filter(self, retriever, vector_store):
         """Test filtering by source document."""
         retriever.retrieve(
             "test query", top_k=3, source_document="/path/to/specific.pdf"
         )
 
-        call_kwargs = mock_vector_store.search.call_args.kwargs
+        call_kwargs = vector_store.search_calls[-1]
         assert call_kwargs["source_document"] == "/path/to/specific.pdf"
 
-    def test_retrieve_uses_default_top_k(self, retriever, mock_vector_store):
+    def test_retrieve_uses_default_top_k(self, retriever, vector_store):
         """Test that default top_k is used when not specified."""
         retriever.retrieve("test query")
 
-        call_kwargs = mock_vector_store.search.call_args.kwargs
+        call_kwargs = vector_store.search_calls[-1]
         assert call_kwargs["top_k"] == Retriever.DEFAULT_TOP_K
 
 
@@ -176,62 +239,180 @@ class TestRetrieveWithScores:
         assert "Machine learning" in results[0].chunk.text
 
 
+@pytest.mark.unit
+class TestRetrieveWithScoresArrays:
+    """Test cases for retrieve_with_scores_arrays method."""
+
+    def test_returns_id_and_score_arrays(self, retriever, vector_store):
+        """Test that IDs and scores come back as NumPy arrays."""
+        ids, scores = retriever.retrieve_with_scores_arrays("What is ML?", top_k=3)
+
+        assert ids.dtype.kind == "U"
+        assert scores.dtype == np.float32
+        assert ids.tolist() == ["chunk_001", "chunk_002", "chunk_003"]
+        np.testing.assert_allclose(scores, [0.95, 0.85, 0.75], rtol=1e-6)
+        assert vector_store.search_ids_calls[0]["top_k"] == 3
+        assert vector_store.search_calls == []
+
+    def test_min_score(self, retriever):
+        """Test that min_score filters both arrays, keeping equal scores."""
+        ids, scores = retriever.retrieve_with_scores_arrays("q", min_score=0.85)
+
+        assert ids.tolist() == ["chunk_001", "chunk_002"]
+        assert len(scores) == 2
+
+    def test_empty_store(self, embedding_generator):
+        """Test that an empty store returns empty arrays without embedding."""
+        retriever = Retriever(StubVectorStore(count=0), embedding_generator)
+
+        ids, scores = retriever.retrieve_with_scores_arrays("q")
+
+        assert len(ids) == 0 and len(scores) == 0
+        assert embedding_generator.query_calls == []
+
+    def test_invalid_top_k_raises_error(self, retriever):
+        """Test that inputs are validated like retrieve_with_scores."""
+        with pytest.raises(ValueError, match="top_k must be positive"):
+            retriever.retrieve_with_scores_arrays("q", top_k=0)
+
+
 @pytest.mark.unit
 class TestRetrieverValidation:
     """Test cases for input validation."""
 
-    def test_empty_query_raises_error(self, retriever):
-        """Test that empty query raises ValueError."""
-        with pytest.raises(ValueError, match="Query cannot be empty"):
-            retriever.retrieve("")
+    @pytest.mark.parametrize(
+        "kwargs, match",
+        [
+            ({"query": ""}, "Query cannot be empty"),
+            ({"query": "   "}, "Query cannot be whitespace only"),
+            ({"top_k": 0}, "top_k must be positive"),
+            ({"top_k": -1}, "top_k must be positive"),
+            ({"top_k": 3.5}, "top_k must be an integer"),
+            ({"top_k": True}, "top_k must be an integer, got bool"),
+            ({"top_k": False}, "top_k must be an integer, got bool"),
+            ({"top_k": np.int64(3)}, "top_k must be an integer, got int64"),
+            ({"min_score": "high"}, "min_score must be a number"),
+            ({"min_score": -0.1}, "min_score must be between 0 and 1"),
+            ({"min_score": 1.5}, "min_score must be between 0 and 1"),
+        ],
+    )
+    def test_invalid_input_raises_error(self, retriever, kwargs, match):
+        """Test that invalid query, top_k or min_score raises ValueError."""
+        kwargs = {"query": "test query", **kwargs}
+
+        with pytest.raises(ValueError, match=match):
+            retriever.retrieve(**kwargs)
 
-    def test_whitespace_query_raises_error(self, retriever):
-        """Test that whitespace-only query raises ValueError."""
-        with pytest.raises(ValueError, match="Query cannot be whitespace only"):
-            retriever.retrieve("   ")
+    def test_invalid_top_k_does_not_call_embedding_generator(
+        self, retriever, vector_store, embedding_generator
+    ):
+        """Test that top_k is rejected before the store or API is used."""
+        vector_store.count_calls = 0
 
-    def test_invalid_top_k_zero_raises_error(self, retriever):
-        """Test that top_k=0 raises ValueError."""
         with pytest.raises(ValueError, match="top_k must be positive"):
             retriever.retrieve("test query", top_k=0)
 
-    def test_invalid_top_k_negative_raises_error(self, retriever):
-        """Test that negative top_k raises ValueError."""
-        with pytest.raises(ValueError, match="top_k must be positive"):
-            retriever.retrieve("test query", top_k=-1)
+        assert vector_store.count_calls == 0
+        assert embedding_generator.query_calls == []
+
+    def test_invalid_min_score_does_not_call_vector_store(
+        self, retriever, vector_store, embedding_generator
+    ):
+        """Test that min_score is rejected before the store or API is used."""
+        vector_store.count_calls = 0
 
-    def test_invalid_top_k_type_raises_error(self, retriever):
-        """Test that non-integer top_k raises ValueError."""
-        with pytest.raises(ValueError, match="top_k must be an integer"):
-            retriever.retrieve("test query", top_k=3.5)
+        with pytest.raises(ValueError, match="min_score must be between 0 and 1"):
+            retriever.retrieve("test query", min_score=2.0)
+
+        assert vector_store.count_calls == 0
+        assert vector_store.search_calls == []
+        assert embedding_generator.query_calls == []
+
+    def test_min_score_boundary_values_valid(self, retriever):
+        """Test that min_score at boundaries (0 and 1) is valid."""
+        # Should not raise - these are edge-valid values
+        retriever.retrieve("test query", min_score=0.0)
+        retriever.retrieve("test query", min_score=1.0)
 
 
 @pytest.mark.unit
 class TestRetrieverEmptyStore:
     """Test cases for empty vector store behavior."""
 
-    def test_empty_store_returns_empty_list(self, mock_embedding_generator):
+    def test_empty_store_returns_empty_list(self, embedding_generator):
         """Test that empty vector store returns empty results."""
-        empty_store = Mock()
-        empty_store.collection_name = "empty_collection"
-        empty_store.count.return_value = 0
+        empty_store = StubVectorStore(count=0)
 
-        retriever = Retriever(empty_store, mock_embedding_generator)
+        retriever = Retriever(empty_store, embedding_generator)
         chunks = retriever.retrieve("test query", top_k=5)
 
         assert chunks == []
 
-    def test_empty_store_does_not_generate_embedding(self, mock_embedding_generator):
+    def test_empty_store_does_not_generate_embedding(self, embedding_generator):
         """Test that empty store doesn't waste API calls on embedding generation."""
-        empty_store = Mock()
-        empty_store.collection_name = "empty_collection"
-        empty_store.count.return_value = 0
+        empty_store = StubVectorStore(count=0)
 
-        retriever = Retriever(empty_store, mock_embedding_generator)
+        retriever = Retriever(empty_store, embedding_generator)
         retriever.retrieve("test query", top_k=5)
 
         # Should not call the embedding generator for empty store
-        mock_embedding_generator.generate_query_embedding.assert_not_called()
+        assert embedding_generator.query_calls == []
+
+    def test_count_is_read_once(self, vector_store, embedding_generator):
+        """Test that retrievals reuse the chunk count read at init."""
+        retriever = Retriever(vector_store, embedding_generator)
+
+        retriever.retrieve("What is ML?")
+        retriever.retrieve("What is AI?")
+
+        assert vector_store.count_calls == 1
+
+    def test_refresh_count(self, embedding_generator):
+        """Test that refresh_count picks up chunks added after init."""
+        store = StubVectorStore(count=0)
+        store.results = [(create_test_chunk(), 0.9)]
+        retriever = Retriever(store, embedding_generator)
+        assert retriever.retrieve("What is ML?") == []
+
+        store.chunk_count = 1
+
+        assert retriever.refresh_count() == 1
+        assert len(retriever.retrieve("What is ML?")) == 1
+
+    @pytest.mark.parametrize(
+        "method",
+        ["retrieve", "retrieve_with_scores", "retrieve_with_scores_arrays"],
+    )
+    def test_store_mutation_recounts(self, embedding_generator, method):
+        """Test that chunks added through the store are seen without a refresh."""
+        store = StubVectorStore(count=0)
+        store.results = [(create_test_chunk(), 0.9)]
+        retriever = Retriever(store, embedding_generator)
+
+        def result_count() -> int:
+            results = getattr(retriever, method)("What is ML?")
+            # retrieve_with_scores_arrays returns (ids, scores)
+            return len(results[0] if isinstance(results, tuple) else results)
+
+        assert result_count() == 0
+
+        store.chunk_count = 1
+        store.generation += 1  # As VectorStore.add_chunks() does
+
+        assert result_count() == 1
+        assert store.count_calls == 2
+
+    def test_retrieve_many_recounts_after_mutation(self, embedding_generator):
+        """Test that retrieve_many also re-reads the count after a mutation."""
+        store = StubVectorStore(count=0)
+        store.results = [(create_test_chunk(), 0.9)]
+        retriever = Retriever(store, embedding_generator)
+        assert retriever.retrieve_many(["What is ML?"]) == [[]]
+
+        store.chunk_count = 1
+        store.generation += 1
+
+        assert len(retriever.retrieve_many(["What is ML?"])[0]) == 1
 
 
 @pytest.mark.unit
@@ -255,16 +436,28 @@ class TestRetrievalResult:
         assert result.chunk.chunk_id == "test_001"
         assert result.score == 0.92
 
+    def test_retrieval_result_has_slots(self):
+        """Test that RetrievalResult stores its fields in slots."""
+        result = RetrievalResult(chunk=create_test_chunk(), score=0.5)
+
+        assert not hasattr(result, "__dict__")
+        assert RetrievalResult.__slots__ == ("chunk", "score")
+
+    def test_retrieval_result_is_frozen(self):
+        """Test that shared (e.g. cached) results cannot be modified."""
+        result = RetrievalResult(chunk=create_test_chunk(), score=0.5)
+
+        with pytest.raises(FrozenInstanceError):
+            result.score = 0.9
+
 
 @pytest.mark.unit
 class TestRetrieverMinScore:
     """Test cases for min_score filtering."""
 
-    def test_min_score_filters_low_scores(self, mock_embedding_generator):
+    def test_min_score_filters_low_scores(self, embedding_generator):
         """Test that min_score filters out results below threshold."""
-        store = Mock()
-        store.collection_name = "test_collection"
-        store.count.return_value = 10
+        store = StubVectorStore()
 
         # Set up results with varying scores
         chunks = [
@@ -272,88 +465,240 @@ class TestRetrieverMinScore:
             create_test_chunk("chunk_002", "Medium relevance", 1),
             create_test_chunk("chunk_003", "Low relevance", 2),
         ]
-        store.search.return_value = [
+        store.results = [
             (chunks[0], 0.90),
             (chunks[1], 0.50),
             (chunks[2], 0.20),
         ]
 
-        retriever = Retriever(store, mock_embedding_generator)
+        retriever = Retriever(store, embedding_generator)
         results = retriever.retrieve("test query", top_k=5, min_score=0.45)
 
         assert len(results) == 2
         assert results[0].chunk_id == "chunk_001"
         assert results[1].chunk_id == "chunk_002"
 
-    def test_min_score_none_returns_all(self, mock_embedding_generator):
+    def test_min_score_none_returns_all(self, embedding_generator):
         """Test that min_score=None returns all results."""
-        store = Mock()
-        store.collection_name = "test_collection"
-        store.count.return_value = 10
+        store = StubVectorStore()
 
         chunks = [
             create_test_chunk("chunk_001", "Test", 0),
             create_test_chunk("chunk_002", "Test", 1),
         ]
-        store.search.return_value = [
+        store.results = [
             (chunks[0], 0.90),
             (chunks[1], 0.10),
         ]
 
-        retriever = Retriever(store, mock_embedding_generator)
+        retriever = Retriever(store, embedding_generator)
         results = retriever.retrieve("test query", top_k=5, min_score=None)
 
         assert len(results) == 2
 
-    def test_min_score_filters_all_returns_empty(self, mock_embedding_generator):
+    def test_min_score_filters_all_returns_empty(self, embedding_generator):
         """Test that high min_score can filter all results."""
-        store = Mock()
-        store.collection_name = "test_collection"
-        store.count.return_value = 10
+        store = StubVectorStore()
 
         chunks = [create_test_chunk("chunk_001", "Test", 0)]
-        store.search.return_value = [(chunks[0], 0.30)]
+        store.results = [(chunks[0], 0.30)]
 
-        retriever = Retriever(store, mock_embedding_generator)
+        retriever = Retriever(store, embedding_generator)
         results = retriever.retrieve("test query", top_k=5, min_score=0.50)
 
         assert len(results) == 0
 
+    def test_min_score_keeps_scores_equal_to_threshold(self, embedding_generator):
+        """Test that results scoring exactly min_score, including ties, are kept."""
+        store = StubVectorStore()
+        store.results = [
+            (create_test_chunk(f"chunk_{i:03d}", "Test", i), score)
+            for i, score in enumerate([0.9, 0.5, 0.5, 0.2])
+        ]
+
+        retriever = Retriever(store, embedding_generator)
+        results = retriever.retrieve_with_scores("test query", min_score=0.5)
+
+        assert [r.score for r in results] == [0.9, 0.5, 0.5]
+
 
 @pytest.mark.unit
-class TestRetrieverMinScoreValidation:
-    """Test cases for min_score validation."""
+class TestSimilarityCache:
+    """Test cases for SimilarityCache."""
 
-    def test_min_score_invalid_type_raises_error(self, retriever):
-        """Test that non-numeric min_score raises ValueError."""
-        with pytest.raises(ValueError, match="min_score must be a number"):
-            retriever.retrieve("test query", min_score="high")
+    @staticmethod
+    def result(chunk_id: str) -> list:
+        """Build a one-item result list for a chunk ID."""
+        return [RetrievalResult(chunk=create_test_chunk(chunk_id), score=0.9)]
 
-    def test_min_score_below_zero_raises_error(self, retriever):
-        """Test that min_score < 0 raises ValueError."""
-        with pytest.raises(ValueError, match="min_score must be between 0 and 1"):
-            retriever.retrieve("test query", min_score=-0.1)
+    def test_hit_for_similar_embedding(self):
+        """Test that a near-identical query returns the cached results."""
+        cache = SimilarityCache(capacity=4, threshold=0.99)
+        cache.put([1.0, 0.0, 0.0], "ctx", self.result("a"))
 
-    def test_min_score_above_one_raises_error(self, retriever):
-        """Test that min_score > 1 raises ValueError."""
-        with pytest.raises(ValueError, match="min_score must be between 0 and 1"):
-            retriever.retrieve("test query", min_score=1.5)
+        hit = cache.get([0.999, 0.01, 0.0], "ctx")
 
-    def test_min_score_boundary_values_valid(self, retriever):
-        """Test that min_score at boundaries (0 and 1) is valid."""
-        # Should not raise - these are edge-valid values
-        retriever.retrieve("test query", min_score=0.0)
-        retriever.retrieve("test query", min_score=1.0)
+        assert [r.chunk.chunk_id for r in hit] == ["a"]
+
+    def test_miss_for_dissimilar_embedding_or_other_context(self):
+        """Test that hits need both similarity and the same context."""
+        cache = SimilarityCache(capacity=4, threshold=0.99)
+        cache.put([1.0, 0.0, 0.0], "ctx", self.result("a"))
+
+        assert cache.get([0.0, 1.0, 0.0], "ctx") is None
+        assert cache.get([1.0, 0.0, 0.0], "other") is None
+
+    def test_returns_most_similar_entry(self):
+        """Test that the closest cached query wins when several match."""
+        cache = SimilarityCache(capacity=4, threshold=0.9)
+        cache.put([1.0, 0.2, 0.0], "ctx", self.result("far"))
+        cache.put([1.0, 0.05, 0.0], "ctx", self.result("near"))
+
+        hit = cache.get([1.0, 0.0, 0.0], "ctx")
+
+        assert [r.chunk.chunk_id for r in hit] == ["near"]
+
+    def test_evicts_least_recently_used(self):
+        """Test that a full cache replaces the entry unused for longest."""
+        cache = SimilarityCache(capacity=2, threshold=0.99)
+        cache.put([1.0, 0.0, 0.0], "ctx", self.result("a"))
+        cache.put([0.0, 1.0, 0.0], "ctx", self.result("b"))
+        cache.get([1.0, 0.0, 0.0], "ctx")  # "a" is now more recent than "b"
+
+        cache.put([0.0, 0.0, 1.0], "ctx", self.result("c"))
+
+        assert len(cache) == 2
+        assert cache.get([0.0, 1.0, 0.0], "ctx") is None
+        assert cache.get([1.0, 0.0, 0.0], "ctx") is not None
+        assert cache.get([0.0, 0.0, 1.0], "ctx") is not None
+
+    @pytest.mark.parametrize("capacity, threshold", [(0, 0.9), (4, 0.0), (4, 1.5)])
+    def test_invalid_parameters_raise(self, capacity, threshold):
+        """Test that capacity and threshold are validated."""
+        with pytest.raises(ValueError):
+            SimilarityCache(capacity=capacity, threshold=threshold)
 
 
 @pytest.mark.unit
-class TestRetrieverBooleanValidation:
-    """Test cases for boolean type validation."""
+class TestRetrieverSimilarityCache:
+    """Test cases for Retriever with a SimilarityCache."""
+
+    @pytest.fixture
+    def cached_retriever(self, vector_store, embedding_generator):
+        """Create a Retriever with a similarity cache."""
+        return Retriever(
+            vector_store,
+            embedding_generator,
+            cache=SimilarityCache(threshold=0.99),
+        )
+
+    def test_similar_query_skips_vector_search(
+        self, cached_retriever, vector_store, embedding_generator
+    ):
+        """Test that a second, similar query reuses the first search."""
+        first = cached_retriever.retrieve_with_scores("What is ML?", top_k=3)
+        second = cached_retriever.retrieve_with_scores("What's ML?", top_k=3)
+
+        assert len(vector_store.search_calls) == 1
+        assert len(embedding_generator.query_calls) == 2
+        assert second == first
+        assert second is not first
+
+    def test_different_search_parameters_miss(self, cached_retriever, vector_store):
+        """Test that results are only reused for the same top_k and filter."""
+        cached_retriever.retrieve("What is ML?", top_k=3)
+        cached_retriever.retrieve("What is ML?", top_k=2)
+        cached_retriever.retrieve("What is ML?", top_k=3, source_document="b.pdf")
+
+        assert len(vector_store.search_calls) == 3
+
+    def test_store_change_invalidates(self, cached_retriever, vector_store):
+        """Test that a store mutation invalidates results, even at equal count."""
+        cached_retriever.retrieve("What is ML?", top_k=3)
+        vector_store.generation += 1  # e.g. delete_by_source, then re-add
+        cached_retriever.retrieve("What is ML?", top_k=3)
+
+        assert len(vector_store.search_calls) == 2
+
+    def test_refresh_count_clears_cache(self, cached_retriever, vector_store):
+        """Test that refresh_count() drops results cached before it."""
+        cached_retriever.retrieve("What is ML?", top_k=3)
+        cached_retriever.refresh_count()
+        cached_retriever.retrieve("What is ML?", top_k=3)
+
+        assert len(cached_retriever.cache) == 1
+        assert len(vector_store.search_calls) == 2
+
+    def test_min_score_applied_to_cached_results(self, cached_retriever):
+        """Test that min_score filters cached results like fresh ones."""
+        cached_retriever.retrieve("What is ML?", top_k=3)
+
+        results = cached_retriever.retrieve_with_scores(
+            "What is ML?", top_k=3, min_score=0.8
+        )
+
+        assert [r.score for r in results] == [0.95, 0.85]
+
+
+@pytest.mark.unit
+class TestRetrieveMany:
+    """Test cases for retrieve_many method."""
+
+    def test_retrieve_many_single_embedding_call(self, retriever, embedding_generator):
+        """Test that all queries are embedded with one call."""
+        retriever.retrieve_many(["What is ML?", "What is AI?", "What is DL?"])
+
+        assert embedding_generator.batch_calls == [
+            ["What is ML?", "What is AI?", "What is DL?"]
+        ]
+        assert embedding_generator.query_calls == []
+
+    def test_retrieve_many_single_search_call(self, retriever, vector_store):
+        """Test that all queries are searched with one vector store call."""
+        results = retriever.retrieve_many(["What is ML?", "What is AI?"], top_k=3)
+
+        assert len(vector_store.batch_search_calls) == 1
+        assert vector_store.search_calls == []
+        call_kwargs = vector_store.batch_search_calls[0]
+        assert len(call_kwargs["query_embeddings"]) == 2
+        assert call_kwargs["top_k"] == 3
+        assert len(results) == 2
+        assert all(isinstance(r, RetrievalResult) for r in results[0])
+        assert [r.score for r in results[1]] == [0.95, 0.85, 0.75]
+
+    def test_retrieve_many_min_score(self, retriever):
+        """Test that min_score is applied to every query's results."""
+        results = retriever.retrieve_many(["q1", "q2"], min_score=0.8)
+
+        assert [[r.score for r in rs] for rs in results] == [
+            [0.95, 0.85],
+            [0.95, 0.85],
+        ]
+
+    def test_retrieve_many_empty_query_raises_error(
+        self, retriever, embedding_generator
+    ):
+        """Test that one empty query rejects the whole batch before embedding."""
+        with pytest.raises(ValueError, match="Query cannot be empty"):
+            retriever.retrieve_many(["What is ML?", ""])
+
+        assert embedding_generator.batch_calls == []
+
+    def test_retrieve_many_no_queries(self, retriever, vector_store):
+        """Test that an empty query list returns an empty list."""
+        assert retriever.retrieve_many([]) == []
+        assert vector_store.batch_search_calls == []
+
+    def test_retrieve_many_uses_similarity_cache(
+        self, vector_store, embedding_generator
+    ):
+        """Test that only queries missing from the cache are searched."""
+        retriever = Retriever(
+            vector_store, embedding_generator, cache=SimilarityCache()
+        )
+        retriever.retrieve("What is ML?", top_k=3)
 
-    def test_boolean_top_k_raises_error(self, retriever):
-        """Test that boolean top_k is rejected."""
-        with pytest.raises(ValueError, match="top_k must be an integer, got bool"):
-            retriever.retrieve("test query", top_k=True)
+        results = retriever.retrieve_many(["What is ML?"], top_k=3)
 
-        with pytest.raises(ValueError, match="top_k must be an integer, got bool"):
-            retriever.retrieve("test query", top_k=False)
+        assert vector_store.batch_search_calls == []
+        assert len(results[0]) == 3
@@ -1,24 +1,41 @@
 """Unit tests for VectorStore."""
 
 from pathlib import Path
-from unittest.mock import Mock, patch
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
 
+import numpy as np
 import pytest
 
 from src.domain.models.chunk import Chunk
 from src.domain.rag.vector_store import VectorStore
 
 
+def make_embedding(fill: float = 0.0, values: dict = None) -> np.ndarray:
+    """Create a 1536-dim float32 embedding, optionally setting some entries."""
+    embedding = np.full(1536, fill, dtype=np.float32)
+    for index, value in (values or {}).items():
+        embedding[index] = value
+    return embedding
+
+
+# Shared by every chunk built without an explicit embedding; read-only so no
+# test can change it for the others
+DEFAULT_EMBEDDING = make_embedding(0.1)
+DEFAULT_EMBEDDING.flags.writeable = False
+
+
 def create_test_chunk(
     chunk_id: str = "test_chunk_001",
     text: str = "This is test text for embedding.",
     position: int = 0,
     source_document: str = "/path/to/test.pdf",
-    embedding: list = None,
+    embedding: np.ndarray = None,
 ) -> Chunk:
     """Create a test chunk with default values."""
     if embedding is None:
-        embedding = [0.1] * 1536  # Default embedding
+        embedding = DEFAULT_EMBEDDING
 
     return Chunk(
         chunk_id=chunk_id,
@@ -36,14 +53,69 @@ def create_test_chunk(
     )
 
 
+# VectorStore only reads chroma_db_path from the settings
+TEST_SETTINGS = SimpleNamespace(chroma_db_path="./test_chroma_db")
+
+# HNSW parameters for the test collections, so searches stay on the index
+# rather than degrading if the test corpora grow
+HNSW_METADATA = {"hnsw:M": 24, "hnsw:construction_ef": 128, "hnsw:search_ef": 100}
+
+
 @pytest.fixture
-def mock_settings():
+def mock_settings(monkeypatch):
     """Mock settings for testing."""
-    with patch("src.domain.rag.vector_store.get_settings") as mock:
-        settings = Mock()
-        settings.chroma_db_path = "./test_chroma_db"
-        mock.return_value = settings
-        yield mock
+    monkeypatch.setattr(
+        "src.domain.rag.vector_store.get_settings", lambda: TEST_SETTINGS
+    )
+
+
+@pytest.fixture(scope="module")
+def chroma_client():
+    """One in-memory ChromaDB client shared by the tests in this module.
+
+    Opening a persistent client per test dominated the module's run time.
+    Tests stay isolated through make_store(), which gives every store its
+    own collection.
+    """
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+
+    return chromadb.EphemeralClient(
+        settings=ChromaSettings(anonymized_telemetry=False, allow_reset=True)
+    )
+
+
+def open_store(client) -> VectorStore:
+    """Open a VectorStore on client with a new, uniquely named collection."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("src.domain.rag.vector_store.get_settings", lambda: TEST_SETTINGS)
+        return VectorStore(
+            collection_name=f"test_{uuid4().hex}",
+            client=client,
+            collection_metadata=HNSW_METADATA,
+        )
+
+
+@pytest.fixture
+def make_store(chroma_client):
+    """Factory for VectorStores on the shared client, each with a fresh collection."""
+    stores = []
+
+    def make() -> VectorStore:
+        store = open_store(chroma_client)
+        stores.append(store)
+        return store
+
+    yield make
+
+    for store in stores:
+        chroma_client.delete_collection(store.collection_name)
+
+
+@pytest.fixture
+def store(make_store):
+    """Empty VectorStore; classes that need data override this fixture."""
+    return make_store()
 
 
 @pytest.mark.unit
@@ -68,6 +140,39 @@ class TestVectorStoreInit:
 
         assert store.collection_name == "custom_collection"
 
+    def test_initialization_with_client(
+        self, tmp_path: Path, mock_settings, chroma_client
+    ):
+        """Test that an injected client is used instead of opening one on disk."""
+        persist_dir = tmp_path / "unused"
+        store = VectorStore(
+            persist_directory=str(persist_dir),
+            collection_name="injected_client",
+            client=chroma_client,
+        )
+
+        try:
+            assert store.client is chroma_client
+            assert not persist_dir.exists()
+        finally:
+            chroma_client.delete_collection("injected_client")
+
+    def test_close_leaves_injected_client_open(self, make_store, chroma_client):
+        """Test that close() does not close a client the store did not open."""
+        store = make_store()
+        store.close()
+
+        assert chroma_client.heartbeat()
+        assert store.count() == 0
+
+    def test_initialization_with_collection_metadata(self, make_store):
+        """Test that extra metadata is passed to the ChromaDB collection."""
+        store = make_store()
+
+        assert store.collection.metadata["description"]
+        for key, value in HNSW_METADATA.items():
+            assert store.collection.metadata[key] == value
+
     def test_initialization_creates_directory(self, tmp_path: Path, mock_settings):
         """Test that initialization creates persist directory if needed."""
         persist_dir = tmp_path / "new_chroma" / "nested"
@@ -93,11 +198,6 @@ class TestVectorStoreInit:
 class TestAddChunks:
     """Test cases for add_chunks method."""
 
-    @pytest.fixture
-    def store(self, tmp_path: Path, mock_settings):
-        """Create a VectorStore instance for testing."""
-        return VectorStore(persist_directory=str(tmp_path / "chroma"))
-
     def test_add_chunks_success(self, store):
         """Test successful chunk addition."""
         chunks = [
@@ -110,12 +210,6 @@ class TestAddChunks:
         assert count == 2
         assert store.count() == 2
 
-    def test_add_chunks_empty_list(self, store):
-        """Test adding empty chunk list."""
-        count = store.add_chunks([])
-        assert count == 0
-        assert store.count() == 0
-
     def test_add_chunks_without_embedding_raises_error(self, store):
         """Test that adding chunk without embedding raises ValueError."""
         chunk = create_test_chunk()
@@ -144,34 +238,41 @@ class TestAddChunks:
 class TestSearch:
     """Test cases for search method."""
 
-    @pytest.fixture
-    def store(self, tmp_path: Path, mock_settings):
-        """Create a VectorStore instance with test data."""
-        store = VectorStore(persist_directory=str(tmp_path / "chroma"))
+    @pytest.fixture(scope="class")
+    @classmethod
+    def store(cls, chroma_client):
+        """Create a VectorStore with test data, shared by the class's tests.
+
+        Every test here only reads from the store.
+        """
+        store = open_store(chroma_client)
 
         # Add test chunks with different embeddings
         chunks = [
             create_test_chunk(
-                "chunk_001", "Machine learning basics", embedding=[1.0] + [0.0] * 1535
+                "chunk_001",
+                "Machine learning basics",
+                embedding=make_embedding(values={0: 1.0}),
             ),
             create_test_chunk(
                 "chunk_002",
                 "Deep learning neural networks",
-                embedding=[0.9] + [0.1] + [0.0] * 1534,
+                embedding=make_embedding(values={0: 0.9, 1: 0.1}),
             ),
             create_test_chunk(
                 "chunk_003",
                 "Python programming tutorial",
-                embedding=[0.0] * 1535 + [1.0],
+                embedding=make_embedding(values={-1: 1.0}),
             ),
         ]
         store.add_chunks(chunks)
-        return store
+        yield store
+        chroma_client.delete_collection(store.collection_name)
 
     def test_search_returns_ranked_results(self, store):
         """Test that search returns results ranked by similarity."""
         # Query similar to chunk_001 and chunk_002 (ML related)
-        query_embedding = [1.0] + [0.0] * 1535
+        query_embedding = make_embedding(values={0: 1.0})
 
         results = store.search(query_embedding, top_k=3)
 
@@ -183,7 +284,7 @@ class TestSearch:
 
     def test_search_top_k(self, store):
         """Test that top_k limits results."""
-        query_embedding = [0.5] * 1536
+        query_embedding = make_embedding(0.5)
 
         results = store.search(query_embedding, top_k=2)
 
@@ -191,7 +292,7 @@ class TestSearch:
 
     def test_search_returns_chunk_and_score_tuples(self, store):
         """Test that search returns (Chunk, score) tuples."""
-        query_embedding = [0.5] * 1536
+        query_embedding = make_embedding(0.5)
 
         results = store.search(query_embedding, top_k=1)
 
@@ -201,18 +302,9 @@ class TestSearch:
         assert isinstance(score, float)
         assert 0 <= score <= 1  # Similarity should be in [0, 1]
 
-    def test_search_empty_collection(self, tmp_path: Path, mock_settings):
-        """Test search on empty collection."""
-        store = VectorStore(persist_directory=str(tmp_path / "empty_chroma"))
-        query_embedding = [0.5] * 1536
-
-        results = store.search(query_embedding, top_k=5)
-
-        assert results == []
-
     def test_search_reconstructs_chunk(self, store):
         """Test that search reconstructs Chunk with all fields."""
-        query_embedding = [1.0] + [0.0] * 1535
+        query_embedding = make_embedding(values={0: 1.0})
 
         results = store.search(query_embedding, top_k=1)
         chunk = results[0][0]
@@ -222,17 +314,18 @@ class TestSearch:
         assert chunk.source_document == "/path/to/test.pdf"
         assert chunk.page_numbers == [1, 2]
         assert chunk.position == 0
+        assert chunk.embedding.dtype == np.float32
 
-    def test_search_with_source_filter(self, tmp_path: Path, mock_settings):
+    def test_search_with_source_filter(self, make_store):
         """Test search filtered by source document."""
-        store = VectorStore(persist_directory=str(tmp_path / "chroma"))
+        store = make_store()
 
         # Add chunks from different sources
         chunk1 = create_test_chunk("doc1_chunk", source_document="/doc1.pdf")
         chunk2 = create_test_chunk("doc2_chunk", source_document="/doc2.pdf")
         store.add_chunks([chunk1, chunk2])
 
-        query_embedding = [0.1] * 1536
+        query_embedding = make_embedding(0.1)
 
         # Search only in doc1
         results = store.search(query_embedding, top_k=10, source_document="/doc1.pdf")
@@ -240,18 +333,70 @@ class TestSearch:
         assert len(results) == 1
         assert results[0][0].source_document == "/doc1.pdf"
 
+    def test_search_ids_matches_search(self, store):
+        """Test that search_ids returns the IDs and scores search() would."""
+        query_embedding = make_embedding(values={0: 1.0})
+
+        ids, scores = store.search_ids(query_embedding, top_k=3)
+        results = store.search(query_embedding, top_k=3)
+
+        assert ids == [chunk.chunk_id for chunk, _ in results]
+        assert scores == pytest.approx([score for _, score in results])
+
+    def test_search_ids_only_requests_distances(self, store):
+        """Test that search_ids does not fetch embeddings or documents."""
+        with patch.object(
+            store.collection, "query", wraps=store.collection.query
+        ) as mock_query:
+            store.search_ids(make_embedding(0.5), top_k=1)
+
+        assert mock_query.call_args.kwargs["include"] == ["distances"]
+
+    def test_batch_search_one_result_list_per_query(self, store):
+        """Test that batch_search returns results for each query in order."""
+        queries = [make_embedding(values={0: 1.0}), make_embedding(values={-1: 1.0})]
+
+        results = store.batch_search(queries, top_k=2)
+
+        assert len(results) == 2
+        assert results[0][0][0].chunk_id == "chunk_001"
+        assert results[1][0][0].chunk_id == "chunk_003"
+        assert all(len(r) == 2 for r in results)
+
+    def test_batch_search_single_query_call(self, store):
+        """Test that batch_search queries the collection once."""
+        with patch.object(
+            store.collection, "query", wraps=store.collection.query
+        ) as mock_query:
+            store.batch_search([make_embedding(0.5)] * 3, top_k=1)
+
+        mock_query.assert_called_once()
+
+    def test_batch_search_matches_search(self, store):
+        """Test that batch_search gives the same results as search."""
+        query_embedding = make_embedding(0.5)
+
+        single = store.search(query_embedding, top_k=3)
+        (batched,) = store.batch_search([query_embedding], top_k=3)
+
+        assert [(c.chunk_id, s) for c, s in batched] == [
+            (c.chunk_id, s) for c, s in single
+        ]
+
 
 @pytest.mark.unit
 class TestGetChunk:
     """Test cases for get_chunk method."""
 
-    @pytest.fixture
-    def store(self, tmp_path: Path, mock_settings):
-        """Create a VectorStore instance for testing."""
-        store = VectorStore(persist_directory=str(tmp_path / "chroma"))
+    @pytest.fixture(scope="class")
+    @classmethod
+    def store(cls, chroma_client):
+        """Create a VectorStore with one chunk, shared by the class's read-only tests."""
+        store = open_store(chroma_client)
         chunk = create_test_chunk("chunk_001", "Test content")
         store.add_chunks([chunk])
-        return store
+        yield store
+        chroma_client.delete_collection(store.collection_name)
 
     def test_get_chunk_success(self, store):
         """Test successful chunk retrieval."""
@@ -279,15 +424,23 @@ class TestGetChunk:
         assert chunk.has_overlap_before is False
         assert chunk.has_overlap_after is True
 
+    def test_get_chunk_embedding_is_float32(self, store):
+        """Test that stored embeddings come back as compact float32 arrays."""
+        chunk = store.get_chunk("chunk_001")
+
+        assert isinstance(chunk.embedding, np.ndarray)
+        assert chunk.embedding.dtype == np.float32
+        assert chunk.embedding.nbytes == 1536 * 4
+        assert np.allclose(chunk.embedding, 0.1)
+
 
 @pytest.mark.unit
 class TestDeleteChunks:
     """Test cases for delete_chunks method."""
 
     @pytest.fixture
-    def store(self, tmp_path: Path, mock_settings):
+    def store(self, store):
         """Create a VectorStore instance with test data."""
-        store = VectorStore(persist_directory=str(tmp_path / "chroma"))
         chunks = [
             create_test_chunk("chunk_001"),
             create_test_chunk("chunk_002"),
@@ -322,9 +475,8 @@ class TestDeleteBySource:
     """Test cases for delete_by_source method."""
 
     @pytest.fixture
-    def store(self, tmp_path: Path, mock_settings):
+    def store(self, store):
         """Create a VectorStore instance with chunks from different sources."""
-        store = VectorStore(persist_directory=str(tmp_path / "chroma"))
         chunks = [
             create_test_chunk("doc1_001", source_document="/doc1.pdf"),
             create_test_chunk("doc1_002", source_document="/doc1.pdf"),
@@ -352,26 +504,12 @@ class TestDeleteBySource:
 class TestCollectionManagement:
     """Test cases for collection management methods."""
 
-    @pytest.fixture
-    def store(self, tmp_path: Path, mock_settings):
-        """Create a VectorStore instance for testing."""
-        return VectorStore(persist_directory=str(tmp_path / "chroma"))
-
-    def test_count_empty(self, store):
-        """Test count on empty collection."""
-        assert store.count() == 0
-
     def test_count_with_chunks(self, store):
         """Test count after adding chunks."""
         chunks = [create_test_chunk(f"chunk_{i}") for i in range(5)]
         store.add_chunks(chunks)
         assert store.count() == 5
 
-    def test_list_sources_empty(self, store):
-        """Test list_sources on empty collection."""
-        sources = store.list_sources()
-        assert sources == []
-
     def test_list_sources_with_data(self, store):
         """Test list_sources with chunks from multiple documents."""
         chunks = [
@@ -387,6 +525,19 @@ class TestCollectionManagement:
         assert "/doc1.pdf" in sources
         assert "/doc2.pdf" in sources
 
+    def test_mutations_bump_generation(self, store):
+        """Test that every add, delete and clear moves the generation on."""
+        store.add_chunks([create_test_chunk("chunk_1", source_document="/a.pdf")])
+        assert store.generation == 1
+        store.delete_by_source("/a.pdf")
+        store.add_chunks([create_test_chunk("chunk_2", source_document="/a.pdf")])
+        store.delete_chunks(["chunk_2"])
+        assert store.generation == 4
+
+        store.delete_chunks(["missing"])
+        store.clear()  # Nothing left to clear
+        assert store.generation == 4
+
     def test_clear_removes_all_chunks(self, store):
         """Test that clear removes all chunks."""
         chunks = [create_test_chunk(f"chunk_{i}") for i in range(5)]
@@ -397,23 +548,66 @@ class TestCollectionManagement:
 
         assert deleted == 5
         assert store.count() == 0
+        assert store.collection.metadata["hnsw:M"] == HNSW_METADATA["hnsw:M"]
 
-    def test_clear_empty_collection(self, store):
-        """Test clear on empty collection."""
-        deleted = store.clear()
-        assert deleted == 0
+
+@pytest.mark.unit
+class TestEmptyCollection:
+    """Test cases for operations on an empty collection."""
+
+    @pytest.fixture(scope="class")
+    @classmethod
+    def store(cls, chroma_client):
+        """Create one empty VectorStore; every operation below is a no-op."""
+        store = open_store(chroma_client)
+        yield store
+        chroma_client.delete_collection(store.collection_name)
+
+    @pytest.mark.parametrize(
+        "operation, expected",
+        [
+            (lambda s: s.count(), 0),
+            (lambda s: s.add_chunks([]), 0),
+            (lambda s: s.delete_chunks([]), 0),
+            (lambda s: s.delete_chunks(["nonexistent"]), 0),
+            (lambda s: s.delete_by_source("/nonexistent.pdf"), 0),
+            (lambda s: s.clear(), 0),
+            (lambda s: s.list_sources(), []),
+            (lambda s: s.get_chunk("nonexistent"), None),
+            (lambda s: s.search(make_embedding(0.5), top_k=5), []),
+            (lambda s: s.search_ids(make_embedding(0.5)), ([], [])),
+            (lambda s: s.batch_search([make_embedding(0.5)] * 2), [[], []]),
+            (lambda s: s.batch_search([]), []),
+        ],
+        ids=[
+            "count",
+            "add_chunks",
+            "delete_chunks_empty_list",
+            "delete_chunks_nonexistent",
+            "delete_by_source",
+            "clear",
+            "list_sources",
+            "get_chunk",
+            "search",
+            "search_ids",
+            "batch_search",
+            "batch_search_no_queries",
+        ],
+    )
+    def test_operation_on_empty_collection(self, store, operation, expected):
+        """Test that operations on an empty collection return empty results."""
+        assert operation(store) == expected
+        assert store.count() == 0
 
 
 @pytest.mark.unit
 class TestMetadataConversion:
-    """Test cases for metadata conversion methods."""
+    """Test cases for metadata conversion methods.
 
-    @pytest.fixture
-    def store(self, tmp_path: Path, mock_settings):
-        """Create a VectorStore instance for testing."""
-        return VectorStore(persist_directory=str(tmp_path / "chroma"))
+    The conversions are static, so only the roundtrip test needs a store.
+    """
 
-    def test_chunk_to_metadata(self, store):
+    def test_chunk_to_metadata(self):
         """Test converting chunk to metadata dict."""
         chunk = Chunk(
             chunk_id="test_chunk",
@@ -427,10 +621,10 @@ class TestMetadataConversion:
             has_overlap_after=False,
             overlap_with_previous="prev_chunk",
             overlap_with_next=None,
-            embedding=[0.1] * 1536,
+            embedding=make_embedding(0.1),
         )
 
-        metadata = store._chunk_to_metadata(chunk)
+        metadata = VectorStore._chunk_to_metadata(chunk)
 
         assert metadata["source_document"] == "/path/to/doc.pdf"
         assert metadata["page_numbers"] == "1,2,3"
@@ -442,7 +636,7 @@ class TestMetadataConversion:
         assert metadata["overlap_with_previous"] == "prev_chunk"
         assert metadata["overlap_with_next"] == ""
 
-    def test_metadata_to_chunk(self, store):
+    def test_metadata_to_chunk(self):
         """Test reconstructing chunk from metadata."""
         metadata = {
             "source_document": "/path/to/doc.pdf",
@@ -456,11 +650,11 @@ class TestMetadataConversion:
             "overlap_with_next": "",
         }
 
-        chunk = store._metadata_to_chunk(
+        chunk = VectorStore._metadata_to_chunk(
             chunk_id="test_chunk",
             text="Test text",
             metadata=metadata,
-            embedding=[0.1] * 1536,
+            embedding=make_embedding(0.1),
         )
 
         assert chunk.chunk_id == "test_chunk"
@@ -476,8 +670,9 @@ class TestMetadataConversion:
         assert chunk.overlap_with_next is None
         assert chunk.has_embedding()
 
-    def test_metadata_roundtrip(self, store):
+    def test_metadata_roundtrip(self, make_store):
         """Test that chunk survives metadata roundtrip."""
+        store = make_store()
         original = Chunk(
             chunk_id="roundtrip_test",
             text="Roundtrip test content",
@@ -490,7 +685,7 @@ class TestMetadataConversion:
             has_overlap_after=True,
             overlap_with_previous="chunk_2",
             overlap_with_next="chunk_4",
-            embedding=[0.5] * 1536,
+            embedding=make_embedding(0.5),
         )
 
         # Add and retrieve
@@ -525,9 +720,7 @@ class TestPersistence:
             create_test_chunk("chunk_002", "Second chunk"),
         ]
         store1.add_chunks(chunks)
-
-        # Force close by deleting reference
-        del store1
+        store1.close()
 
         # Second instance: data should persist
         store2 = VectorStore(persist_directory=persist_dir)
@@ -541,13 +734,15 @@ class TestPersistence:
 
         # First instance: add data
         store1 = VectorStore(persist_directory=persist_dir)
-        chunk = create_test_chunk("searchable_chunk", embedding=[1.0] + [0.0] * 1535)
+        chunk = create_test_chunk(
+            "searchable_chunk", embedding=make_embedding(values={0: 1.0})
+        )
         store1.add_chunks([chunk])
-        del store1
+        store1.close()
 
         # Second instance: search should work
         store2 = VectorStore(persist_directory=persist_dir)
-        query_embedding = [1.0] + [0.0] * 1535
+        query_embedding = make_embedding(values={0: 1.0})
         results = store2.search(query_embedding, top_k=1)
 
         assert len(results) == 1